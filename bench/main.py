@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+离线基准测试
+为每个平台启动本地模拟服务，使用真实的签到客户端在不同账号数下执行签到，
+统计耗时、请求速率和请求延迟分位数
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+import requests
+
+from bench.servers import PLATFORM_ROUTES, MockServer
+from runner.main import LOG_FORMAT, load_client_class
+from utils import aio
+from utils.concurrency import ENV_ACCOUNT_WORKERS
+from utils.log import setup_logging
+from utils.metrics import percentile
+from utils.resilience import reset_breakers
+from utils.shard import ENV_SHARD
+from utils.store import ENV_DATA_DIR
+from utils.transport import get_session, set_host_overrides
+
+logger = logging.getLogger(__name__)
+
+# 默认参数
+DEFAULT_ACCOUNT_COUNTS = "1,10,100,1000"
+DEFAULT_LATENCY = 0.02
+DEFAULT_WORKERS = 16
+
+# 各平台的账号环境变量及第 i 个模拟账号
+PLATFORM_ACCOUNTS: dict[str, tuple[str, Callable[[int], str]]] = {
+    "glados": ("GLADOS_COOKIES", lambda i: f"koa:sess=bench{i}"),
+    "bilibili": (
+        "BILIBILI_COOKIES",
+        lambda i: f"SESSDATA=bench{i}; bili_jct=csrf{i}",
+    ),
+    "smzdm": ("SMZDM_COOKIES", lambda i: f"sess=bench{i}"),
+    "mulan": ("MULAN_ACCOUNTS", lambda i: f"bench{i}@example.com:password"),
+    "newapi": ("LINKAPI_ACCOUNTS", lambda i: f"bench{i}:password"),
+    "mindvideo": ("MINDVIDEO_ACCOUNTS", lambda i: f"bench{i}@example.com:password"),
+    "sparkaigf": ("SPARKAIGF_ACCOUNTS", lambda i: f"bench{i}:password"),
+    "maidanba": ("MAIDANBA_ACCOUNTS", lambda i: f"sess=bench{i}#token{i}"),
+    "music163": ("MUSIC163_COOKIES", lambda i: f"MUSIC_U=bench{i}"),
+}
+
+
+class _ErrorCounter(logging.Handler):
+    """统计签到客户端输出的错误日志数"""
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.count += 1
+
+
+_error_counter = _ErrorCounter()
+
+
+def bench_platform(
+    platform: str, account_count: int, servers: list[MockServer], engine: str
+) -> dict[str, Any]:
+    """使用指定账号数执行一次平台签到
+
+    Args:
+        platform: 平台名称
+        account_count: 账号数
+        servers: 该平台的模拟服务
+        engine: 执行引擎（thread 或 asyncio）
+
+    Returns:
+        统计结果字典
+    """
+    env_name, make_account = PLATFORM_ACCOUNTS[platform]
+    os.environ[env_name] = "||".join(make_account(i) for i in range(account_count))
+
+    latencies: list[float] = []
+
+    def record_latency(response: requests.Response, *args: Any, **kwargs: Any) -> None:
+        latencies.append(response.elapsed.total_seconds())
+
+    hooks = get_session().hooks["response"]
+    hooks.append(record_latency)
+    _error_counter.count = 0
+    request_count = sum(server.request_count for server in servers)
+    reset_breakers()
+
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            # 每次使用空的数据目录，避免凭证缓存和每日状态影响结果
+            os.environ[ENV_DATA_DIR] = data_dir
+            client = load_client_class(platform)()
+            start = time.monotonic()
+            if engine == "asyncio" and hasattr(client, "run_async"):
+                aio.run(client.run_async())
+            else:
+                client.run()
+            elapsed = time.monotonic() - start
+    finally:
+        hooks.remove(record_latency)
+        del os.environ[env_name]
+
+    requests_made = sum(server.request_count for server in servers) - request_count
+    latencies.sort()
+    return {
+        "platform": platform,
+        "accounts": account_count,
+        "elapsed": elapsed,
+        "requests": requests_made,
+        "rps": requests_made / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": _error_counter.count,
+    }
+
+
+def start_servers(latency: float, error_rate: float) -> dict[str, list[MockServer]]:
+    """启动所有平台的模拟服务并设置主机重定向
+
+    Args:
+        latency: 每个请求的延迟（秒）
+        error_rate: 返回 503 的概率
+
+    Returns:
+        平台名称到模拟服务列表的映射
+    """
+    servers: dict[str, list[MockServer]] = {}
+    overrides: dict[str, str] = {}
+    for platform, hosts in PLATFORM_ROUTES.items():
+        for host, routes in hosts.items():
+            server = MockServer(host, routes, latency, error_rate)
+            server.start()
+            servers.setdefault(platform, []).append(server)
+            overrides[host] = server.base_url
+    set_host_overrides(overrides)
+    return servers
+
+
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="离线基准测试")
+    parser.add_argument(
+        "platforms",
+        nargs="*",
+        help="要测试的平台，默认全部平台",
+    )
+    parser.add_argument(
+        "-a",
+        "--accounts",
+        default=DEFAULT_ACCOUNT_COUNTS,
+        help=f"账号数，多个用逗号分隔，默认 {DEFAULT_ACCOUNT_COUNTS}",
+    )
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        default=DEFAULT_LATENCY,
+        help=f"模拟服务的响应延迟（秒），默认 {DEFAULT_LATENCY}",
+    )
+    parser.add_argument(
+        "-r",
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="模拟服务返回 503 的概率，默认 0",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"单个平台内同时签到的账号数，默认 {DEFAULT_WORKERS}",
+    )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        choices=["thread", "asyncio"],
+        default="thread",
+        help="执行引擎，默认 thread",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="输出签到客户端的日志",
+    )
+    return parser.parse_args()
+
+
+def configure_logging(verbose: bool) -> None:
+    """配置日志：默认只输出基准测试结果，屏蔽签到客户端的日志
+
+    Args:
+        verbose: 是否输出签到客户端的日志
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    root = logging.getLogger()
+    if verbose:
+        setup_logging(LOG_FORMAT)
+    else:
+        root.setLevel(logging.ERROR)
+    root.addHandler(_error_counter)
+
+
+def main() -> None:
+    """主函数"""
+    args = parse_args()
+    configure_logging(args.verbose)
+
+    platforms = args.platforms or list(PLATFORM_ACCOUNTS)
+    unknown = [p for p in platforms if p not in PLATFORM_ACCOUNTS]
+    if unknown:
+        logger.error(
+            f"未知平台: {', '.join(unknown)}, 可选: {', '.join(PLATFORM_ACCOUNTS)}"
+        )
+        sys.exit(1)
+    account_counts = [int(n) for n in args.accounts.split(",") if n.strip()]
+
+    os.environ[ENV_ACCOUNT_WORKERS] = str(args.workers)
+    os.environ.pop("XIZHI_KEY", None)
+    os.environ.pop(ENV_SHARD, None)
+    servers = start_servers(args.latency, args.error_rate)
+
+    logger.info(
+        f"延迟 {args.latency * 1000:.0f}ms, 错误率 {args.error_rate:.0%}, "
+        f"账号并发 {args.workers}, 执行引擎 {args.engine}"
+    )
+    logger.info(
+        f"{'平台':<12}{'账号数':>8}{'耗时(s)':>10}{'请求数':>8}"
+        f"{'请求/s':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'错误':>6}"
+    )
+    try:
+        for platform in platforms:
+            for account_count in account_counts:
+                result = bench_platform(
+                    platform, account_count, servers[platform], args.engine
+                )
+                logger.info(
+                    f"{platform:<12}{account_count:>8}{result['elapsed']:>10.2f}"
+                    f"{result['requests']:>8}{result['rps']:>10.1f}"
+                    f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+                    f"{result['errors']:>6}"
+                )
+    finally:
+        set_host_overrides({})
+        for platform_servers in servers.values():
+            for server in platform_servers:
+                server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""基准测试用的本地模拟服务
+
+每个平台主机对应一个本地 HTTP 服务，按 (方法, 路径) 返回与线上接口
+结构一致的固定响应，并支持配置响应延迟和错误率。
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional, Union
+from urllib.parse import urlsplit
+
+# 路由处理函数：参数为 (查询字符串, 请求体)，返回 (状态码, 响应体, 响应头)
+Body = Union[str, dict[str, Any]]
+Handler = Callable[[str, bytes], tuple[int, Body, dict[str, str]]]
+
+
+def ok(body: Body, headers: Optional[dict[str, str]] = None) -> Handler:
+    """构造返回固定 200 响应的路由处理函数
+
+    Args:
+        body: 响应体，字典按 JSON 返回
+        headers: 额外的响应头
+
+    Returns:
+        路由处理函数
+    """
+    return lambda query, data: (200, body, headers or {})
+
+
+class MockServer:
+    """单个主机的模拟服务
+
+    Attributes:
+        host: 模拟的主机名
+        routes: (方法, 路径) 到处理函数的映射，路径以 / 结尾时按前缀匹配
+        latency: 每个请求的延迟（秒）
+        error_rate: 返回 503 的概率
+        request_count: 已处理的请求数
+    """
+
+    def __init__(
+        self,
+        host: str,
+        routes: dict[tuple[str, str], Handler],
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+    ) -> None:
+        """初始化模拟服务
+
+        Args:
+            host: 模拟的主机名
+            routes: 路由表
+            latency: 每个请求的延迟（秒）
+            error_rate: 返回 503 的概率
+        """
+        self.host = host
+        self.routes = routes
+        self.latency = latency
+        self.error_rate = error_rate
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        """模拟服务的基础地址"""
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _route(self, method: str, path: str) -> Optional[Handler]:
+        """查找路由处理函数"""
+        handler = self.routes.get((method, path))
+        if handler is not None:
+            return handler
+        for (route_method, route_path), handler in self.routes.items():
+            if route_method != method or not route_path.endswith("/"):
+                continue
+            if path.startswith(route_path):
+                return handler
+        return None
+
+    def handle(
+        self, method: str, raw_path: str, data: bytes
+    ) -> tuple[int, bytes, dict[str, str]]:
+        """处理一个请求
+
+        Args:
+            method: 请求方法
+            raw_path: 请求路径（含查询字符串）
+            data: 请求体
+
+        Returns:
+            (状态码, 响应体, 响应头)
+        """
+        with self._count_lock:
+            self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            return 503, b"Service Unavailable", {}
+
+        parts = urlsplit(raw_path)
+        handler = self._route(method, parts.path)
+        if handler is None:
+            return 404, b"Not Found", {}
+
+        status, body, headers = handler(parts.query, data)
+        if isinstance(body, dict):
+            headers = {"Content-Type": "application/json", **headers}
+            body = json.dumps(body, ensure_ascii=False)
+        return status, body.encode(), headers
+
+    def _make_handler(self) -> type:
+        """创建绑定到当前服务的请求处理类"""
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 响应头和响应体分两次写出，关闭 Nagle 算法避免与客户端的延迟 ACK 叠加
+            disable_nagle_algorithm = True
+
+            def _respond(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                data = self.rfile.read(length) if length else b""
+                status, body, headers = server.handle(self.command, self.path, data)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return RequestHandler
+
+    def start(self) -> None:
+        """在后台线程中启动服务"""
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+SMZDM_USER_PAGE = """
+<a href="https://zhiyou.smzdm.com/user"> bench </a>
+<img src="https://res.smzdm.com/h5/h5_user/dist/assets/level/5.png?v=1">
+<div class="assets-part assets-gold">
+    <span class="assets-part-element assets-num">100</span>
+<div class="assets-part assets-prestige">
+    <span class="assets-part-element assets-num">200</span>
+"""
+
+NEW_API_ROUTES: dict[tuple[str, str], Handler] = {
+    ("POST", "/api/user/login"): ok(
+        {"success": True, "data": {"id": 1}},
+        {"Set-Cookie": "session=bench; Path=/"},
+    ),
+    ("POST", "/api/user/checkin"): ok({"success": True, "message": "签到成功"}),
+}
+
+# 各平台的模拟主机及路由
+PLATFORM_ROUTES: dict[str, dict[str, dict[tuple[str, str], Handler]]] = {
+    "glados": {
+        "glados.cloud": {
+            ("POST", "/api/user/checkin"): ok(
+                {"message": "Checkin! Got 1 points", "points": 1}
+            ),
+            ("GET", "/api/user/status"): ok(
+                {"data": {"email": "bench@example.com", "leftDays": "30.0"}}
+            ),
+            ("GET", "/api/user/points"): ok({"points": "100.0"}),
+        },
+    },
+    "bilibili": {
+        "api.bilibili.com": {
+            ("GET", "/x/web-interface/nav"): ok(
+                {
+                    "code": 0,
+                    "data": {
+                        "uname": "bench",
+                        "mid": 10001,
+                        "money": 10,
+                        "level_info": {"current_level": 4, "current_exp": 1000},
+                    },
+                }
+            ),
+            ("GET", "/x/web-interface/dynamic/region"): ok(
+                {
+                    "code": 0,
+                    "data": {"archives": [{"bvid": f"BV1bench{i}"} for i in range(5)]},
+                }
+            ),
+            ("GET", "/x/web-interface/ranking/v2"): ok(
+                {
+                    "code": 0,
+                    "data": {"list": [{"bvid": f"BV1rank{i}"} for i in range(5)]},
+                }
+            ),
+            ("GET", "/x/member/web/exp/reward"): ok(
+                {
+                    "code": 0,
+                    "data": {"login": True, "watch": False, "share": False, "coins": 0},
+                }
+            ),
+            ("GET", "/x/web-interface/archive/coins"): ok(
+                {"code": 0, "data": {"multiply": 0}}
+            ),
+            ("POST", "/x/web-interface/coin/add"): ok({"code": 0}),
+            ("POST", "/x/web-interface/share/add"): ok({"code": 0}),
+            ("POST", "/x/click-interface/web/heartbeat"): ok({"code": 0}),
+        },
+        "api.live.bilibili.com": {
+            ("GET", "/xlive/web-ucenter/v1/sign/DoSign"): ok(
+                {"code": 0, "data": {"text": "签到成功"}}
+            ),
+        },
+        "manga.bilibili.com": {
+            ("POST", "/twirp/activity.v1.Activity/ClockIn"): ok({"code": 0}),
+        },
+    },
+    "smzdm": {
+        "user-api.smzdm.com": {
+            ("POST", "/robot/token"): ok({"data": {"token": "bench"}}),
+            ("POST", "/checkin"): ok({"error_msg": "签到成功"}),
+        },
+        "zhiyou.smzdm.com": {
+            ("GET", "/user/"): ok(SMZDM_USER_PAGE),
+        },
+    },
+    "mulan": {
+        "api3.mulan.pro": {
+            ("POST", "/auth/sign-in"): ok({"data": {"access_token": "bench"}}),
+            ("GET", "/user/protected/userinfo/fresh"): ok(
+                {"data": {"nickname": "bench", "balance": 100}}
+            ),
+            ("GET", "/studio_manager/projects/recents"): ok(
+                {"data": {"items": [{"short_url_id": "bench", "name": "bench"}]}}
+            ),
+            ("GET", "/studio_manager/flow/"): ok(
+                {
+                    "data": {
+                        "workflows": [
+                            {"data": {"nodes": [{"data": {"run_task": {"id": 1}}}]}}
+                        ]
+                    }
+                }
+            ),
+            ("POST", "/manage/v1/workflows/run"): ok({"code": 0}),
+        },
+    },
+    "newapi": {
+        host: NEW_API_ROUTES
+        for host in (
+            "996coder.com",
+            "linkapi.ai",
+            "duckcoding.com",
+            "dawclaudecode.com",
+            "magic666.top",
+        )
+    },
+    "mindvideo": {
+        "api.mindvideo.ai": {
+            ("POST", "/api/login"): ok({"code": 0, "data": {"access_token": "bench"}}),
+            ("POST", "/api/checkin"): ok({"code": 0, "message": "签到成功"}),
+        },
+    },
+    "sparkaigf": {
+        "ai.sparkaigf.com": {
+            ("POST", "/api/auth/login"): ok({"code": 200, "data": "bench"}),
+            ("POST", "/api/signin/sign"): ok({"code": 200, "data": "签到成功"}),
+            ("GET", "/api/signin/signinLog"): ok(
+                {"code": 200, "data": [{"isSigned": True}]}
+            ),
+        },
+    },
+    "maidanba": {
+        "creditcardapp.bankcomm.com": {
+            ("POST", "/mdlweb/sign/data"): ok(
+                {"returnCode": "000000", "data": {"signSts": "0", "totalDays": 1}}
+            ),
+            ("POST", "/mdlweb/sign/sign"): ok(
+                {"returnCode": "000000", "data": {"itgBal": 1}}
+            ),
+        },
+    },
+    "music163": {
+        "music.163.com": {
+            ("GET", "/api/point/dailyTask"): ok({"code": 200, "point": 3}),
+        },
+    },
+}
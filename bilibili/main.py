@@ -7,21 +7,32 @@ https://www.bilibili.com
 import logging
 import os
 import sys
+import threading
+import time
 import traceback
-from typing import Any, Union
-
-import requests
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional, Union
+
+from utils.accounts import Account, AccountSource
+from utils.concurrency import (
+    map_concurrent,
+    run_accounts,
+    run_accounts_async,
+    submit_in_context,
+)
+from utils.log import setup_logging
 from utils.notify import XizhiNotifier
+from utils.shard import apply_shard_option
+
+if TYPE_CHECKING:
+    from utils.transport import PooledSession
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 # 环境变量
 ENV_COOKIES = "BILIBILI_COOKIES"
+# 设为 1 时任务完成后重新请求用户信息，否则按任务结果在本地更新硬币和经验
+ENV_VERIFY_USER_INFO = "BILIBILI_VERIFY_USER_INFO"
 
 # API 配置
 USER_INFO_URL = "https://api.bilibili.com/x/web-interface/nav"
@@ -31,6 +42,7 @@ DYNAMIC_VIDEOS_URL = (
 RANKING_VIDEOS_URL = (
     "https://api.bilibili.com/x/web-interface/ranking/v2?rid=0&type=all"
 )
+DAILY_REWARD_URL = "https://api.bilibili.com/x/member/web/exp/reward"
 COIN_STATUS_URL = "https://api.bilibili.com/x/web-interface/archive/coins?bvid={}"
 COIN_ADD_URL = "https://api.bilibili.com/x/web-interface/coin/add"
 SHARE_VIDEO_URL = "https://api.bilibili.com/x/web-interface/share/add"
@@ -45,6 +57,27 @@ DEFAULT_COIN_ADD_NUM = "1"
 DEFAULT_COIN_SELECT_LIKE = "1"
 DEFAULT_COIN_VIDEO_SOURCE = "dynamic"
 
+# 视频池中视频列表的有效期（秒）
+VIDEO_POOL_TTL = 600
+
+# 同时检查投币状态的视频数
+COIN_CHECK_WORKERS = 5
+# 投币状态接口表示视频不可用的错误码（不存在、不可见、审核中）
+UNAVAILABLE_VIDEO_CODES = (-404, 62002, 62004)
+
+# 同一账号同时执行的任务数
+TASK_WORKERS = 4
+# 任务依赖图中视频列表、每日奖励状态节点的名称
+VIDEOS_NODE = "videos"
+REWARD_NODE = "reward"
+
+# 每日任务奖励的经验值
+SHARE_EXP = 5
+WATCH_EXP = 5
+COIN_EXP = 10
+# 每天投币最多获得的经验值（即每天最多 5 枚硬币获得经验）
+DAILY_COIN_EXP_LIMIT = 50
+
 # 忽略失败关键字
 IGNORE_FAIL_KEYWORDS = ["未配置", "跳过", "已下线"]
 
@@ -52,16 +85,173 @@ IGNORE_FAIL_KEYWORDS = ["未配置", "跳过", "已下线"]
 DEFAULT_BVID = "BV1GJ411x7h7"
 
 
+class VideoPool:
+    """整次运行共享的视频池
+
+    动态和排行榜视频列表是公开的，所有账号共用一份，每个来源在有效期内
+    只请求一次；按账号序号错开列表的起始位置，使各账号分享、观看和投币
+    不同的视频。
+
+    Attributes:
+        ttl: 视频列表的有效期（秒）
+    """
+
+    def __init__(self, ttl: float = VIDEO_POOL_TTL) -> None:
+        """初始化视频池
+
+        Args:
+            ttl: 视频列表的有效期（秒）
+        """
+        self.ttl = ttl
+        self._videos: dict[str, tuple[float, list[str]]] = {}
+        self._lock = threading.Lock()
+        self._async_lock: Any = None
+
+    def _cached(self, source: str) -> Optional[list[str]]:
+        """有效期内的视频列表，没有时返回 None"""
+        entry = self._videos.get(source)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def _store(self, source: str, videos: list[str]) -> list[str]:
+        """缓存视频列表（空列表不缓存，下次重新请求）"""
+        if videos:
+            self._videos[source] = (time.monotonic(), videos)
+        return videos
+
+    def get(self, client: "BilibiliClient", source: str) -> list[str]:
+        """获取视频列表，有效期内直接使用缓存
+
+        Args:
+            client: 请求视频列表使用的客户端
+            source: 视频来源（dynamic 或 ranking）
+
+        Returns:
+            视频 bvid 列表
+        """
+        with self._lock:
+            videos = self._cached(source)
+            if videos is None:
+                if source == "ranking":
+                    videos = self._store(source, client.get_ranking_videos())
+                else:
+                    videos = self._store(source, client.get_dynamic_videos())
+        return videos
+
+    async def get_async(self, client: "BilibiliClient", source: str) -> list[str]:
+        """异步获取视频列表，参数和返回值同 get()"""
+        import asyncio
+
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            videos = self._cached(source)
+            if videos is None:
+                if source == "ranking":
+                    videos = await client.get_ranking_videos_async()
+                else:
+                    videos = await client.get_dynamic_videos_async()
+                videos = self._store(source, videos)
+        return videos
+
+    @staticmethod
+    def rotate(videos: list[str], slot: int) -> list[str]:
+        """按账号位置错开视频列表的起始位置
+
+        Args:
+            videos: 视频 bvid 列表
+            slot: 账号位置，从 0 开始
+
+        Returns:
+            从第 slot 个视频开始的循环列表
+        """
+        if not videos:
+            return []
+        offset = slot % len(videos)
+        return videos[offset:] + videos[:offset]
+
+
+class CoinBudget:
+    """并发投币时的投币预算
+
+    候选视频的分配和计数都在锁内完成：成功及正在进行的投币数之和不超过
+    预算，失败的投币释放名额给下一个候选视频；停止后不再分配新的视频，
+    已发出的请求照常计数。
+
+    Attributes:
+        limit: 最多投币数量
+        added: 已成功的投币数量
+    """
+
+    __slots__ = ("limit", "added", "_pending", "_stopped", "_candidates", "_lock")
+
+    def __init__(self, limit: int, candidates: list[str]) -> None:
+        """初始化投币预算
+
+        Args:
+            limit: 最多投币数量
+            candidates: 候选视频 bvid 列表
+        """
+        self.limit = limit
+        self.added = 0
+        self._pending = 0
+        self._stopped = False
+        self._candidates = iter(candidates)
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[str]:
+        """占用一个投币名额并取出下一个候选视频
+
+        Returns:
+            视频 bvid，预算已用完、已停止或没有候选视频时返回 None
+        """
+        with self._lock:
+            if self._stopped or self.added + self._pending >= self.limit:
+                return None
+            bvid = next(self._candidates, None)
+            if bvid is not None:
+                self._pending += 1
+            return bvid
+
+    def release(self, success: bool) -> None:
+        """投币结束，释放名额
+
+        Args:
+            success: 是否投币成功
+        """
+        with self._lock:
+            self._pending -= 1
+            if success:
+                self.added += 1
+
+    def stop(self) -> bool:
+        """停止分配新的候选视频
+
+        Returns:
+            是否为第一次停止
+        """
+        with self._lock:
+            first, self._stopped = not self._stopped, True
+        return first
+
+
 class BilibiliClient:
     """B站签到客户端"""
 
-    def __init__(self, cookie: str) -> None:
+    def __init__(
+        self, cookie: str, video_pool: Optional[VideoPool] = None, slot: int = 0
+    ) -> None:
         """初始化客户端
 
         Args:
             cookie: B站 Cookie 字符串
+            video_pool: 共享的视频池，不传时使用单独的视频池
+            slot: 账号位置（从 0 开始），用于错开各账号使用的视频
         """
         self.cookie = cookie
+        self.video_pool = video_pool or VideoPool()
+        self.slot = slot
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.198 Safari/537.36",
             "Accept": "application/json, text/plain, */*",
@@ -69,6 +259,17 @@ class BilibiliClient:
             "Cookie": cookie,
         }
         self.csrf = self._get_csrf()
+        # 本次运行成功投出的硬币数
+        self.coins_added = 0
+        # 任务执行前的每日经验奖励状态
+        self.daily_reward: dict[str, Any] = {}
+
+    @property
+    def session(self) -> "PooledSession":
+        """共享的连接池会话（首次发送请求时才导入 requests）"""
+        from utils.transport import get_session
+
+        return get_session()
 
     def _get_csrf(self) -> Union[str, None]:
         """从 Cookie 中提取 CSRF token（bili_jct）
@@ -95,24 +296,106 @@ class BilibiliClient:
             响应 JSON 数据
         """
         if method.upper() == "GET":
-            res = requests.get(url, headers=self.headers, params=data)
+            res = self.session.get(url, headers=self.headers, params=data)
+        else:
+            res = self.session.post(url, headers=self.headers, data=data)
+        res.raise_for_status()
+        return res.json()
+
+    async def _make_request_async(
+        self, url: str, method: str = "GET", data: Union[dict[str, Any], None] = None
+    ) -> dict[str, Any]:
+        """异步统一请求方法，参数和返回值同 _make_request()"""
+        from utils.aio import get_async_session
+
+        session = get_async_session()
+        if method.upper() == "GET":
+            res = await session.get(url, headers=self.headers, params=data)
         else:
-            res = requests.post(url, headers=self.headers, data=data)
+            res = await session.post(url, headers=self.headers, data=data)
         res.raise_for_status()
         return res.json()
 
+    @staticmethod
+    def _task_result(
+        data: dict[str, Any], success_msg: str, fail_msg: str
+    ) -> tuple[bool, str]:
+        """将接口响应转换为任务结果
+
+        Args:
+            data: 响应 JSON 数据
+            success_msg: 成功时的消息
+            fail_msg: 失败且响应无 message 时的消息
+
+        Returns:
+            (是否成功, 消息)
+        """
+        if data and data.get("code") == 0:
+            return True, success_msg
+        return False, data.get("message", fail_msg) if data else "网络错误"
+
     def get_user_info(self) -> Union[dict[str, Any], None]:
         """获取用户信息
 
         Returns:
             用户信息字典，失败返回 None
         """
-        data = self._make_request(USER_INFO_URL)
+        return self._parse_user_info(self._make_request(USER_INFO_URL))
+
+    async def get_user_info_async(self) -> Union[dict[str, Any], None]:
+        """异步获取用户信息，返回值同 get_user_info()"""
+        return self._parse_user_info(await self._make_request_async(USER_INFO_URL))
+
+    @staticmethod
+    def _parse_user_info(data: dict[str, Any]) -> Union[dict[str, Any], None]:
+        """解析用户信息响应
+
+        Args:
+            data: 响应 JSON 数据
+
+        Returns:
+            用户信息字典
+        """
         if data and data.get("code") == 0:
             return data.get("data")
         else:
             raise ValueError(f"获取用户信息失败: {data.get('message', '网络错误')}")
 
+    def get_daily_reward(self) -> dict[str, Any]:
+        """获取今日经验奖励的领取情况
+
+        Returns:
+            奖励状态字典，例如 {"login": True, "watch": False, "share": False,
+            "coins": 10}（coins 为今日投币获得的经验），获取失败返回空字典
+        """
+        try:
+            data = self._make_request(DAILY_REWARD_URL)
+        except Exception as e:
+            logger.warning(f"获取今日经验奖励状态失败: {e}")
+            return {}
+        self.daily_reward = self._parse_daily_reward(data)
+        return self.daily_reward
+
+    async def get_daily_reward_async(self) -> dict[str, Any]:
+        """异步获取今日经验奖励的领取情况，返回值同 get_daily_reward()"""
+        try:
+            data = await self._make_request_async(DAILY_REWARD_URL)
+        except Exception as e:
+            logger.warning(f"获取今日经验奖励状态失败: {e}")
+            return {}
+        self.daily_reward = self._parse_daily_reward(data)
+        return self.daily_reward
+
+    @staticmethod
+    def _parse_daily_reward(data: dict[str, Any]) -> dict[str, Any]:
+        """解析经验奖励状态响应，失败时返回空字典（按未领取处理）"""
+        if data and data.get("code") == 0:
+            return data.get("data") or {}
+        logger.warning(
+            f"获取今日经验奖励状态失败: {data.get('message') if data else '网络错误'}"
+        )
+        return {}
+
     def get_dynamic_videos(self) -> list[str]:
         """获取动态视频列表
 
@@ -124,6 +407,13 @@ class BilibiliClient:
             return [video["bvid"] for video in data.get("data", {}).get("archives", [])]
         return []
 
+    async def get_dynamic_videos_async(self) -> list[str]:
+        """异步获取动态视频列表，返回值同 get_dynamic_videos()"""
+        data = await self._make_request_async(DYNAMIC_VIDEOS_URL)
+        if data and data.get("code") == 0:
+            return [video["bvid"] for video in data.get("data", {}).get("archives", [])]
+        return []
+
     def get_ranking_videos(self) -> list[str]:
         """获取排行榜视频列表
 
@@ -135,19 +425,128 @@ class BilibiliClient:
             return [video["bvid"] for video in data.get("data", {}).get("list", [])]
         return []
 
-    def check_video_coin_status(self, bvid: str) -> bool:
+    async def get_ranking_videos_async(self) -> list[str]:
+        """异步获取排行榜视频列表，返回值同 get_ranking_videos()"""
+        data = await self._make_request_async(RANKING_VIDEOS_URL)
+        if data and data.get("code") == 0:
+            return [video["bvid"] for video in data.get("data", {}).get("list", [])]
+        return []
+
+    def get_videos(self, source: str) -> list[str]:
+        """从视频池获取视频列表，起始位置按账号错开
+
+        Args:
+            source: 视频来源（dynamic 或 ranking）
+
+        Returns:
+            视频 bvid 列表
+        """
+        return VideoPool.rotate(self.video_pool.get(self, source), self.slot)
+
+    async def get_videos_async(self, source: str) -> list[str]:
+        """异步从视频池获取视频列表，参数和返回值同 get_videos()"""
+        videos = await self.video_pool.get_async(self, source)
+        return VideoPool.rotate(videos, self.slot)
+
+    def check_video_coin_status(self, bvid: str) -> Union[bool, None]:
         """检查视频是否已投币
 
         Args:
             bvid: 视频 bvid
 
         Returns:
-            已投币返回 True，否则返回 False
+            已投币返回 True，未投币返回 False，视频不可用（已删除等）返回 None
+
+        Raises:
+            ValueError: 接口返回其他错误（如未登录、请求过于频繁）
         """
-        data = self._make_request(COIN_STATUS_URL.format(bvid))
-        if data and data.get("code") == 0:
+        return self._parse_coin_status(
+            self._make_request(COIN_STATUS_URL.format(bvid))
+        )
+
+    async def check_video_coin_status_async(self, bvid: str) -> Union[bool, None]:
+        """异步检查视频是否已投币，参数、返回值和异常同 check_video_coin_status()"""
+        return self._parse_coin_status(
+            await self._make_request_async(COIN_STATUS_URL.format(bvid))
+        )
+
+    @staticmethod
+    def _parse_coin_status(data: dict[str, Any]) -> Union[bool, None]:
+        """解析投币状态响应"""
+        code = data.get("code") if data else None
+        if code == 0:
             return data.get("data", {}).get("multiply", 0) > 0
-        return False
+        if code in UNAVAILABLE_VIDEO_CODES:
+            return None
+        message = data.get("message", "未知错误") if data else "网络错误"
+        raise ValueError(f"{message}({code})")
+
+    def _coin_status_or_error(self, bvid: str) -> Union[bool, None, Exception]:
+        """检查投币状态，请求失败时返回异常而不是抛出"""
+        try:
+            return self.check_video_coin_status(bvid)
+        except Exception as e:
+            return e
+
+    def select_coin_candidates(self, video_list: list[str]) -> tuple[list[str], str]:
+        """并发检查视频列表的投币状态，筛选出可以投币的视频
+
+        Args:
+            video_list: 视频 bvid 列表
+
+        Returns:
+            (可以投币的视频 bvid 列表（保持原顺序）, 错误信息)，
+            所有视频的投币状态都检查失败时错误信息非空
+        """
+        statuses = map_concurrent(
+            self._coin_status_or_error, video_list, COIN_CHECK_WORKERS
+        )
+        return self._eligible_videos(video_list, statuses)
+
+    async def select_coin_candidates_async(
+        self, video_list: list[str]
+    ) -> tuple[list[str], str]:
+        """异步并发检查投币状态，参数和返回值同 select_coin_candidates()"""
+        import asyncio
+
+        statuses = await asyncio.gather(
+            *(self.check_video_coin_status_async(bvid) for bvid in video_list),
+            return_exceptions=True,
+        )
+        return self._eligible_videos(video_list, statuses)
+
+    @staticmethod
+    def _eligible_videos(
+        video_list: list[str], statuses: list[Union[bool, None, BaseException]]
+    ) -> tuple[list[str], str]:
+        """按投币状态筛选视频
+
+        只跳过已投币和不可用的视频；检查失败的视频状态未知，仍作为候选。
+
+        Args:
+            video_list: 视频 bvid 列表
+            statuses: 各视频的投币状态或检查时的异常
+
+        Returns:
+            (可以投币的视频 bvid 列表, 错误信息)，所有视频都检查失败时
+            错误信息非空
+        """
+        candidates = []
+        errors = []
+        for bvid, status in zip(video_list, statuses):
+            if isinstance(status, BaseException):
+                logger.warning(f"视频 {bvid} 投币状态检查失败: {status}")
+                errors.append(status)
+                candidates.append(bvid)
+            elif status is None:
+                logger.info(f"视频 {bvid} 不可用，跳过")
+            elif status:
+                logger.info(f"视频 {bvid} 已投过币，跳过")
+            else:
+                candidates.append(bvid)
+        if errors and len(errors) == len(video_list):
+            return [], f"投币状态检查失败: {errors[0]}"
+        return candidates, ""
 
     def add_coin(
         self, bvid: str, num: int = 1, select_like: int = 1
@@ -172,9 +571,23 @@ class BilibiliClient:
             "csrf": self.csrf,
         }
         data = self._make_request(COIN_ADD_URL, method="POST", data=payload)
-        if data and data.get("code") == 0:
-            return True, "投币成功"
-        return False, data.get("message", "投币失败") if data else "网络错误"
+        return self._task_result(data, "投币成功", "投币失败")
+
+    async def add_coin_async(
+        self, bvid: str, num: int = 1, select_like: int = 1
+    ) -> tuple[bool, str]:
+        """异步为视频投币，参数和返回值同 add_coin()"""
+        if not self.csrf:
+            return False, "Bili_jct(csrf) 未找到"
+
+        payload = {
+            "bvid": bvid,
+            "multiply": num,
+            "select_like": select_like,
+            "csrf": self.csrf,
+        }
+        data = await self._make_request_async(COIN_ADD_URL, method="POST", data=payload)
+        return self._task_result(data, "投币成功", "投币失败")
 
     def share_video(self, bvid: str) -> tuple[bool, str]:
         """分享视频
@@ -190,9 +603,18 @@ class BilibiliClient:
 
         payload = {"bvid": bvid, "csrf": self.csrf}
         data = self._make_request(SHARE_VIDEO_URL, method="POST", data=payload)
-        if data and data.get("code") == 0:
-            return True, "分享成功"
-        return False, data.get("message", "分享失败") if data else "网络错误"
+        return self._task_result(data, "分享成功", "分享失败")
+
+    async def share_video_async(self, bvid: str) -> tuple[bool, str]:
+        """异步分享视频，参数和返回值同 share_video()"""
+        if not self.csrf:
+            return False, "Bili_jct(csrf) 未找到"
+
+        payload = {"bvid": bvid, "csrf": self.csrf}
+        data = await self._make_request_async(
+            SHARE_VIDEO_URL, method="POST", data=payload
+        )
+        return self._task_result(data, "分享成功", "分享失败")
 
     def watch_video(self, bvid: str) -> tuple[bool, str]:
         """观看视频
@@ -205,9 +627,15 @@ class BilibiliClient:
         """
         payload = {"bvid": bvid, "played_time": 30, "csrf": self.csrf}
         data = self._make_request(WATCH_VIDEO_URL, method="POST", data=payload)
-        if data and data.get("code") == 0:
-            return True, "观看成功"
-        return False, data.get("message", "观看失败") if data else "网络错误"
+        return self._task_result(data, "观看成功", "观看失败")
+
+    async def watch_video_async(self, bvid: str) -> tuple[bool, str]:
+        """异步观看视频，参数和返回值同 watch_video()"""
+        payload = {"bvid": bvid, "played_time": 30, "csrf": self.csrf}
+        data = await self._make_request_async(
+            WATCH_VIDEO_URL, method="POST", data=payload
+        )
+        return self._task_result(data, "观看成功", "观看失败")
 
     def live_sign(self) -> tuple[bool, str]:
         """直播签到
@@ -220,6 +648,13 @@ class BilibiliClient:
             return True, data.get("data", {}).get("text", "直播签到成功")
         return False, data.get("message", "直播签到失败") if data else "网络错误"
 
+    async def live_sign_async(self) -> tuple[bool, str]:
+        """异步直播签到，返回值同 live_sign()"""
+        data = await self._make_request_async(LIVE_SIGN_URL)
+        if data and data.get("code") == 0:
+            return True, data.get("data", {}).get("text", "直播签到成功")
+        return False, data.get("message", "直播签到失败") if data else "网络错误"
+
     def manga_sign(self) -> tuple[bool, str]:
         """漫画签到
 
@@ -228,9 +663,15 @@ class BilibiliClient:
         """
         payload = {"platform": "ios"}
         data = self._make_request(MANGA_SIGN_URL, method="POST", data=payload)
-        if data and data.get("code") == 0:
-            return True, "漫画签到成功"
-        return False, data.get("message", "漫画签到失败") if data else "网络错误"
+        return self._task_result(data, "漫画签到成功", "漫画签到失败")
+
+    async def manga_sign_async(self) -> tuple[bool, str]:
+        """异步漫画签到，返回值同 manga_sign()"""
+        payload = {"platform": "ios"}
+        data = await self._make_request_async(
+            MANGA_SIGN_URL, method="POST", data=payload
+        )
+        return self._task_result(data, "漫画签到成功", "漫画签到失败")
 
     def execute_coin_task(
         self,
@@ -238,6 +679,7 @@ class BilibiliClient:
         coin_add_num: int,
         select_like: int,
         video_source: str,
+        coin_exp_today: Optional[int] = None,
     ) -> tuple[bool, str]:
         """执行投币任务
 
@@ -246,47 +688,198 @@ class BilibiliClient:
             coin_add_num: 投币数量
             select_like: 是否同时点赞
             video_source: 视频来源（dynamic 或 ranking）
+            coin_exp_today: 今日已通过投币获得的经验，用于计算剩余投币数量
 
         Returns:
             (是否成功, 消息)
         """
-        if coin_add_num <= 0:
-            return True, "配置为0，跳过"
+        coin_add_num, skip_msg = self._coin_limit(
+            user_info, coin_add_num, coin_exp_today
+        )
+        if skip_msg:
+            return True, skip_msg
 
-        coin_balance = user_info.get("money", 0)
-        if coin_balance < 1:
-            return True, f"硬币不足({coin_balance})，跳过"
+        video_list = self.get_videos(video_source)
+        if video_source == "ranking":
+            logger.info("获取排行榜视频作为投币目标")
+        else:
+            logger.info("获取动态视频作为投币目标")
 
-        coin_add_num = min(coin_add_num, int(coin_balance), 5)
+        if not video_list:
+            return False, "无法获取视频列表"
+
+        video_list, error = self.select_coin_candidates(video_list)
+        if error:
+            return False, error
+        if not video_list:
+            return True, "没有可以投币的视频，跳过"
+
+        budget = CoinBudget(coin_add_num, video_list)
+        workers = min(coin_add_num, len(video_list))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bilibili-coin"
+        ) as pool:
+            futures = [
+                submit_in_context(pool, self._coin_worker, budget, select_like)
+                for _ in range(workers)
+            ]
+            for future in futures:
+                future.result()
+
+        self.coins_added += budget.added
+        return True, f"尝试投币，最终成功 {budget.added} 枚"
+
+    async def execute_coin_task_async(
+        self,
+        user_info: dict[str, Any],
+        coin_add_num: int,
+        select_like: int,
+        video_source: str,
+        coin_exp_today: Optional[int] = None,
+    ) -> tuple[bool, str]:
+        """异步执行投币任务，参数和返回值同 execute_coin_task()"""
+        coin_add_num, skip_msg = self._coin_limit(
+            user_info, coin_add_num, coin_exp_today
+        )
+        if skip_msg:
+            return True, skip_msg
 
+        video_list = await self.get_videos_async(video_source)
         if video_source == "ranking":
-            video_list = self.get_ranking_videos()
             logger.info("获取排行榜视频作为投币目标")
         else:
-            video_list = self.get_dynamic_videos()
             logger.info("获取动态视频作为投币目标")
 
         if not video_list:
             return False, "无法获取视频列表"
 
-        added_coins = 0
-        for bvid in video_list:
-            if added_coins >= coin_add_num:
-                break
+        video_list, error = await self.select_coin_candidates_async(video_list)
+        if error:
+            return False, error
+        if not video_list:
+            return True, "没有可以投币的视频，跳过"
 
-            success, msg = self.add_coin(bvid, 1, select_like)
-            if success:
-                added_coins += 1
-                logger.info(f"为视频 {bvid} 投币成功")
-            elif "已达到" in msg:
+        import asyncio
+
+        budget = CoinBudget(coin_add_num, video_list)
+        workers = min(coin_add_num, len(video_list))
+        await asyncio.gather(
+            *(self._coin_worker_async(budget, select_like) for _ in range(workers))
+        )
+
+        self.coins_added += budget.added
+        return True, f"尝试投币，最终成功 {budget.added} 枚"
+
+    def _coin_worker(self, budget: "CoinBudget", select_like: int) -> None:
+        """依次取出候选视频投币，直到预算用完、候选视频用完或停止投币
+
+        Args:
+            budget: 投币预算
+            select_like: 是否同时点赞
+        """
+        while True:
+            bvid = budget.acquire()
+            if bvid is None:
+                return
+            success, msg = False, ""
+            try:
+                success, msg = self.add_coin(bvid, 1, select_like)
+            finally:
+                budget.release(success)
+            self._handle_coin_result(budget, bvid, success, msg)
+
+    async def _coin_worker_async(self, budget: "CoinBudget", select_like: int) -> None:
+        """异步投币，参数同 _coin_worker()"""
+        while True:
+            bvid = budget.acquire()
+            if bvid is None:
+                return
+            success, msg = False, ""
+            try:
+                success, msg = await self.add_coin_async(bvid, 1, select_like)
+            finally:
+                budget.release(success)
+            self._handle_coin_result(budget, bvid, success, msg)
+
+    @staticmethod
+    def _handle_coin_result(
+        budget: "CoinBudget", bvid: str, success: bool, msg: str
+    ) -> None:
+        """输出投币结果，达到每日上限或硬币不足时停止投币"""
+        if success:
+            logger.info(f"为视频 {bvid} 投币成功")
+        elif "已达到" in msg:
+            if budget.stop():
                 logger.warning("今日投币上限已满，终止投币")
-                break
-            else:
-                logger.warning(f"为视频 {bvid} 投币失败: {msg}")
-                if "硬币不足" in msg:
-                    break
+        else:
+            logger.warning(f"为视频 {bvid} 投币失败: {msg}")
+            if "硬币不足" in msg:
+                budget.stop()
+
+    @staticmethod
+    def _coin_limit(
+        user_info: dict[str, Any],
+        coin_add_num: int,
+        coin_exp_today: Optional[int] = None,
+    ) -> tuple[int, str]:
+        """计算本次最多投币数量
+
+        Args:
+            user_info: 用户信息
+            coin_add_num: 配置的投币数量
+            coin_exp_today: 今日已通过投币获得的经验，未知时按 0 计算
+
+        Returns:
+            (投币数量, 跳过原因)，无需投币时跳过原因非空
+        """
+        if coin_add_num <= 0:
+            return 0, "配置为0，跳过"
+
+        remaining = (DAILY_COIN_EXP_LIMIT - (coin_exp_today or 0)) // COIN_EXP
+        if remaining <= 0:
+            return 0, "今日投币经验已满，跳过"
+
+        coin_balance = user_info.get("money", 0)
+        if coin_balance < 1:
+            return 0, f"硬币不足({coin_balance})，跳过"
+
+        if coin_exp_today:
+            logger.info(f"今日已获得投币经验 {coin_exp_today}，还可投币 {remaining} 枚")
+        return min(coin_add_num, int(coin_balance), remaining), ""
+
+    def update_user_info(
+        self,
+        user_info: dict[str, Any],
+        tasks_result: dict[str, tuple[bool, str]],
+    ) -> dict[str, Any]:
+        """按任务结果在本地更新用户信息，避免再次请求用户信息接口
 
-        return True, f"尝试投币，最终成功 {added_coins} 枚"
+        执行前已领取的分享、观看经验不重复计算。
+
+        Args:
+            user_info: 任务执行前的用户信息
+            tasks_result: 任务结果字典
+
+        Returns:
+            更新了硬币和经验的用户信息（不修改 user_info）
+        """
+        exp = COIN_EXP * self.coins_added
+        if tasks_result.get("分享视频", (False, ""))[0] and not self.daily_reward.get(
+            "share"
+        ):
+            exp += SHARE_EXP
+        if tasks_result.get("观看视频", (False, ""))[0] and not self.daily_reward.get(
+            "watch"
+        ):
+            exp += WATCH_EXP
+
+        level_info = dict(user_info.get("level_info", {}))
+        level_info["current_exp"] = level_info.get("current_exp", 0) + exp
+        return {
+            **user_info,
+            "money": user_info.get("money", 0) - self.coins_added,
+            "level_info": level_info,
+        }
 
     @staticmethod
     def mask_string(s: str) -> str:
@@ -318,8 +911,35 @@ class BilibiliClient:
         return uid_str[:2] + "*" * (len(uid_str) - 2)
 
 
+class TaskNode:
+    """任务依赖图中的节点
+
+    Attributes:
+        deps: 依赖的节点名称，依赖的结果按顺序作为参数传入
+        func: 同步执行函数
+        func_async: 异步执行函数（返回协程），参数同 func
+    """
+
+    __slots__ = ("deps", "func", "func_async")
+
+    def __init__(
+        self,
+        deps: tuple[str, ...],
+        func: Callable[..., Any],
+        func_async: Callable[..., Awaitable[Any]],
+    ) -> None:
+        self.deps = deps
+        self.func = func
+        self.func_async = func_async
+
+
 class TaskRunner:
-    """任务执行器"""
+    """任务执行器
+
+    各任务组成一个依赖图：分享和观看依赖视频列表和今日经验奖励状态（已领取
+    奖励时不再发送请求），投币依赖今日经验奖励状态（计算剩余投币数量），
+    直播签到和漫画签到没有依赖，依赖已满足的任务并发执行。
+    """
 
     def __init__(
         self,
@@ -348,6 +968,165 @@ class TaskRunner:
         self.coin_select_like = coin_select_like
         self.coin_video_source = coin_video_source
 
+    def build_graph(self, user_info: dict[str, Any]) -> dict[str, TaskNode]:
+        """构造任务依赖图
+
+        除视频列表和奖励状态节点外，节点名称即任务结果中的名称，按结果的输出顺序排列，
+        且每个节点排在它依赖的节点之后。
+
+        Args:
+            user_info: 用户信息
+
+        Returns:
+            节点名称到节点的映射
+        """
+        client = self.client
+        graph = {
+            VIDEOS_NODE: TaskNode(
+                (),
+                lambda: client.get_videos("dynamic"),
+                lambda: client.get_videos_async("dynamic"),
+            ),
+            REWARD_NODE: TaskNode(
+                (), client.get_daily_reward, client.get_daily_reward_async
+            ),
+        }
+        if "share_video" in self.tasks_to_run:
+            graph["分享视频"] = TaskNode(
+                (VIDEOS_NODE, REWARD_NODE), self.share_video, self.share_video_async
+            )
+        if "live_sign" in self.tasks_to_run:
+            graph["直播签到"] = TaskNode((), client.live_sign, client.live_sign_async)
+        if "manga_sign" in self.tasks_to_run:
+            graph["漫画签到"] = TaskNode((), client.manga_sign, client.manga_sign_async)
+        if "add_coin" in self.tasks_to_run:
+            coin_args = (
+                user_info,
+                self.coin_add_num,
+                self.coin_select_like,
+                self.coin_video_source,
+            )
+            # 投币数量按今日已获得的投币经验计算
+            graph["投币任务"] = TaskNode(
+                (REWARD_NODE,),
+                lambda reward: client.execute_coin_task(
+                    *coin_args, reward.get("coins")
+                ),
+                lambda reward: client.execute_coin_task_async(
+                    *coin_args, reward.get("coins")
+                ),
+            )
+        # 观看视频（始终执行，今日已领取观看经验时跳过请求）
+        graph["观看视频"] = TaskNode(
+            (VIDEOS_NODE, REWARD_NODE), self.watch_video, self.watch_video_async
+        )
+        return graph
+
+    @staticmethod
+    def _task_bvid(videos: list[str]) -> str:
+        """用于分享和观看的视频"""
+        return videos[0] if videos else DEFAULT_BVID
+
+    def share_video(
+        self, videos: list[str], reward: dict[str, Any]
+    ) -> tuple[bool, str]:
+        """分享视频，今日已领取分享经验时不发送请求
+
+        Args:
+            videos: 视频 bvid 列表
+            reward: 今日经验奖励状态
+
+        Returns:
+            (是否成功, 消息)
+        """
+        if reward.get("share"):
+            return True, "今日分享经验已领取"
+        return self.client.share_video(self._task_bvid(videos))
+
+    async def share_video_async(
+        self, videos: list[str], reward: dict[str, Any]
+    ) -> tuple[bool, str]:
+        """异步分享视频，参数和返回值同 share_video()"""
+        if reward.get("share"):
+            return True, "今日分享经验已领取"
+        return await self.client.share_video_async(self._task_bvid(videos))
+
+    def watch_video(
+        self, videos: list[str], reward: dict[str, Any]
+    ) -> tuple[bool, str]:
+        """观看视频，今日已领取观看经验时不发送请求
+
+        Args:
+            videos: 视频 bvid 列表
+            reward: 今日经验奖励状态
+
+        Returns:
+            (是否成功, 消息)
+        """
+        if reward.get("watch"):
+            return True, "今日观看经验已领取"
+        return self.client.watch_video(self._task_bvid(videos))
+
+    async def watch_video_async(
+        self, videos: list[str], reward: dict[str, Any]
+    ) -> tuple[bool, str]:
+        """异步观看视频，参数和返回值同 watch_video()"""
+        if reward.get("watch"):
+            return True, "今日观看经验已领取"
+        return await self.client.watch_video_async(self._task_bvid(videos))
+
+    @staticmethod
+    def run_graph(graph: dict[str, TaskNode]) -> dict[str, Any]:
+        """在线程池中执行任务依赖图，依赖已满足的节点并发执行
+
+        Args:
+            graph: 任务依赖图
+
+        Returns:
+            节点名称到结果的映射（按依赖图中的顺序）
+
+        Raises:
+            ValueError: 依赖图中有环或依赖不存在的节点
+        """
+        results: dict[str, Any] = {}
+        waiting = dict(graph)
+        running: dict[Future[Any], str] = {}
+        with ThreadPoolExecutor(
+            max_workers=TASK_WORKERS, thread_name_prefix="bilibili-task"
+        ) as pool:
+            while waiting or running:
+                for name, node in list(waiting.items()):
+                    if all(dep in results for dep in node.deps):
+                        del waiting[name]
+                        args = [results[dep] for dep in node.deps]
+                        running[submit_in_context(pool, node.func, *args)] = name
+                if not running:
+                    raise ValueError(f"任务依赖无法满足: {', '.join(waiting)}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        # 按依赖图中的顺序返回，与完成顺序无关
+        return {name: results[name] for name in graph}
+
+    @staticmethod
+    async def run_graph_async(graph: dict[str, TaskNode]) -> dict[str, Any]:
+        """在事件循环中执行任务依赖图，参数和返回值同 run_graph()"""
+        import asyncio
+
+        tasks: dict[str, asyncio.Future[Any]] = {}
+
+        async def run_node(node: TaskNode) -> Any:
+            args = [await tasks[dep] for dep in node.deps]
+            return await node.func_async(*args)
+
+        for name, node in graph.items():
+            missing = [dep for dep in node.deps if dep not in tasks]
+            if missing:
+                raise ValueError(f"任务依赖无法满足: {name}")
+            tasks[name] = asyncio.ensure_future(run_node(node))
+        results = await asyncio.gather(*tasks.values())
+        return dict(zip(tasks.keys(), results))
+
     def run(self) -> tuple[dict[str, tuple[bool, str]], Union[dict[str, Any], None]]:
         """执行所有任务
 
@@ -361,31 +1140,31 @@ class TaskRunner:
         masked_uname = self.client.mask_string(user_info.get("uname", ""))
         logger.info(f"账号名称: {masked_uname}")
 
-        tasks_result: dict[str, tuple[bool, str]] = {}
+        results = self.run_graph(self.build_graph(user_info))
+        return self._tasks_result(results), user_info
 
-        # 获取用于分享和观看的视频
-        video_list = self.client.get_dynamic_videos()
-        bvid_for_task = video_list[0] if video_list else DEFAULT_BVID
+    async def run_async(
+        self,
+    ) -> tuple[dict[str, tuple[bool, str]], Union[dict[str, Any], None]]:
+        """异步执行所有任务，返回值同 run()"""
+        user_info = await self.client.get_user_info_async()
+        if not user_info:
+            return {"登录检查": (False, "Cookie失效或网络问题")}, None
 
-        # 执行各项任务
-        if "share_video" in self.tasks_to_run:
-            tasks_result["分享视频"] = self.client.share_video(bvid_for_task)
-        if "live_sign" in self.tasks_to_run:
-            tasks_result["直播签到"] = self.client.live_sign()
-        if "manga_sign" in self.tasks_to_run:
-            tasks_result["漫画签到"] = self.client.manga_sign()
-        if "add_coin" in self.tasks_to_run:
-            tasks_result["投币任务"] = self.client.execute_coin_task(
-                user_info,
-                self.coin_add_num,
-                self.coin_select_like,
-                self.coin_video_source,
-            )
+        masked_uname = self.client.mask_string(user_info.get("uname", ""))
+        logger.info(f"账号名称: {masked_uname}")
 
-        # 观看视频（始终执行）
-        tasks_result["观看视频"] = self.client.watch_video(bvid_for_task)
+        results = await self.run_graph_async(self.build_graph(user_info))
+        return self._tasks_result(results), user_info
 
-        return tasks_result, user_info
+    @staticmethod
+    def _tasks_result(results: dict[str, Any]) -> dict[str, tuple[bool, str]]:
+        """按依赖图中的顺序组装任务结果（去掉视频列表和奖励状态节点）"""
+        return {
+            name: result
+            for name, result in results.items()
+            if name not in (VIDEOS_NODE, REWARD_NODE)
+        }
 
 
 class App:
@@ -393,23 +1172,23 @@ class App:
 
     def __init__(self) -> None:
         """初始化应用"""
-        self.cookies: list[str] = []
+        self.accounts = AccountSource(ENV_COOKIES)
         self.task_config = DEFAULT_TASK_CONFIG
         self.coin_add_num = int(DEFAULT_COIN_ADD_NUM)
         self.coin_select_like = int(DEFAULT_COIN_SELECT_LIKE)
         self.coin_video_source = DEFAULT_COIN_VIDEO_SOURCE
+        # 所有账号共用的视频池
+        self.video_pool = VideoPool()
+        self.verify_user_info = os.environ.get(ENV_VERIFY_USER_INFO) == "1"
 
     def load_config(self) -> None:
-        """从环境变量加载配置"""
-        raw_cookies = os.environ.get(ENV_COOKIES, "")
-        if not raw_cookies:
+        """检查账号配置（环境变量或账号文件）"""
+        if not self.accounts.configured:
             logger.error(f'请设置 {ENV_COOKIES} 环境变量, {ENV_COOKIES}="c1||c2"')
+            logger.error(f"或通过 {self.accounts.file_env} 指定 JSONL/TOML 账号文件")
             sys.exit(1)
 
-        for cookie in raw_cookies.split("||"):
-            cookie = cookie.strip()
-            self.cookies.append(cookie)
-        logger.info(f"加载了 {len(self.cookies)} 个账号")
+        logger.info(f"从 {self.accounts.describe()} 加载了 {len(self.accounts)} 个账号")
 
     def print_user_info(self, user_info: dict[str, Any], account_index: int) -> None:
         """打印用户信息
@@ -437,7 +1216,7 @@ class App:
         """
         logger.info(f"=== 账号{account_index} 任务完成情况 ===")
 
-        client = BilibiliClient(cookie)
+        client = BilibiliClient(cookie, self.video_pool, account_index - 1)
         runner = TaskRunner(
             client,
             self.task_config,
@@ -447,8 +1226,56 @@ class App:
         )
 
         tasks_result, user_info = runner.run()
-        final_user_info = client.get_user_info() if user_info else None
+        final_user_info = None
+        if user_info and self.verify_user_info:
+            final_user_info = client.get_user_info()
+        elif user_info:
+            final_user_info = client.update_user_info(user_info, tasks_result)
+        return self.report_account(
+            tasks_result, user_info, final_user_info, account_index
+        )
+
+    async def run_account_async(self, cookie: str, account_index: int) -> bool:
+        """异步运行单个账号的任务，参数和返回值同 run_account()"""
+        logger.info(f"=== 账号{account_index} 任务完成情况 ===")
+
+        client = BilibiliClient(cookie, self.video_pool, account_index - 1)
+        runner = TaskRunner(
+            client,
+            self.task_config,
+            self.coin_add_num,
+            self.coin_select_like,
+            self.coin_video_source,
+        )
 
+        tasks_result, user_info = await runner.run_async()
+        final_user_info = None
+        if user_info and self.verify_user_info:
+            final_user_info = await client.get_user_info_async()
+        elif user_info:
+            final_user_info = client.update_user_info(user_info, tasks_result)
+        return self.report_account(
+            tasks_result, user_info, final_user_info, account_index
+        )
+
+    def report_account(
+        self,
+        tasks_result: dict[str, tuple[bool, str]],
+        user_info: Union[dict[str, Any], None],
+        final_user_info: Union[dict[str, Any], None],
+        account_index: int,
+    ) -> bool:
+        """输出单个账号的任务结果
+
+        Args:
+            tasks_result: 任务结果字典
+            user_info: 任务执行前的用户信息
+            final_user_info: 任务执行后的用户信息（重新请求或按任务结果更新）
+            account_index: 账号索引
+
+        Returns:
+            是否全部成功
+        """
         # 统计结果
         account_failed = False
         valid_task_count = 0
@@ -478,8 +1305,12 @@ class App:
             else:
                 logger.error(f"[账号{account_index}] {task_name}: 失败，原因: {msg}")
 
-        # 判断账号是否失败
-        if not user_info or valid_task_count == 0 or valid_success_count == 0:
+        # 判断账号是否失败：有任一有效任务失败时不记为今日已完成，重跑时会再次执行
+        if (
+            not user_info
+            or valid_task_count == 0
+            or valid_success_count < valid_task_count
+        ):
             account_failed = True
 
         # 输出用户信息
@@ -493,33 +1324,73 @@ class App:
 
         return not account_failed
 
+    def checkin_account(self, account: Account, idx: int) -> bool:
+        """运行单个账号的任务并处理异常
+
+        Args:
+            account: 账号
+            idx: 账号序号
+
+        Returns:
+            是否全部任务成功
+        """
+        try:
+            return self.run_account(account.cookie, idx)
+
+        except Exception:
+            logger.error(
+                f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                "bilibili 签到失败",
+                f"账号 {idx}: 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
+
+    async def checkin_account_async(self, account: Account, idx: int) -> bool:
+        """异步运行单个账号的任务并处理异常，参数和返回值同 checkin_account()"""
+        try:
+            return await self.run_account_async(account.cookie, idx)
+
+        except Exception:
+            logger.error(
+                f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                "bilibili 签到失败",
+                f"账号 {idx}: 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
+
     def run(self) -> None:
         """运行所有账号任务"""
         self.load_config()
 
-        success_count = 0
-        for idx, cookie in enumerate(self.cookies, 1):
-            try:
-                self.run_account(cookie, idx)
-                success_count += 1
-
-            except Exception:
-                logger.error(
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
-                )
-                notifier = XizhiNotifier()
-                notifier.send(
-                    "bilibili 签到失败",
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}",
-                )
-            finally:
-                logger.info("=" * 40)
+        success_count = run_accounts(
+            self.checkin_account, self.accounts, platform="bilibili"
+        )
+        logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
 
-        logger.info(f"签到完成: 成功 {success_count}/{len(self.cookies)}")
+    async def run_async(self) -> None:
+        """在当前事件循环中异步运行所有账号任务"""
+        self.load_config()
+
+        success_count = await run_accounts_async(
+            self.checkin_account_async, self.accounts, platform="bilibili"
+        )
+        logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
 
 
 def main() -> None:
     """主函数"""
+    setup_logging()
+    apply_shard_option()
     app = App()
     app.run()
 
@@ -6,19 +6,19 @@ https://glados.cloud/
 
 import json
 import logging
-import os
 import sys
 import traceback
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-import requests
+from utils.accounts import Account, AccountSource
+from utils.concurrency import run_accounts
+from utils.log import setup_logging
 from utils.notify import XizhiNotifier
+from utils.shard import apply_shard_option
+
+if TYPE_CHECKING:
+    from utils.transport import PooledSession
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 # 环境变量
@@ -44,20 +44,23 @@ class GladosClient:
 
     def __init__(self) -> None:
         """初始化客户端"""
-        self.cookies: list[str] = []
+        self.accounts = AccountSource(ENV_COOKIES)
+
+    @property
+    def session(self) -> "PooledSession":
+        """共享的连接池会话（首次发送请求时才导入 requests）"""
+        from utils.transport import get_session
+
+        return get_session()
 
     def load_cookies(self) -> None:
-        """从环境变量加载 cookies"""
-        raw_cookies = os.environ.get(ENV_COOKIES)
-        if not raw_cookies:
+        """检查 cookies 配置（环境变量或账号文件）"""
+        if not self.accounts.configured:
             logger.error(f'请设置 {ENV_COOKIES} 环境变量, 格式: {ENV_COOKIES}="c1||c2"')
+            logger.error(f"或通过 {self.accounts.file_env} 指定 JSONL/TOML 账号文件")
             sys.exit(1)
 
-        for cookie in raw_cookies.split("||"):
-            cookie = cookie.strip()
-            self.cookies.append(cookie)
-
-        logger.info(f"加载了 {len(self.cookies)} 个 Cookie")
+        logger.info(f"从 {self.accounts.describe()} 加载了 {len(self.accounts)} 个 Cookie")
 
     def get_user_status(self, cookie: str) -> Optional[Dict[str, Any]]:
         """获取用户状态信息
@@ -68,7 +71,7 @@ class GladosClient:
         Returns:
             用户信息字典，包含 email 和 leftDays
         """
-        response = requests.get(
+        response = self.session.get(
             STATUS_URL,
             headers={**HEADERS, "cookie": cookie},
         )
@@ -85,7 +88,7 @@ class GladosClient:
         Returns:
             当前积分，获取失败返回 0
         """
-        response = requests.get(
+        response = self.session.get(
             POINTS_URL,
             headers={**HEADERS, "cookie": cookie},
         )
@@ -103,7 +106,7 @@ class GladosClient:
         Returns:
             签到结果消息
         """
-        response = requests.post(
+        response = self.session.post(
             CHECKIN_URL,
             headers={**HEADERS, "cookie": cookie},
             data=json.dumps(CHECKIN_DATA),
@@ -120,46 +123,61 @@ class GladosClient:
         else:
             raise ValueError(f"签到失败: {message}")
 
+    def run_account(self, account: Account, idx: int) -> bool:
+        """执行单个账号签到
+
+        Args:
+            account: 账号
+            idx: 账号序号
+
+        Returns:
+            是否签到成功
+        """
+        cookie = account.cookie
+        try:
+            logger.info(f"账号 [{idx}/{len(self.accounts)}]: 签到中...")
+            # 签到操作
+            result = self.checkin(cookie)
+            logger.info(f"账号 {idx}: {result}")
+
+            # 获取用户信息
+            status = self.get_user_status(cookie) or {}
+            # 获取当前积分
+            points = self.get_user_points(cookie) or -1
+            email = status["email"]
+            leftDays = int(float(status["leftDays"]))
+            logger.info(
+                f"账号 {idx}: 邮箱: {email}, 剩余天数: {leftDays}, 当前积分: {points}"
+            )
+            return True
+
+        except Exception:
+            logger.error(
+                f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                "GLaDOS 签到失败",
+                f"账号 {idx}: 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
+
     def run(self) -> None:
         """执行所有账号签到"""
         self.load_cookies()
 
-        success_count = 0
-        for idx, cookie in enumerate(self.cookies, 1):
-            try:
-                logger.info(f"账号 [{idx}/{len(self.cookies)}]: 签到中...")
-                # 签到操作
-                result = self.checkin(cookie)
-                logger.info(f"账号 {idx}: {result}")
-
-                # 获取用户信息
-                status = self.get_user_status(cookie) or {}
-                # 获取当前积分
-                points = self.get_user_points(cookie) or -1
-                email = status["email"]
-                leftDays = int(float(status["leftDays"]))
-                logger.info(
-                    f"账号 {idx}: 邮箱: {email}, 剩余天数: {leftDays}, 当前积分: {points}"
-                )
-                success_count += 1
-
-            except Exception:
-                logger.error(
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
-                )
-                notifier = XizhiNotifier()
-                notifier.send(
-                    "GLaDOS 签到失败",
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}",
-                )
-            finally:
-                logger.info("=" * 40)
-
-        logger.info(f"签到完成: 成功 {success_count}/{len(self.cookies)}")
+        success_count = run_accounts(
+            self.run_account, self.accounts, platform="glados"
+        )
+        logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
 
 
 def main():
     """主函数"""
+    setup_logging()
+    apply_shard_option()
     client = GladosClient()
     client.run()
 
@@ -6,22 +6,21 @@ https://creditcardapp.bankcomm.com/
 
 import json
 import logging
-import os
 import sys
 import traceback
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Tuple
 
-import requests
-import ssl
-import urllib3
+from utils.accounts import Account, AccountSource
+from utils.concurrency import run_accounts
+from utils.log import setup_logging
 from utils.notify import XizhiNotifier
+from utils.shard import apply_shard_option
 
+if TYPE_CHECKING:
+    from requests.adapters import HTTPAdapter
+
+    from utils.transport import PooledSession
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 # 环境变量
@@ -29,7 +28,8 @@ logger = logging.getLogger(__name__)
 ENV_ACCOUNTS = "MAIDANBA_ACCOUNTS"
 
 # API 配置
-BASE_URL = "https://creditcardapp.bankcomm.com/mdlweb"
+BASE_ORIGIN = "https://creditcardapp.bankcomm.com"
+BASE_URL = f"{BASE_ORIGIN}/mdlweb"
 SIGN_DATA_URL = f"{BASE_URL}/sign/data"
 SIGN_URL = f"{BASE_URL}/sign/sign"
 
@@ -47,13 +47,20 @@ HEADERS = {
 }
 
 
-# 在文件开头添加
-class SSLContextAdapter(requests.adapters.HTTPAdapter):
-    def init_poolmanager(self, *args, **kwargs):
-        ctx = ssl.create_default_context()
-        ctx.options |= 0x4  # OP_LEGACY_SERVER_CONNECT
-        kwargs["ssl_context"] = ctx
-        return super().init_poolmanager(*args, **kwargs)
+def _legacy_ssl_adapter() -> "HTTPAdapter":
+    """创建允许旧版 TLS 重协商的适配器（首次发送请求时才导入 requests）"""
+    import ssl
+
+    from utils.transport import TimedHTTPAdapter
+
+    class SSLContextAdapter(TimedHTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            ctx = ssl.create_default_context()
+            ctx.options |= 0x4  # OP_LEGACY_SERVER_CONNECT
+            kwargs["ssl_context"] = ctx
+            return super().init_poolmanager(*args, **kwargs)
+
+    return SSLContextAdapter()
 
 
 class MaidanbaClient:
@@ -61,45 +68,47 @@ class MaidanbaClient:
 
     def __init__(self) -> None:
         """初始化客户端"""
-        self.accounts: list[Dict[str, str]] = []
-        self.task_id: str = ""
+        self.accounts = AccountSource(ENV_ACCOUNTS, ("cookie", "token"), "#")
+        self._adapter_mounted = False
 
-    def load_config(self) -> None:
-        """从环境变量加载配置"""
-        raw_accounts = os.environ.get(ENV_ACCOUNTS)
+    @property
+    def session(self) -> "PooledSession":
+        """共享的连接池会话（首次发送请求时才导入 requests 并挂载适配器）"""
+        from utils.transport import get_session, mount_adapter
+
+        if not self._adapter_mounted:
+            mount_adapter(BASE_ORIGIN, _legacy_ssl_adapter())
+            self._adapter_mounted = True
+        return get_session()
 
-        if not raw_accounts:
+    def load_config(self) -> None:
+        """检查账号配置（环境变量或账号文件）"""
+        if not self.accounts.configured:
             logger.error(
                 f'请设置环境变量:\n  {ENV_ACCOUNTS}="cookie1#token1||cookie2#token2"'
             )
+            logger.error(f"或通过 {self.accounts.file_env} 指定 JSONL/TOML 账号文件")
             sys.exit(1)
 
-        for account_str in raw_accounts.split("||"):
-            account_str = account_str.strip()
-            if "#" not in account_str:
-                logger.error(f"账号格式错误，应为 cookie#token: {account_str[:20]}...")
-                sys.exit(1)
-            cookie, token = account_str.split("#", 1)
-            self.accounts.append({"cookie": cookie.strip(), "token": token.strip()})
+        logger.info(f"从 {self.accounts.describe()} 加载了 {len(self.accounts)} 个账号")
 
-        logger.info(f"加载了 {len(self.accounts)} 个账号")
-
-    def get_sign_data(self, cookie: str, token: str) -> Optional[Dict[str, Any]]:
+    def get_sign_data(
+        self, cookie: str, token: str, task_id: str = ""
+    ) -> Tuple[Dict[str, Any], str]:
         """获取签到信息
 
         Args:
             cookie: Cookie 字符串
             token: Token 字符串
+            task_id: 上次返回的 taskId，首次获取时为空
 
         Returns:
-            签到信息字典
+            (签到信息字典, taskId)，未返回新的 taskId 时沿用传入的值
         """
         url = f"{SIGN_DATA_URL}?token={token}"
-        payload = {"taskShowCd": "00", "taskId": self.task_id}
+        payload = {"taskShowCd": "00", "taskId": task_id}
 
-        session = requests.Session()
-        session.mount("https://", SSLContextAdapter())
-        response = session.post(
+        response = self.session.post(
             url,
             headers={**HEADERS, "Cookie": cookie},
             data=json.dumps(payload),
@@ -109,27 +118,25 @@ class MaidanbaClient:
         if data.get("returnCode") != "000000":
             raise ValueError(f"获取签到信息失败: {data.get('returnMsg')}")
 
-        # 更新 taskId（如果返回了新的）
-        result = data.get("data", {})
-        if result.get("taskId"):
-            self.task_id = result["taskId"]
-
-        return result
+        # taskId 因账号而异，由调用方传给 checkin，不保存在共享的客户端上
+        result = data.get("data") or {}
+        return result, result.get("taskId") or task_id
 
-    def checkin(self, cookie: str, token: str) -> str:
+    def checkin(self, cookie: str, token: str, task_id: str) -> str:
         """执行签到
 
         Args:
             cookie: Cookie 字符串
             token: Token 字符串
+            task_id: get_sign_data 返回的 taskId
 
         Returns:
             签到结果消息
         """
         url = f"{SIGN_URL}?token={token}"
-        payload = {"taskShowCd": "00", "taskId": self.task_id}
+        payload = {"taskShowCd": "00", "taskId": task_id}
 
-        response = requests.post(
+        response = self.session.post(
             url,
             headers={**HEADERS, "Cookie": cookie},
             data=json.dumps(payload),
@@ -146,55 +153,68 @@ class MaidanbaClient:
         else:
             raise ValueError(f"签到失败: {return_msg}")
 
+    def run_account(self, account: Account, idx: int) -> bool:
+        """执行单个账号签到
+
+        Args:
+            account: 账号，包含 cookie 和 token
+            idx: 账号序号
+
+        Returns:
+            是否签到成功
+        """
+        cookie = account.cookie
+        token = account.token
+
+        try:
+            logger.info(f"账号 [{idx}/{len(self.accounts)}]: 签到中...")
+
+            # 获取签到信息及 taskId
+            sign_data, task_id = self.get_sign_data(cookie, token)
+            total_days = sign_data.get("totalDays", 0)
+            sign_sts = sign_data.get("signSts", "0")
+
+            if sign_sts == "1":
+                logger.info(f"账号 {idx}: 今日已签到，累计签到 {total_days} 天")
+                return True
+
+            # 执行签到
+            result = self.checkin(cookie, token, task_id)
+            logger.info(f"账号 {idx}: {result}")
+
+            # 再次获取签到信息
+            sign_data, _ = self.get_sign_data(cookie, token, task_id)
+            total_days = sign_data.get("totalDays", 0)
+            logger.info(f"账号 {idx}: 累计签到 {total_days} 天")
+            return True
+
+        except Exception:
+            logger.error(
+                f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                "买单吧签到失败",
+                f"账号 {idx}: 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
+
     def run(self) -> None:
         """执行所有账号签到"""
         self.load_config()
 
-        success_count = 0
-        for idx, account in enumerate(self.accounts, 1):
-            cookie = account["cookie"]
-            token = account["token"]
-
-            try:
-                logger.info(f"账号 [{idx}/{len(self.accounts)}]: 签到中...")
-
-                # 获取签到信息（同时更新 taskId）
-                sign_data = self.get_sign_data(cookie, token) or {}
-                total_days = sign_data.get("totalDays", 0)
-                sign_sts = sign_data.get("signSts", "0")
-
-                if sign_sts == "1":
-                    logger.info(f"账号 {idx}: 今日已签到，累计签到 {total_days} 天")
-                    success_count += 1
-                    continue
-
-                # 执行签到
-                result = self.checkin(cookie, token)
-                logger.info(f"账号 {idx}: {result}")
-
-                # 再次获取签到信息
-                sign_data = self.get_sign_data(cookie, token) or {}
-                total_days = sign_data.get("totalDays", 0)
-                logger.info(f"账号 {idx}: 累计签到 {total_days} 天")
-                success_count += 1
-
-            except Exception:
-                logger.error(
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
-                )
-                notifier = XizhiNotifier()
-                notifier.send(
-                    "买单吧签到失败",
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}",
-                )
-            finally:
-                logger.info("=" * 40)
-
+        success_count = run_accounts(
+            self.run_account, self.accounts, platform="maidanba"
+        )
         logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
 
 
 def main():
     """主函数"""
+    setup_logging()
+    apply_shard_option()
     client = MaidanbaClient()
     client.run()
 
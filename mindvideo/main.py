@@ -7,23 +7,21 @@ https://www.mindvideo.ai/
 import hashlib
 import json
 import logging
-import os
-import random
-import string
 import sys
 import time
 import traceback
-from base64 import b64encode
-
-import requests
+from typing import TYPE_CHECKING
 
+from utils.accounts import Account, AccountSource
+from utils.concurrency import run_accounts
+from utils.credentials import CredentialCache, raise_if_rejected
+from utils.log import setup_logging
 from utils.notify import XizhiNotifier
+from utils.shard import apply_shard_option
+
+if TYPE_CHECKING:
+    from utils.transport import PooledSession
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 # 环境变量
@@ -50,6 +48,9 @@ HEADERS = {
 
 def generate_nonce(length: int = 16) -> str:
     """生成随机 nonce 字符串"""
+    import random
+    import string
+
     chars = string.ascii_letters + string.digits
     return "".join(random.choice(chars) for _ in range(length))
 
@@ -75,6 +76,8 @@ def generate_i_sign() -> str:
     Returns:
         base64 编码的 JSON 字符串
     """
+    from base64 import b64encode
+
     nonce = generate_nonce()
     timestamp = int(time.time() * 1000)
     sign = generate_sign(nonce, timestamp)
@@ -89,29 +92,27 @@ class MindVideoClient:
 
     def __init__(self) -> None:
         """初始化客户端"""
-        self.accounts: list[dict[str, str]] = []
+        self.accounts = AccountSource(ENV_ACCOUNTS, ("username", "password"))
+        # 按邮箱缓存 access token
+        self.credentials = CredentialCache("mindvideo")
 
-    def load_config(self) -> None:
-        """从环境变量加载配置"""
-        raw_accounts = os.environ.get(ENV_ACCOUNTS)
+    @property
+    def session(self) -> "PooledSession":
+        """共享的连接池会话（首次发送请求时才导入 requests）"""
+        from utils.transport import get_session
+
+        return get_session()
 
-        if not raw_accounts:
+    def load_config(self) -> None:
+        """检查账号配置（环境变量或账号文件）"""
+        if not self.accounts.configured:
             logger.error(
                 f'请设置环境变量:\n  {ENV_ACCOUNTS}="email1:password1||email2:password2"'
             )
+            logger.error(f"或通过 {self.accounts.file_env} 指定 JSONL/TOML 账号文件")
             sys.exit(1)
 
-        for account_str in raw_accounts.split("||"):
-            account_str = account_str.strip()
-            if ":" not in account_str:
-                logger.error(
-                    f"账号格式错误，应为 email:password: {account_str[:20]}..."
-                )
-                sys.exit(1)
-            email, password = account_str.split(":", 1)
-            self.accounts.append({"email": email.strip(), "password": password.strip()})
-
-        logger.info(f"加载了 {len(self.accounts)} 个账号")
+        logger.info(f"从 {self.accounts.describe()} 加载了 {len(self.accounts)} 个账号")
 
     def login(self, email: str, password: str) -> str:
         """登录获取 Token
@@ -126,7 +127,7 @@ class MindVideoClient:
         headers = {**HEADERS, "i-sign": generate_i_sign()}
         payload = {"email": email, "password": password}
 
-        response = requests.post(LOGIN_URL, headers=headers, json=payload, timeout=30)
+        response = self.session.post(LOGIN_URL, headers=headers, json=payload)
         data = response.json()
         if data.get("code") != 0:
             raise ValueError(f"登录失败: {data.get('message', data)}")
@@ -145,6 +146,9 @@ class MindVideoClient:
 
         Returns:
             签到结果消息
+
+        Raises:
+            CredentialRejected: Token 已失效
         """
         headers = {
             **HEADERS,
@@ -152,55 +156,69 @@ class MindVideoClient:
             "i-sign": generate_i_sign(),
         }
 
-        response = requests.post(CHECKIN_URL, headers=headers, timeout=30)
+        response = self.session.post(CHECKIN_URL, headers=headers)
         data = response.json()
+        raise_if_rejected(response, data.get("code"))
         if data.get("code") == 0:
             return data.get("message", "签到成功")
         else:
             return f"签到失败: {data.get('message', data)}"
 
-    def run(self) -> None:
-        """执行所有账号签到"""
-        self.load_config()
+    def run_account(self, account: Account, idx: int) -> bool:
+        """执行单个账号签到
 
-        success_count = 0
-        for idx, account in enumerate(self.accounts, 1):
-            email = account["email"]
-            password = account["password"]
-            password = hashlib.md5(password.encode()).hexdigest()
+        Args:
+            account: 账号，username 为邮箱
+            idx: 账号序号
+
+        Returns:
+            是否签到成功
+        """
+        email = account.username
+        password = account.password
+        password = hashlib.md5(password.encode()).hexdigest()
 
-            try:
-                logger.info(f"账号 [{idx}/{len(self.accounts)}] {email}: 登录中...")
+        try:
+            logger.info(f"账号 [{idx}/{len(self.accounts)}] {email}: 签到中...")
 
-                # 登录获取 Token
+            def login() -> str:
+                logger.info(f"账号 {idx}: 登录中...")
                 token = self.login(email, password)
                 logger.info(f"账号 {idx}: 登录成功")
+                return token
+
+            # 优先使用缓存的 Token 签到，失效时重新登录
+            result = self.credentials.call(email, login, self.checkin)
+            logger.info(f"账号 {idx}: {result}")
+            return True
+
+        except Exception:
+            logger.error(
+                f"账号 {idx} ({email}): 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                "MindVideo 签到失败",
+                f"账号 {idx} ({email}): 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
 
-                # 执行签到
-                result = self.checkin(token)
-                logger.info(f"账号 {idx}: {result}")
-                success_count += 1
-
-            except Exception:
-                logger.error(
-                    f"账号 {idx} ({email}): 签到失败, 错误信息: {traceback.format_exc()}"
-                )
-                try:
-                    notifier = XizhiNotifier()
-                    notifier.send(
-                        "MindVideo 签到失败",
-                        f"账号 {idx} ({email}): 签到失败, 错误信息: {traceback.format_exc()}",
-                    )
-                except Exception:
-                    logger.warning("发送通知失败")
-            finally:
-                logger.info("=" * 40)
+    def run(self) -> None:
+        """执行所有账号签到"""
+        self.load_config()
 
+        success_count = run_accounts(
+            self.run_account, self.accounts, platform="mindvideo"
+        )
         logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
 
 
 def main():
     """主函数"""
+    setup_logging()
+    apply_shard_option()
     client = MindVideoClient()
     client.run()
 
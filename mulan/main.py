@@ -5,19 +5,20 @@ https://mulan.pro
 """
 
 import logging
-import os
 import sys
 import traceback
-from typing import Any
+from typing import TYPE_CHECKING, Any, Optional
 
-import requests
+from utils.accounts import Account, AccountSource
+from utils.concurrency import run_accounts, run_accounts_async
+from utils.credentials import CredentialCache, raise_if_rejected
+from utils.log import setup_logging
 from utils.notify import XizhiNotifier
+from utils.shard import apply_shard_option
+
+if TYPE_CHECKING:
+    from utils.transport import PooledSession
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 # 环境变量
@@ -41,49 +42,32 @@ WORKFLOW_RUN_URL = "https://api3.mulan.pro/manage/v1/workflows/run"
 HEADERS = {"Content-Type": "application/json"}
 
 
-class Account:
-    """账号信息"""
-
-    def __init__(self, email: str, password: str) -> None:
-        """初始化账号信息
-
-        Args:
-            email: 邮箱
-            password: 密码
-        """
-        self.email = email
-        self.password = password
-        self.token: str = ""
-
-    def __repr__(self) -> str:
-        return f"Account(email={self.email})"
-
-
 class MulanClient:
     """木兰签到客户端"""
 
     def __init__(self) -> None:
         """初始化客户端"""
-        self.accounts: list[Account] = []
+        self.accounts = AccountSource(ENV_ACCOUNTS, ("username", "password"))
+        # 按邮箱缓存 access token
+        self.credentials = CredentialCache("mulan")
+
+    @property
+    def session(self) -> "PooledSession":
+        """共享的连接池会话（首次发送请求时才导入 requests）"""
+        from utils.transport import get_session
+
+        return get_session()
 
     def load_accounts(self) -> None:
-        """从环境变量加载账号列表"""
-        accounts_str = os.environ.get(ENV_ACCOUNTS, "")
-        if not accounts_str:
+        """检查账号配置（环境变量或账号文件）"""
+        if not self.accounts.configured:
             logger.error(
                 f'请设置 {ENV_ACCOUNTS} 环境变量, 格式: {ENV_ACCOUNTS}="email1:password1||email2:password2"'
             )
+            logger.error(f"或通过 {self.accounts.file_env} 指定 JSONL/TOML 账号文件")
             sys.exit(1)
 
-        for account in accounts_str.split("||"):
-            account = account.strip()
-            if ":" not in account:
-                logger.error(f"账号格式不正确: {account}, 正确格式: email:password")
-                continue
-            email, password = account.split(":", 1)
-            self.accounts.append(Account(email.strip(), password.strip()))
-
-        logger.info(f"加载了 {len(self.accounts)} 个账号")
+        logger.info(f"从 {self.accounts.describe()} 加载了 {len(self.accounts)} 个账号")
 
     def login(self, account: Account) -> None:
         """登录获取 token
@@ -94,20 +78,44 @@ class MulanClient:
         Raises:
             RuntimeError: 登录失败时抛出异常
         """
-        response = requests.post(
+        response = self.session.post(
             LOGIN_URL,
-            json={"email": account.email, "password": account.password},
+            json={"email": account.username, "password": account.password},
             headers=HEADERS,
         )
         response.raise_for_status()
+        account.token = self._parse_access_token(response.json())
 
-        result = response.json()
+    async def login_async(self, account: Account) -> None:
+        """异步登录获取 token，参数同 login()"""
+        from utils.aio import get_async_session
+
+        response = await get_async_session().post(
+            LOGIN_URL,
+            json={"email": account.username, "password": account.password},
+            headers=HEADERS,
+        )
+        response.raise_for_status()
+        account.token = self._parse_access_token(response.json())
+
+    def _parse_access_token(self, result: dict[str, Any]) -> str:
+        """从登录响应中提取 access_token
+
+        Args:
+            result: 登录响应 JSON
+
+        Returns:
+            访问令牌
+
+        Raises:
+            RuntimeError: 响应中没有 access_token 时抛出异常
+        """
         access_token = result.get("data", {}).get("access_token")
 
         if not access_token:
             raise RuntimeError(f"登录失败: {result}")
 
-        account.token = access_token
+        return access_token
 
     def get_user_info(self, token: str) -> dict[str, Any]:
         """获取用户信息
@@ -117,11 +125,29 @@ class MulanClient:
 
         Returns:
             用户信息字典
+
+        Raises:
+            CredentialRejected: token 已失效
         """
-        response = requests.get(
+        response = self.session.get(
             USER_INFO_URL,
             headers={"authorization": f"Bearer {token}"},
         )
+        raise_if_rejected(response)
+        response.raise_for_status()
+
+        result = response.json()
+        return result.get("data", {})
+
+    async def get_user_info_async(self, token: str) -> dict[str, Any]:
+        """异步获取用户信息，参数和返回值同 get_user_info()"""
+        from utils.aio import get_async_session
+
+        response = await get_async_session().get(
+            USER_INFO_URL,
+            headers={"authorization": f"Bearer {token}"},
+        )
+        raise_if_rejected(response)
         response.raise_for_status()
 
         result = response.json()
@@ -135,12 +161,32 @@ class MulanClient:
 
         Returns:
             项目列表
+
+        Raises:
+            CredentialRejected: token 已失效
         """
-        response = requests.get(
+        response = self.session.get(
+            PROJECTS_URL,
+            headers={"authorization": f"Bearer {token}"},
+            params={"limit": 999999, "offset": 0, "order_by": "create_at"},
+        )
+        raise_if_rejected(response)
+        response.raise_for_status()
+
+        result = response.json()
+        data = result.get("data", {})
+        return data.get("items", [])
+
+    async def get_projects_async(self, token: str) -> list[dict[str, Any]]:
+        """异步获取项目列表，参数和返回值同 get_projects()"""
+        from utils.aio import get_async_session
+
+        response = await get_async_session().get(
             PROJECTS_URL,
             headers={"authorization": f"Bearer {token}"},
             params={"limit": 999999, "offset": 0, "order_by": "create_at"},
         )
+        raise_if_rejected(response)
         response.raise_for_status()
 
         result = response.json()
@@ -157,7 +203,22 @@ class MulanClient:
         Returns:
             工作流信息字典
         """
-        response = requests.get(
+        response = self.session.get(
+            FLOW_INFO_URL.format(project_id),
+            headers={"authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+
+        result = response.json()
+        return result.get("data", {})
+
+    async def get_flow_info_async(
+        self, token: str, project_id: str
+    ) -> dict[str, Any]:
+        """异步获取项目工作流信息，参数和返回值同 get_flow_info()"""
+        from utils.aio import get_async_session
+
+        response = await get_async_session().get(
             FLOW_INFO_URL.format(project_id),
             headers={"authorization": f"Bearer {token}"},
         )
@@ -176,7 +237,7 @@ class MulanClient:
         Returns:
             执行结果字典
         """
-        response = requests.post(
+        response = self.session.post(
             WORKFLOW_RUN_URL,
             json=task_data,
             headers={
@@ -188,82 +249,210 @@ class MulanClient:
 
         return response.json()
 
-    def run(self) -> None:
-        """执行所有账号签到"""
-        self.load_accounts()
+    async def run_workflow_async(
+        self, token: str, task_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        """异步执行工作流任务，参数和返回值同 run_workflow()"""
+        from utils.aio import get_async_session
 
-        success_count = 0
-        for idx, account in enumerate(self.accounts, 1):
-            logger.info(
-                f"账号 [{idx}/{len(self.accounts)}]: {account.email}, 签到中..."
-            )
+        response = await get_async_session().post(
+            WORKFLOW_RUN_URL,
+            json=task_data,
+            headers={
+                "authorization": f"Bearer {token}",
+                "content-type": "application/json",
+            },
+        )
+        response.raise_for_status()
+
+        return response.json()
+
+    def _find_run_task(self, flow_data: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """从工作流信息中提取第一个可执行任务
 
-            try:
-                # 登录
+        Args:
+            flow_data: 工作流信息字典
+
+        Returns:
+            任务数据，未找到返回 None
+        """
+        workflows = flow_data.get("workflows", [])
+        if not workflows:
+            return None
+
+        nodes = workflows[0].get("data", {}).get("nodes", [])
+        for node in nodes:
+            if node.get("data", {}).get("run_task"):
+                return node["data"]["run_task"]
+        return None
+
+    def checkin(self, account: Account, idx: int) -> None:
+        """使用账号 token 执行签到任务（运行最近项目的生图工作流）
+
+        Args:
+            account: 已获取 token 的账号对象
+            idx: 账号序号
+
+        Raises:
+            CredentialRejected: token 已失效
+        """
+        # 获取用户信息
+        user_info = self.get_user_info(account.token)
+        nickname = user_info.get("nickname", "未知")
+        balance = user_info.get("balance", 0)
+        logger.info(f"账号 {idx}: 用户: {nickname}, 现有积分: {balance}")
+
+        # 获取项目列表（取最后一个项目）
+        projects = self.get_projects(account.token)
+        if not projects:
+            logger.info("暂无项目，跳过签到任务")
+            return
+
+        last_project = projects[-1]
+        project_id = last_project.get("short_url_id")
+        project_name = last_project.get("name", "未命名")
+        logger.info(f"获取到项目: {project_name} (ID: {project_id})")
+
+        # 获取工作流信息，提取任务参数
+        flow_data = self.get_flow_info(account.token, project_id)
+        run_task = self._find_run_task(flow_data)
+        if not run_task:
+            logger.info("未找到可执行任务，跳过签到任务")
+            return
+
+        # 执行任务
+        logger.info("开始执行生图任务...")
+        result = self.run_workflow(account.token, run_task)
+        logger.info(f"执行生图任务结果：{result}")
+
+    async def checkin_async(self, account: Account, idx: int) -> None:
+        """异步执行签到任务，参数同 checkin()"""
+        import asyncio
+
+        # 用户信息和项目列表互不依赖，同时请求
+        user_info, projects = await asyncio.gather(
+            self.get_user_info_async(account.token),
+            self.get_projects_async(account.token),
+        )
+        nickname = user_info.get("nickname", "未知")
+        balance = user_info.get("balance", 0)
+        logger.info(f"账号 {idx}: 用户: {nickname}, 现有积分: {balance}")
+
+        if not projects:
+            logger.info("暂无项目，跳过签到任务")
+            return
+
+        last_project = projects[-1]
+        project_id = last_project.get("short_url_id")
+        project_name = last_project.get("name", "未命名")
+        logger.info(f"获取到项目: {project_name} (ID: {project_id})")
+
+        flow_data = await self.get_flow_info_async(account.token, project_id)
+        run_task = self._find_run_task(flow_data)
+        if not run_task:
+            logger.info("未找到可执行任务，跳过签到任务")
+            return
+
+        logger.info("开始执行生图任务...")
+        result = await self.run_workflow_async(account.token, run_task)
+        logger.info(f"执行生图任务结果：{result}")
+
+    def run_account(self, account: Account, idx: int) -> bool:
+        """执行单个账号签到
+
+        Args:
+            account: 账号对象
+            idx: 账号序号
+
+        Returns:
+            是否签到成功
+        """
+        logger.info(
+            f"账号 [{idx}/{len(self.accounts)}]: {account.username}, 签到中..."
+        )
+
+        try:
+
+            def login() -> str:
                 self.login(account)
                 logger.info(f"账号 {idx}: 登录成功")
+                return account.token
+
+            def checkin(token: str) -> None:
+                account.token = token
+                self.checkin(account, idx)
+
+            # 优先使用缓存的 token，失效时重新登录
+            self.credentials.call(account.username, login, checkin)
+            return True
+        except Exception:
+            logger.error(
+                f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                "mulan 签到失败",
+                f"账号 {idx}: 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
+
+    async def run_account_async(self, account: Account, idx: int) -> bool:
+        """异步执行单个账号签到，参数和返回值同 run_account()"""
+        logger.info(
+            f"账号 [{idx}/{len(self.accounts)}]: {account.username}, 签到中..."
+        )
+
+        try:
+
+            async def login() -> str:
+                await self.login_async(account)
+                logger.info(f"账号 {idx}: 登录成功")
+                return account.token
+
+            async def checkin(token: str) -> None:
+                account.token = token
+                await self.checkin_async(account, idx)
 
-                # 获取用户信息
-                user_info = self.get_user_info(account.token)
-                nickname = user_info.get("nickname", "未知")
-                balance = user_info.get("balance", 0)
-                logger.info(f"账号 {idx}: 用户: {nickname}, 现有积分: {balance}")
-
-                # 获取项目列表（取最后一个项目）
-                projects = self.get_projects(account.token)
-                if not projects:
-                    logger.info("暂无项目，跳过签到任务")
-                    success_count += 1
-                    continue
-
-                last_project = projects[-1]
-                project_id = last_project.get("short_url_id")
-                project_name = last_project.get("name", "未命名")
-                logger.info(f"获取到项目: {project_name} (ID: {project_id})")
-
-                # 获取工作流信息，提取任务参数
-                flow_data = self.get_flow_info(account.token, project_id)
-                workflows = flow_data.get("workflows", [])
-                if not workflows:
-                    logger.info("工作流为空，跳过签到任务")
-                    success_count += 1
-                    continue
-
-                nodes = workflows[0].get("data", {}).get("nodes", [])
-                run_task = None
-                for node in nodes:
-                    if node.get("data", {}).get("run_task"):
-                        run_task = node["data"]["run_task"]
-                        break
-
-                if not run_task:
-                    logger.info("未找到可执行任务，跳过签到任务")
-                    success_count += 1
-                    continue
-
-                # 执行任务
-                logger.info("开始执行生图任务...")
-                result = self.run_workflow(account.token, run_task)
-                logger.info(f"执行生图任务结果：{result}")
-
-                success_count += 1
-            except Exception:
-                logger.error(
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
-                )
-                notifier = XizhiNotifier()
-                notifier.send(
-                    "mulan 签到失败",
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}",
-                )
-            finally:
-                logger.info("=" * 40)
+            await self.credentials.call_async(account.username, login, checkin)
+            return True
+        except Exception:
+            logger.error(
+                f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                "mulan 签到失败",
+                f"账号 {idx}: 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
 
+    def run(self) -> None:
+        """执行所有账号签到"""
+        self.load_accounts()
+
+        success_count = run_accounts(
+            self.run_account, self.accounts, platform="mulan"
+        )
+        logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
+
+    async def run_async(self) -> None:
+        """在当前事件循环中异步执行所有账号签到"""
+        self.load_accounts()
+
+        success_count = await run_accounts_async(
+            self.run_account_async, self.accounts, platform="mulan"
+        )
         logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
 
 
 def main() -> None:
     """主函数"""
+    setup_logging()
+    apply_shard_option()
     client = MulanClient()
     client.run()
 
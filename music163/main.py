@@ -5,18 +5,19 @@ https://music.163.com/
 """
 
 import logging
-import os
 import sys
 import traceback
+from typing import TYPE_CHECKING
 
-import requests
+from utils.accounts import Account, AccountSource
+from utils.concurrency import run_accounts
+from utils.log import setup_logging
 from utils.notify import XizhiNotifier
+from utils.shard import apply_shard_option
+
+if TYPE_CHECKING:
+    from utils.transport import PooledSession
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 # 环境变量
@@ -32,22 +33,27 @@ class Music163Client:
 
     def __init__(self) -> None:
         """初始化客户端"""
-        self.cookies: list[str] = []
+        self.accounts = AccountSource(ENV_COOKIES)
+
+    @property
+    def session(self) -> "PooledSession":
+        """共享的连接池会话（首次发送请求时才导入 requests）"""
+        from utils.transport import get_session
+
+        return get_session()
 
     def load_cookies(self) -> None:
-        """从环境变量加载 cookies"""
-        raw_cookies = os.environ.get(ENV_COOKIES)
-        if not raw_cookies:
+        """检查 cookies 配置（环境变量或账号文件）"""
+        if not self.accounts.configured:
             logger.error(f'请设置 {ENV_COOKIES} 环境变量, 格式: {ENV_COOKIES}="c1||c2"')
+            logger.error(f"或通过 {self.accounts.file_env} 指定 JSONL/TOML 账号文件")
             sys.exit(1)
 
-        for cookie in raw_cookies.split("||"):
-            cookie = cookie.strip()
-            self.cookies.append(cookie)
+        logger.info(f"从 {self.accounts.describe()} 加载了 {len(self.accounts)} 个账号")
 
-        logger.info(f"加载了 {len(self.cookies)} 个账号")
-
-    def _checkin_single(self, url: str, cookie: str, client_type: str) -> str:
+    def _checkin_single(
+        self, url: str, cookie: str, client_type: str
+    ) -> tuple[bool, str]:
         """单端签到
 
         Args:
@@ -56,28 +62,30 @@ class Music163Client:
             client_type: 客户端类型（手机端/桌面端）
 
         Returns:
-            签到结果消息
+            (是否签到成功或今日已签到, 签到结果消息)
         """
+        import requests
+
         try:
-            response = requests.get(url, headers={"Cookie": cookie})
+            response = self.session.get(url, headers={"Cookie": cookie})
 
             if not response.ok:
-                return f"{client_type}签到失败: HTTP {response.status_code}"
+                return False, f"{client_type}签到失败: HTTP {response.status_code}"
 
             data = response.json()
             if "重复" in str(data):
-                return f"{client_type}: 重复签到"
+                return True, f"{client_type}: 重复签到"
             elif "point" in str(data):
-                return f"{client_type}: 获得 {data.get('point', 0)} 云贝"
+                return True, f"{client_type}: 获得 {data.get('point', 0)} 云贝"
             else:
-                return f"{client_type}: Cookie失效"
+                return False, f"{client_type}: Cookie失效"
 
         except requests.RequestException as e:
-            return f"{client_type}请求失败: {e}"
+            return False, f"{client_type}请求失败: {e}"
         except Exception as e:
-            return f"{client_type}异常: {e}"
+            return False, f"{client_type}异常: {e}"
 
-    def checkin(self, cookie: str) -> tuple[str, str]:
+    def checkin(self, cookie: str) -> tuple[tuple[bool, str], tuple[bool, str]]:
         """执行签到
 
         Args:
@@ -90,36 +98,54 @@ class Music163Client:
         desktop_result = self._checkin_single(DESKTOP_URL, cookie, "桌面端")
         return mobile_result, desktop_result
 
+    def run_account(self, account: Account, idx: int) -> bool:
+        """执行单个账号签到
+
+        Args:
+            account: 账号
+            idx: 账号序号
+
+        Returns:
+            是否签到成功
+        """
+        cookie = account.cookie
+        try:
+            logger.info(f"账号 [{idx}/{len(self.accounts)}]: 签到中...")
+            (mobile_ok, mobile_result), (desktop_ok, desktop_result) = self.checkin(
+                cookie
+            )
+            logger.info(f"  {mobile_result}")
+            logger.info(f"  {desktop_result}")
+            # 两端都签到成功（或今日已签到）才算完成
+            return mobile_ok and desktop_ok
+
+        except Exception:
+            logger.error(
+                f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                "music163 签到失败",
+                f"账号 {idx}: 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
+
     def run(self) -> None:
         """执行所有账号签到"""
         self.load_cookies()
 
-        success_count = 0
-        for idx, cookie in enumerate(self.cookies, 1):
-            try:
-                logger.info(f"账号 [{idx}/{len(self.cookies)}]: 签到中...")
-                mobile_result, desktop_result = self.checkin(cookie)
-                logger.info(f"  {mobile_result}")
-                logger.info(f"  {desktop_result}")
-                success_count += 1
-
-            except Exception:
-                logger.error(
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
-                )
-                notifier = XizhiNotifier()
-                notifier.send(
-                    "music163 签到失败",
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}",
-                )
-            finally:
-                logger.info("=" * 40)
-
-        logger.info(f"签到完成: 成功 {success_count}/{len(self.cookies)}")
+        success_count = run_accounts(
+            self.run_account, self.accounts, platform="music163"
+        )
+        logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
 
 
 def main():
     """主函数"""
+    setup_logging()
+    apply_shard_option()
     client = Music163Client()
     client.run()
 
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+new-api 系列站点签到脚本
+996coder、linkapi、duckcoding、dawclaudecode、magic666 等基于 new-api 搭建的站点
+登录和签到流程相同，按站点配置表在一次执行中完成所有站点所有账号的签到
+"""
+
+import logging
+import sys
+import threading
+import traceback
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Sequence
+
+from utils.accounts import Account, AccountSource
+from utils.concurrency import run_accounts, run_accounts_async
+from utils.credentials import CredentialCache, raise_if_rejected
+from utils.log import setup_logging
+from utils.notify import XizhiNotifier
+from utils.shard import apply_shard_option
+
+if TYPE_CHECKING:
+    from utils.transport import PooledSession
+
+logger = logging.getLogger(__name__)
+
+# 默认 API 路径
+LOGIN_PATH = "/api/user/login?turnstile="
+CHECKIN_PATH = "/api/user/checkin"
+
+# 表示今日已签到的提示（签到接口返回 success: false，但视为签到成功）
+ALREADY_CHECKED_IN_KEYWORDS = ("已签到", "已经签到")
+
+# 请求头（origin、referer 按站点补充）
+HEADERS = {
+    "accept": "application/json, text/plain, */*",
+    "accept-language": "zh-CN,zh;q=0.9,en;q=0.8,ja;q=0.7",
+    "cache-control": "no-store",
+    "sec-ch-ua": '"Not(A:Brand";v="8", "Chromium";v="144", "Google Chrome";v="144"',
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": '"macOS"',
+    "sec-fetch-dest": "empty",
+    "sec-fetch-mode": "cors",
+    "sec-fetch-site": "same-origin",
+    "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36",
+}
+
+
+class SiteSpec:
+    """new-api 站点配置"""
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        env_accounts: str,
+        login_path: str = LOGIN_PATH,
+        checkin_path: str = CHECKIN_PATH,
+    ) -> None:
+        """初始化站点配置
+
+        Args:
+            name: 站点名称，用于日志和通知
+            base_url: 站点地址
+            env_accounts: 账号环境变量名
+            login_path: 登录接口路径
+            checkin_path: 签到接口路径
+        """
+        self.name = name
+        self.base_url = base_url
+        self.env_accounts = env_accounts
+        self.login_url = f"{base_url}{login_path}"
+        self.checkin_url = f"{base_url}{checkin_path}"
+
+    def __repr__(self) -> str:
+        return f"SiteSpec(name={self.name})"
+
+
+# 站点配置表，新增站点只需添加一行
+SITES: dict[str, SiteSpec] = {
+    spec.name: spec
+    for spec in [
+        SiteSpec("996coder", "https://996coder.com", "NINENINESIX_CODER_ACCOUNTS"),
+        SiteSpec("linkapi", "https://linkapi.ai", "LINKAPI_ACCOUNTS"),
+        SiteSpec("duckcoding", "https://duckcoding.com", "DUCKCODING_ACCOUNTS"),
+        SiteSpec("dawclaudecode", "https://dawclaudecode.com", "DAWCLAUDECODE_ACCOUNTS"),
+        SiteSpec("magic666", "https://magic666.top", "MAGIC666_ACCOUNTS"),
+    ]
+}
+
+
+class SiteAccounts:
+    """多个站点的账号，按站点顺序逐个读取 (站点配置, 账号)"""
+
+    def __init__(self, sites: Sequence[SiteSpec]) -> None:
+        """初始化账号来源
+
+        Args:
+            sites: 站点配置列表
+        """
+        self.sources = [
+            (site, AccountSource(site.env_accounts, ("username", "password")))
+            for site in sites
+        ]
+
+    def configured(self) -> list[tuple[SiteSpec, AccountSource]]:
+        """设置了环境变量或账号文件的站点"""
+        return [(site, source) for site, source in self.sources if source.configured]
+
+    def __iter__(self) -> Iterator[tuple[SiteSpec, Account]]:
+        for site, source in self.configured():
+            for account in source:
+                yield site, account
+
+    def __len__(self) -> int:
+        return sum(len(source) for _, source in self.configured())
+
+
+class NewApiClient:
+    """new-api 系列站点签到客户端"""
+
+    def __init__(self, site_names: Optional[Sequence[str]] = None) -> None:
+        """初始化客户端
+
+        Args:
+            site_names: 要签到的站点名称，默认为配置表中的全部站点
+        """
+        self.sites = [SITES[name] for name in (site_names or SITES)]
+        self.accounts = SiteAccounts(self.sites)
+        self._site_success: Counter[str] = Counter()
+        self._site_success_lock = threading.Lock()
+        # 按 站点:用户名 缓存 (session cookie, user_id)
+        self.credentials = CredentialCache("newapi")
+
+    @property
+    def session(self) -> "PooledSession":
+        """共享的连接池会话（首次发送请求时才导入 requests）"""
+        from utils.transport import get_session
+
+        return get_session()
+
+    @property
+    def platform(self) -> str:
+        """每日签到状态和分片结果使用的平台名称
+
+        只配置了一个站点时使用站点名称，与该站点的单独脚本（如 996coder）共用
+        状态，多个站点的脚本并行执行时也不会写入同一个文件；否则为 newapi。
+        """
+        configured = self.accounts.configured()
+        return configured[0][0].name if len(configured) == 1 else "newapi"
+
+    def load_accounts(self) -> None:
+        """检查各站点的账号配置（环境变量或账号文件）"""
+        for site, source in self.accounts.configured():
+            logger.info(f"[{site.name}] 从 {source.describe()} 加载了 {len(source)} 个账号")
+
+        if not self.accounts.configured():
+            env_names = ", ".join(site.env_accounts for site in self.sites)
+            logger.error(
+                f'请设置 {env_names} 中至少一个环境变量, 格式: XXX_ACCOUNTS="user1:pass1||user2:pass2"'
+            )
+            logger.error("或通过 XXX_ACCOUNTS_FILE 指定 JSONL/TOML 账号文件")
+            sys.exit(1)
+
+        logger.info(f"共加载了 {len(self.accounts)} 个账号")
+
+    def _login_headers(self, site: SiteSpec) -> dict[str, str]:
+        """构造登录请求头"""
+        return {
+            **HEADERS,
+            "content-type": "application/json",
+            "origin": site.base_url,
+            "referer": f"{site.base_url}/login",
+        }
+
+    def _checkin_headers(
+        self, site: SiteSpec, session_cookie: str, user_id: str
+    ) -> dict[str, str]:
+        """构造签到请求头
+
+        Args:
+            site: 站点配置
+            session_cookie: session cookie 字符串
+            user_id: 用户ID
+
+        Returns:
+            请求头字典
+        """
+        return {
+            **HEADERS,
+            "origin": site.base_url,
+            "priority": "u=1, i",
+            "referer": f"{site.base_url}/console/personal",
+            "cookie": session_cookie,
+            "new-api-user": user_id,
+        }
+
+    def login(
+        self, site: SiteSpec, username: str, password: str
+    ) -> Optional[tuple[str, str]]:
+        """登录获取session
+
+        Args:
+            site: 站点配置
+            username: 用户名
+            password: 密码
+
+        Returns:
+            (session cookie字符串, user_id)元组，失败返回None
+        """
+        response = self.session.post(
+            site.login_url,
+            headers=self._login_headers(site),
+            json={"username": username, "password": password},
+        )
+        return self._parse_login(response)
+
+    async def login_async(
+        self, site: SiteSpec, username: str, password: str
+    ) -> Optional[tuple[str, str]]:
+        """异步登录获取session，参数和返回值同 login()"""
+        from utils.aio import get_async_session
+
+        response = await get_async_session().post(
+            site.login_url,
+            headers=self._login_headers(site),
+            json={"username": username, "password": password},
+        )
+        return self._parse_login(response)
+
+    def _parse_login(self, response: Any) -> Optional[tuple[str, str]]:
+        """解析登录响应
+
+        Args:
+            response: 登录响应（requests.Response 或 AsyncResponse）
+
+        Returns:
+            (session cookie字符串, user_id)元组，失败返回None
+        """
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("success"):
+                # 从响应body获取用户ID
+                user_id = str(data.get("data", {}).get("id", ""))
+
+                # 从响应的cookies中获取session
+                session_cookie = response.cookies.get("session")
+                if session_cookie:
+                    return f"session={session_cookie}", user_id
+
+        logger.error(f"登录失败: {response.text}")
+
+    def checkin(
+        self, site: SiteSpec, session_cookie: str, user_id: str
+    ) -> tuple[bool, str]:
+        """执行签到
+
+        Args:
+            site: 站点配置
+            session_cookie: session cookie 字符串
+            user_id: 用户ID
+
+        Returns:
+            (是否签到成功（含今日已签到）, 签到结果消息)
+        """
+        response = self.session.post(
+            site.checkin_url,
+            headers=self._checkin_headers(site, session_cookie, user_id),
+        )
+        return self._parse_checkin(response)
+
+    async def checkin_async(
+        self, site: SiteSpec, session_cookie: str, user_id: str
+    ) -> tuple[bool, str]:
+        """异步执行签到，参数和返回值同 checkin()"""
+        from utils.aio import get_async_session
+
+        response = await get_async_session().post(
+            site.checkin_url,
+            headers=self._checkin_headers(site, session_cookie, user_id),
+        )
+        return self._parse_checkin(response)
+
+    def _parse_checkin(self, response: Any) -> tuple[bool, str]:
+        """解析签到响应
+
+        Args:
+            response: 签到响应（requests.Response 或 AsyncResponse）
+
+        Returns:
+            (是否签到成功（含今日已签到）, 签到结果消息)
+
+        Raises:
+            CredentialRejected: session 已失效
+        """
+        raise_if_rejected(response)
+        data = response.json()
+        message = data.get("message", "无消息")
+        if response.status_code == 200 and data.get("success"):
+            return True, message
+        if any(keyword in message for keyword in ALREADY_CHECKED_IN_KEYWORDS):
+            return True, message
+        return False, f"签到失败: {message}"
+
+    def _record_result(
+        self, account: tuple[SiteSpec, Account], success: bool
+    ) -> None:
+        """记录站点签到成功的账号数"""
+        if success:
+            with self._site_success_lock:
+                self._site_success[account[0].name] += 1
+
+    def _report_checkin(
+        self, site: SiteSpec, idx: int, username: str, success: bool, message: str
+    ) -> bool:
+        """输出签到结果，签到失败时放入通知发件箱
+
+        Args:
+            site: 站点配置
+            idx: 账号序号
+            username: 用户名
+            success: 是否签到成功
+            message: 签到结果消息
+
+        Returns:
+            是否签到成功
+        """
+        if success:
+            logger.info(f"[{site.name}] 账号 {idx} {username}: {message}")
+        else:
+            logger.error(f"[{site.name}] 账号 {idx} {username}: {message}")
+            XizhiNotifier.enqueue(f"{site.name} 签到失败", f"账号 {idx}: {message}")
+        return success
+
+    def run_account(
+        self, account: tuple[SiteSpec, Account], idx: int
+    ) -> bool:
+        """执行单个账号签到
+
+        Args:
+            account: (站点配置, 账号)
+            idx: 账号序号
+
+        Returns:
+            是否签到成功
+        """
+        site, info = account
+        try:
+            username = info.username
+            logger.info(
+                f"[{site.name}] 账号 [{idx}/{len(self.accounts)}] {username}: 签到中..."
+            )
+
+            def login() -> Optional[tuple[str, str]]:
+                logger.info(f"[{site.name}] 账号 {idx} {username}: 登录中...")
+                return self.login(site, username, info.password)
+
+            def checkin(credential: Sequence[str]) -> tuple[bool, str]:
+                session_cookie, user_id = credential
+                return self.checkin(site, session_cookie, user_id)
+
+            # 优先使用缓存的 session，失效时重新登录
+            result = self.credentials.call(f"{site.name}:{username}", login, checkin)
+            if result is None:
+                logger.error(f"[{site.name}] 账号 {idx} {username}: 登录失败")
+                return False
+
+            return self._report_checkin(site, idx, username, *result)
+
+        except Exception:
+            logger.error(
+                f"[{site.name}] 账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                f"{site.name} 签到失败",
+                f"账号 {idx}: 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
+
+    async def run_account_async(
+        self, account: tuple[SiteSpec, Account], idx: int
+    ) -> bool:
+        """异步执行单个账号签到，参数和返回值同 run_account()"""
+        site, info = account
+        try:
+            username = info.username
+            logger.info(
+                f"[{site.name}] 账号 [{idx}/{len(self.accounts)}] {username}: 签到中..."
+            )
+
+            async def login() -> Optional[tuple[str, str]]:
+                logger.info(f"[{site.name}] 账号 {idx} {username}: 登录中...")
+                return await self.login_async(site, username, info.password)
+
+            async def checkin(credential: Sequence[str]) -> tuple[bool, str]:
+                session_cookie, user_id = credential
+                return await self.checkin_async(site, session_cookie, user_id)
+
+            result = await self.credentials.call_async(
+                f"{site.name}:{username}", login, checkin
+            )
+            if result is None:
+                logger.error(f"[{site.name}] 账号 {idx} {username}: 登录失败")
+                return False
+
+            return self._report_checkin(site, idx, username, *result)
+
+        except Exception:
+            logger.error(
+                f"[{site.name}] 账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                f"{site.name} 签到失败",
+                f"账号 {idx}: 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
+
+    def log_summary(self, success_count: int) -> None:
+        """输出各站点及总体签到结果
+
+        Args:
+            success_count: 签到成功的账号总数
+        """
+        site_totals = {
+            site.name: len(source) for site, source in self.accounts.configured()
+        }
+        if len(site_totals) > 1:
+            for name, total in site_totals.items():
+                success = self._site_success[name]
+                logger.info(f"[{name}] 签到完成: 成功 {success}/{total}")
+        logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
+
+    def run(self) -> None:
+        """执行所有站点所有账号签到"""
+        self.load_accounts()
+
+        success_count = run_accounts(
+            self.run_account,
+            self.accounts,
+            platform=self.platform,
+            on_result=self._record_result,
+        )
+        self.log_summary(success_count)
+
+    async def run_async(self) -> None:
+        """在当前事件循环中异步执行所有站点所有账号签到"""
+        self.load_accounts()
+
+        success_count = await run_accounts_async(
+            self.run_account_async,
+            self.accounts,
+            platform=self.platform,
+            on_result=self._record_result,
+        )
+        self.log_summary(success_count)
+
+
+def main():
+    """主函数"""
+    setup_logging()
+    sites = apply_shard_option() or None
+    unknown = [name for name in sites or [] if name not in SITES]
+    if unknown:
+        logger.error(f"未知站点: {', '.join(unknown)}, 可选: {', '.join(SITES)}")
+        sys.exit(1)
+
+    client = NewApiClient(sites)
+    client.run()
+
+
+if __name__ == "__main__":
+    main()
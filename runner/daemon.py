@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+常驻调度进程
+在一个长期运行的进程中按各平台的时间表定时签到，代替每个平台一个的
+定时工作流：连接池、登录凭证缓存等在多次签到之间复用，下次执行时间
+保存在数据目录中，重启后继续按原计划执行
+"""
+
+import argparse
+import logging
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Any
+
+from runner.main import (
+    DEFAULT_WORKERS,
+    ENV_PLATFORMS,
+    ENV_WORKERS,
+    LOG_FORMAT,
+    discover_platforms,
+    drop_covered_platforms,
+    run_platform,
+)
+from utils.log import setup_logging
+from utils.metrics import get_recorder, write_metrics
+from utils.notify import XizhiNotifier
+from utils.shard import ENV_SHARD, set_shard
+from utils.state import CN_TZ
+from utils.store import JsonStore, data_dir
+
+logger = logging.getLogger(__name__)
+
+# 环境变量
+# 格式: glados=08:00,bilibili=09:30（北京时间，未列出的平台使用默认时间）
+ENV_SCHEDULE = "CHECKIN_SCHEDULE"
+ENV_SCHEDULE_DEFAULT = "CHECKIN_SCHEDULE_DEFAULT"
+ENV_SCHEDULE_JITTER = "CHECKIN_SCHEDULE_JITTER"
+
+# 默认每天 08:00（北京时间）执行，与定时工作流的 cron '0 0 * * *'（UTC）相同
+DEFAULT_TIME = "08:00"
+# 默认在计划时间后 0~900 秒内随机执行
+DEFAULT_JITTER = 900
+# 最长等待时间（秒），保证系统时间调整或收到退出信号后及时响应
+MAX_SLEEP = 60
+
+# 下次执行时间的保存文件（数据目录下）
+SCHEDULE_FILE = "daemon.json"
+
+
+class Job:
+    """单个平台的定时任务
+
+    Attributes:
+        platform: 平台名称
+        at: 每天的执行时间，格式 HH:MM（北京时间）
+        next_run: 下次执行时间（Unix 时间戳）
+    """
+
+    __slots__ = ("platform", "at", "next_run")
+
+    def __init__(self, platform: str, at: str, next_run: float) -> None:
+        self.platform = platform
+        self.at = at
+        self.next_run = next_run
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为保存到文件的字典"""
+        return {"at": self.at, "next_run": self.next_run}
+
+
+def parse_time(text: str) -> tuple[int, int]:
+    """解析 HH:MM 格式的时间
+
+    Args:
+        text: 时间字符串
+
+    Returns:
+        (小时, 分钟)
+
+    Raises:
+        ValueError: 格式错误
+    """
+    hour, sep, minute = text.strip().partition(":")
+    if not sep or not 0 <= int(hour) < 24 or not 0 <= int(minute) < 60:
+        raise ValueError(f"时间应为 HH:MM 格式: {text}")
+    return int(hour), int(minute)
+
+
+def parse_schedule(text: str) -> dict[str, str]:
+    """解析 CHECKIN_SCHEDULE 格式的时间表
+
+    Args:
+        text: 时间表字符串，例如 glados=08:00,bilibili=09:30
+
+    Returns:
+        平台名称到执行时间的映射
+
+    Raises:
+        ValueError: 格式错误
+    """
+    schedule: dict[str, str] = {}
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        platform, sep, at = item.partition("=")
+        if not sep:
+            raise ValueError(f"时间表应为 平台=HH:MM 格式: {item}")
+        parse_time(at)
+        schedule[platform.strip()] = at.strip()
+    return schedule
+
+
+def next_run_time(at: str, after: float, jitter: float) -> float:
+    """计算 after 之后下一次的执行时间
+
+    Args:
+        at: 每天的执行时间，格式 HH:MM（北京时间）
+        after: 起始时间（Unix 时间戳）
+        jitter: 随机延后的最大秒数，避免每天在同一秒发出请求
+
+    Returns:
+        下次执行时间（Unix 时间戳）
+    """
+    hour, minute = parse_time(at)
+    start = datetime.fromtimestamp(after, CN_TZ)
+    run_at = start.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at.timestamp() <= after:
+        run_at += timedelta(days=1)
+    return run_at.timestamp() + random.uniform(0, jitter)
+
+
+def format_time(timestamp: float) -> str:
+    """格式化时间戳（北京时间）"""
+    return datetime.fromtimestamp(timestamp, CN_TZ).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class Daemon:
+    """常驻调度器
+
+    到期的平台提交到共享线程池中执行，同一平台不会同时执行两次。
+    每次有平台执行完就发送汇总通知并写入请求指标，不等待其他仍在执行的平台，
+    时间表交错时通知也不会被推迟，请求明细也不会一直累积。
+
+    Attributes:
+        jobs: 定时任务列表
+        workers: 同时执行的平台数
+        jitter: 随机延后的最大秒数
+    """
+
+    def __init__(self, jobs: list[Job], workers: int, jitter: float) -> None:
+        """初始化调度器
+
+        Args:
+            jobs: 定时任务列表
+            workers: 同时执行的平台数
+            jitter: 随机延后的最大秒数
+        """
+        self.jobs = jobs
+        self.workers = workers
+        self.jitter = jitter
+        self.store = JsonStore(data_dir() / SCHEDULE_FILE)
+        self._stop = threading.Event()
+
+    @classmethod
+    def load(
+        cls,
+        schedule: dict[str, str],
+        workers: int,
+        jitter: float,
+        run_now: bool = False,
+    ) -> "Daemon":
+        """按时间表创建调度器，沿用保存的下次执行时间
+
+        执行时间与保存时相同的平台沿用保存的下次执行时间（已过期时立即执行），
+        其余平台从当前时间开始计算。只读取不保存，开始调度前需调用 save()。
+
+        Args:
+            schedule: 平台名称到执行时间的映射
+            workers: 同时执行的平台数
+            jitter: 随机延后的最大秒数
+            run_now: 是否启动后立即执行所有平台
+
+        Returns:
+            调度器
+        """
+        daemon = cls([], workers, jitter)
+        now = time.time()
+        for platform, at in schedule.items():
+            saved = daemon.store.get(platform) or {}
+            saved_next_run = saved.get("next_run")
+            if run_now:
+                next_run = now
+            elif saved.get("at") == at and isinstance(saved_next_run, (int, float)):
+                next_run = saved_next_run
+            else:
+                next_run = next_run_time(at, now, jitter)
+            daemon.jobs.append(Job(platform, at, next_run))
+        return daemon
+
+    def save(self) -> None:
+        """保存各平台的下次执行时间"""
+        jobs = {job.platform: job.to_dict() for job in self.jobs}
+        self.store.update(lambda data: data.update(jobs))
+
+    def stop(self, *args: Any) -> None:
+        """停止调度（正在执行的平台会执行完）"""
+        if not self._stop.is_set():
+            logger.info("收到退出信号，等待正在执行的平台完成")
+        self._stop.set()
+
+    def finish_batch(self) -> None:
+        """发送上次以来的汇总通知并写入请求指标"""
+        XizhiNotifier.flush()
+        write_metrics()
+        # 常驻进程只保留上次写入以来的请求明细
+        get_recorder().clear()
+
+    def log_schedule(self) -> None:
+        """输出各平台的下次执行时间"""
+        for job in sorted(self.jobs, key=lambda j: j.next_run):
+            logger.info(
+                f"{job.platform:<15} 每天 {job.at}, 下次 {format_time(job.next_run)}"
+            )
+
+    def run(self) -> None:
+        """持续调度，直到调用 stop()"""
+        running: dict[Future[tuple[str, str, float]], Job] = {}
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="platform"
+        ) as pool:
+            while True:
+                now = time.time()
+                if not self._stop.is_set():
+                    busy = set(running.values())
+                    for job in self.jobs:
+                        if job.next_run <= now and job not in busy:
+                            logger.info(f"[{job.platform}] 到达执行时间")
+                            running[pool.submit(run_platform, job.platform)] = job
+                elif not running:
+                    break
+
+                # 等到下一个平台到期或有平台执行完（退出时只等待执行中的平台）
+                busy = set(running.values())
+                waits = [job.next_run - now for job in self.jobs if job not in busy]
+                if self._stop.is_set():
+                    waits = []
+                timeout = max(0.0, min(waits + [MAX_SLEEP]))
+                if running:
+                    done, _ = wait(
+                        running, timeout=timeout, return_when=FIRST_COMPLETED
+                    )
+                else:
+                    self._stop.wait(timeout)
+                    done = set()
+
+                for future in done:
+                    job = running.pop(future)
+                    platform, status, elapsed = future.result()
+                    job.next_run = next_run_time(job.at, time.time(), self.jitter)
+                    logger.info(
+                        f"[{platform}] {status} ({elapsed:.2f}s), "
+                        f"下次执行 {format_time(job.next_run)}"
+                    )
+                if done:
+                    self.save()
+                    self.finish_batch()
+
+
+def build_schedule(platforms: list[str]) -> dict[str, str]:
+    """读取环境变量中的时间表
+
+    Args:
+        platforms: 要调度的平台
+
+    Returns:
+        平台名称到执行时间的映射
+
+    Raises:
+        ValueError: 时间表格式错误
+    """
+    default_at = os.environ.get(ENV_SCHEDULE_DEFAULT, DEFAULT_TIME)
+    parse_time(default_at)
+    schedule = parse_schedule(os.environ.get(ENV_SCHEDULE, ""))
+    return {platform: schedule.get(platform, default_at) for platform in platforms}
+
+
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="常驻调度进程")
+    parser.add_argument(
+        "platforms",
+        nargs="*",
+        help=f"要调度的平台，默认读取 {ENV_PLATFORMS} 或调度全部平台",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=int(os.environ.get(ENV_WORKERS, DEFAULT_WORKERS)),
+        help=f"同时执行的平台数，默认 {DEFAULT_WORKERS}",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=float(os.environ.get(ENV_SCHEDULE_JITTER, DEFAULT_JITTER)),
+        help=f"在计划时间后随机延后的最大秒数，默认 {DEFAULT_JITTER}",
+    )
+    parser.add_argument(
+        "--run-now",
+        action="store_true",
+        help="启动后立即执行所有平台，之后按时间表执行",
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="只输出各平台的下次执行时间",
+    )
+    parser.add_argument(
+        "--shard",
+        help=f"只执行账号分片 i/n（例如 1/4），默认读取 {ENV_SHARD}",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """主函数"""
+    setup_logging(LOG_FORMAT)
+    args = parse_args()
+    set_shard(args.shard)
+
+    available = discover_platforms()
+    platforms = args.platforms or [
+        p.strip() for p in os.environ.get(ENV_PLATFORMS, "").split(",") if p.strip()
+    ]
+    if not platforms:
+        platforms = available
+
+    unknown = [p for p in platforms if p not in available]
+    if unknown:
+        logger.error(f"未知平台: {', '.join(unknown)}, 可选: {', '.join(available)}")
+        platforms = [p for p in platforms if p in available]
+    platforms = drop_covered_platforms(platforms)
+
+    try:
+        schedule = build_schedule(platforms)
+    except ValueError as e:
+        logger.error(f"时间表配置错误: {e}")
+        sys.exit(1)
+
+    daemon = Daemon.load(schedule, max(1, args.workers), args.jitter, args.run_now)
+    daemon.log_schedule()
+    if args.list:
+        return
+    daemon.save()
+
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    logger.info(f"共 {len(platforms)} 个平台, 并发数 {daemon.workers}, 开始调度")
+    daemon.run()
+    logger.info("调度已停止")
+
+
+if __name__ == "__main__":
+    main()
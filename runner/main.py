@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+多平台统一签到入口
+在同一进程内并发执行所有平台的签到任务（或使用 process 引擎在子进程中执行）
+"""
+
+import argparse
+import importlib
+import inspect
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from types import ModuleType
+from typing import Optional
+
+from utils.log import setup_logging
+from utils.metrics import request_context
+from utils.notify import XizhiNotifier
+from utils.shard import ENV_SHARD, results_dir, set_shard
+
+logger = logging.getLogger(__name__)
+
+# 环境变量
+ENV_PLATFORMS = "CHECKIN_PLATFORMS"
+ENV_WORKERS = "CHECKIN_PLATFORM_WORKERS"
+ENV_ENGINE = "CHECKIN_ENGINE"
+ENV_TIMEOUT = "CHECKIN_PLATFORM_TIMEOUT"
+
+# 日志格式（记录 logger 名称以区分平台）
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s:%(lineno)d - %(message)s"
+
+# 默认并发平台数
+DEFAULT_WORKERS = 4
+
+# 执行引擎
+ENGINE_THREAD = "thread"
+ENGINE_ASYNCIO = "asyncio"
+ENGINE_PROCESS = "process"
+
+# process 引擎下单个平台的默认超时时间（秒）
+DEFAULT_TIMEOUT = 1800
+
+# 仓库根目录及非平台目录
+ROOT_DIR = Path(__file__).resolve().parent.parent
+EXCLUDED_PACKAGES = {"bench", "runner", "utils"}
+
+# 平台执行状态
+STATUS_SUCCESS = "完成"
+STATUS_SKIPPED = "跳过"
+STATUS_FAILED = "失败"
+STATUS_TIMEOUT = "超时"
+
+
+def discover_platforms() -> list[str]:
+    """扫描仓库根目录下包含 main.py 的平台目录
+
+    Returns:
+        平台名称列表（按名称排序）
+    """
+    return sorted(
+        path.parent.name
+        for path in ROOT_DIR.glob("*/main.py")
+        if path.parent.name not in EXCLUDED_PACKAGES
+    )
+
+
+def find_client_class(module: ModuleType) -> Optional[type]:
+    """查找平台模块中的签到客户端类
+
+    客户端类需定义在该模块内、提供 run() 方法，并且可以无参构造，
+    例如 GladosClient、bilibili 的 App。
+
+    Args:
+        module: 平台模块
+
+    Returns:
+        客户端类，未找到返回 None
+    """
+    for _, cls in inspect.getmembers(module, inspect.isclass):
+        if cls.__module__ != module.__name__:
+            continue
+        if not callable(getattr(cls, "run", None)):
+            continue
+
+        params = inspect.signature(cls).parameters.values()
+        if all(
+            param.default is not param.empty
+            or param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD)
+            for param in params
+        ):
+            return cls
+    return None
+
+
+def load_client_class(platform: str) -> Optional[type]:
+    """导入平台模块并查找签到客户端类
+
+    Args:
+        platform: 平台名称（目录名）
+
+    Returns:
+        客户端类，未找到返回 None
+    """
+    module = importlib.import_module(f"{platform}.main")
+    client_class = find_client_class(module)
+    if client_class is None:
+        logger.error(f"[{platform}] 未找到签到客户端类")
+    return client_class
+
+
+def drop_covered_platforms(platforms: list[str]) -> list[str]:
+    """去掉已被其他平台覆盖的平台
+
+    例如 996coder 的客户端继承自 newapi 的 NewApiClient，同时执行 newapi 时
+    996coder 的账号已包含在内，无需再单独执行。
+
+    Args:
+        platforms: 平台名称列表
+
+    Returns:
+        去重后的平台名称列表
+    """
+    classes: dict[str, type] = {}
+    for platform in platforms:
+        try:
+            client_class = load_client_class(platform)
+        except Exception:
+            # 导入失败的平台在执行阶段统一报告
+            continue
+        if client_class is not None:
+            classes[platform] = client_class
+
+    covered = {
+        platform
+        for platform, client_class in classes.items()
+        if any(
+            other is not client_class and issubclass(client_class, other)
+            for other in classes.values()
+        )
+    }
+    if covered:
+        logger.info(f"以下平台已由其他平台统一执行: {', '.join(sorted(covered))}")
+    return [platform for platform in platforms if platform not in covered]
+
+
+def run_platform(platform: str) -> tuple[str, str, float]:
+    """执行单个平台的签到
+
+    Args:
+        platform: 平台名称（目录名）
+
+    Returns:
+        (平台名称, 执行状态, 耗时秒数)
+    """
+    start = time.monotonic()
+    try:
+        client_class = load_client_class(platform)
+        if client_class is None:
+            return platform, STATUS_FAILED, time.monotonic() - start
+
+        logger.info(f"[{platform}] 开始执行 {client_class.__name__}.run()")
+        with request_context(platform):
+            client_class().run()
+        return platform, STATUS_SUCCESS, time.monotonic() - start
+
+    except SystemExit:
+        # 平台脚本在缺少环境变量时会调用 sys.exit，此处视为未配置
+        logger.warning(f"[{platform}] 未配置或已退出，跳过")
+        return platform, STATUS_SKIPPED, time.monotonic() - start
+    except Exception:
+        logger.error(f"[{platform}] 执行失败, 错误信息: {traceback.format_exc()}")
+        return platform, STATUS_FAILED, time.monotonic() - start
+
+
+async def run_platform_async(platform: str) -> tuple[str, str, float]:
+    """在事件循环中执行单个平台的签到
+
+    提供 run_async() 的客户端直接在事件循环中执行，其余客户端放到线程中执行。
+
+    Args:
+        platform: 平台名称（目录名）
+
+    Returns:
+        (平台名称, 执行状态, 耗时秒数)
+    """
+    import asyncio
+
+    start = time.monotonic()
+    try:
+        client_class = load_client_class(platform)
+        if client_class is None:
+            return platform, STATUS_FAILED, time.monotonic() - start
+
+        client = client_class()
+        with request_context(platform):
+            if hasattr(client, "run_async"):
+                logger.info(
+                    f"[{platform}] 开始执行 {client_class.__name__}.run_async()"
+                )
+                await client.run_async()
+            else:
+                logger.info(f"[{platform}] 开始执行 {client_class.__name__}.run()")
+                await asyncio.to_thread(client.run)
+        return platform, STATUS_SUCCESS, time.monotonic() - start
+
+    except SystemExit:
+        logger.warning(f"[{platform}] 未配置或已退出，跳过")
+        return platform, STATUS_SKIPPED, time.monotonic() - start
+    except Exception:
+        logger.error(f"[{platform}] 执行失败, 错误信息: {traceback.format_exc()}")
+        return platform, STATUS_FAILED, time.monotonic() - start
+
+
+def run_threaded(platforms: list[str], workers: int) -> list[tuple[str, str, float]]:
+    """在线程池中并发执行各平台
+
+    Args:
+        platforms: 平台名称列表
+        workers: 并发平台数
+
+    Returns:
+        各平台的执行结果
+    """
+    results: list[tuple[str, str, float]] = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="platform") as pool:
+        futures = [pool.submit(run_platform, platform) for platform in platforms]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return results
+
+
+async def run_asyncio(platforms: list[str], workers: int) -> list[tuple[str, str, float]]:
+    """在同一个事件循环中并发执行各平台
+
+    Args:
+        platforms: 平台名称列表
+        workers: 并发平台数
+
+    Returns:
+        各平台的执行结果
+    """
+    import asyncio
+
+    semaphore = asyncio.Semaphore(workers)
+
+    async def run_limited(platform: str) -> tuple[str, str, float]:
+        async with semaphore:
+            return await run_platform_async(platform)
+
+    return list(await asyncio.gather(*(run_limited(p) for p in platforms)))
+
+
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="多平台统一签到入口")
+    parser.add_argument(
+        "platforms",
+        nargs="*",
+        help=f"要执行的平台，默认读取 {ENV_PLATFORMS} 或执行全部平台",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=int(os.environ.get(ENV_WORKERS, DEFAULT_WORKERS)),
+        help=f"并发执行的平台数，默认 {DEFAULT_WORKERS}",
+    )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        choices=[ENGINE_THREAD, ENGINE_ASYNCIO, ENGINE_PROCESS],
+        default=os.environ.get(ENV_ENGINE, ENGINE_THREAD),
+        help=f"执行引擎，默认 {ENGINE_THREAD}",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=float(os.environ.get(ENV_TIMEOUT, DEFAULT_TIMEOUT)),
+        help=(
+            f"process 引擎下单个平台的超时时间（秒），超时后结束子进程，"
+            f"0 表示不限制，默认 {DEFAULT_TIMEOUT}"
+        ),
+    )
+    parser.add_argument(
+        "--shard",
+        help=f"只执行账号分片 i/n（例如 1/4），默认读取 {ENV_SHARD}",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """主函数"""
+    setup_logging(LOG_FORMAT)
+    args = parse_args()
+    shard = set_shard(args.shard)
+
+    available = discover_platforms()
+    platforms = args.platforms or [
+        p.strip() for p in os.environ.get(ENV_PLATFORMS, "").split(",") if p.strip()
+    ]
+    if not platforms:
+        platforms = available
+
+    unknown = [p for p in platforms if p not in available]
+    if unknown:
+        logger.error(f"未知平台: {', '.join(unknown)}, 可选: {', '.join(available)}")
+        platforms = [p for p in platforms if p in available]
+    platforms = drop_covered_platforms(platforms)
+
+    workers = max(1, min(args.workers, len(platforms) or 1))
+    logger.info(f"共 {len(platforms)} 个平台, 并发数 {workers}, 执行引擎 {args.engine}")
+
+    start = time.monotonic()
+    if args.engine == ENGINE_ASYNCIO:
+        # 只有 asyncio 引擎才导入事件循环和异步请求模块
+        from utils import aio
+
+        results = aio.run(run_asyncio(platforms, workers))
+    elif args.engine == ENGINE_PROCESS:
+        from runner.process import run_processes
+
+        results = run_processes(platforms, workers, args.timeout)
+    else:
+        results = run_threaded(platforms, workers)
+
+    logger.info("=" * 40)
+    for platform, status, elapsed in sorted(results):
+        logger.info(f"{platform:<15} {status} ({elapsed:.2f}s)")
+    logger.info(f"全部平台执行完毕, 总耗时 {time.monotonic() - start:.2f}s")
+    if shard is not None:
+        logger.info(f"分片 {shard} 的结果已写入 {results_dir()}")
+
+    # 所有平台的通知汇总为一条发送
+    XizhiNotifier.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""多进程执行引擎
+
+每个平台在单独的子进程中执行，同时存在的子进程不超过并发数：平台之间
+不共享 GIL，某个平台崩溃（如段错误、内存耗尽）或卡死也不会影响其他平台。
+
+子进程执行完后通过管道发回一条紧凑的结果记录：
+
+    (平台名称, 执行状态, 耗时秒数, 待发通知, 请求指标)
+
+待发通知和请求指标由主进程汇总，因此汇总日志、合并通知和指标文件与其他
+执行引擎相同。超过单平台超时时间的子进程会被强制结束。
+"""
+
+import atexit
+import logging
+import multiprocessing
+import time
+from multiprocessing.connection import Connection, wait
+from typing import Any, Optional
+
+from runner.main import LOG_FORMAT, STATUS_FAILED, STATUS_TIMEOUT, run_platform
+from utils.log import setup_logging
+from utils.metrics import RequestRecord, get_recorder, write_metrics
+from utils.notify import XizhiNotifier
+
+logger = logging.getLogger(__name__)
+
+# 子进程结束后等待其退出的秒数
+JOIN_TIMEOUT = 5
+
+
+def _child_main(platform: str, conn: Connection) -> None:
+    """子进程入口：执行平台签到并把结果发回主进程
+
+    Args:
+        platform: 平台名称
+        conn: 管道的发送端
+    """
+    # 通知和指标由主进程统一处理，子进程退出时不再发送或写入
+    atexit.unregister(XizhiNotifier.flush)
+    atexit.unregister(write_metrics)
+    setup_logging(LOG_FORMAT)
+
+    platform, status, elapsed = run_platform(platform)
+    records = [record.to_tuple() for record in get_recorder().take()]
+    conn.send((platform, status, elapsed, XizhiNotifier.take(), records))
+    conn.close()
+
+
+class Worker:
+    """执行单个平台的子进程
+
+    Attributes:
+        platform: 平台名称
+        process: 子进程
+        conn: 管道的接收端
+        started: 启动时间（time.monotonic()）
+    """
+
+    __slots__ = ("platform", "process", "conn", "started")
+
+    def __init__(self, platform: str) -> None:
+        """启动子进程
+
+        Args:
+            platform: 平台名称
+        """
+        self.platform = platform
+        self.conn, child_conn = multiprocessing.Pipe(duplex=False)
+        self.process = multiprocessing.Process(
+            target=_child_main,
+            args=(platform, child_conn),
+            name=f"platform-{platform}",
+            daemon=True,
+        )
+        self.started = time.monotonic()
+        self.process.start()
+        # 子进程持有发送端，主进程关闭自己的副本，子进程退出后 recv() 才能结束
+        child_conn.close()
+
+    @property
+    def elapsed(self) -> float:
+        """已执行的秒数"""
+        return time.monotonic() - self.started
+
+    def receive(self) -> Optional[tuple[Any, ...]]:
+        """读取子进程发回的结果，子进程未发送就退出时返回 None"""
+        try:
+            if self.conn.poll():
+                return self.conn.recv()
+        except (EOFError, OSError):
+            pass
+        return None
+
+    def close(self, kill: bool = False) -> None:
+        """结束子进程并关闭管道
+
+        Args:
+            kill: 是否强制结束
+        """
+        if kill:
+            self.process.kill()
+        self.process.join(JOIN_TIMEOUT)
+        self.conn.close()
+
+
+def _collect(message: tuple[Any, ...]) -> tuple[str, str, float]:
+    """把子进程的通知和请求指标合并到主进程，返回执行结果"""
+    platform, status, elapsed, notifications, records = message
+    for notification in notifications:
+        XizhiNotifier.enqueue(*notification)
+    recorder = get_recorder()
+    for values in records:
+        recorder.record(RequestRecord.from_tuple(values))
+    return platform, status, elapsed
+
+
+def run_processes(
+    platforms: list[str], workers: int, timeout: float
+) -> list[tuple[str, str, float]]:
+    """在子进程中并发执行各平台
+
+    Args:
+        platforms: 平台名称列表
+        workers: 同时执行的平台数
+        timeout: 单个平台的超时时间（秒），0 表示不限制
+
+    Returns:
+        各平台的执行结果
+    """
+    pending = list(platforms)
+    running: list[Worker] = []
+    results: list[tuple[str, str, float]] = []
+
+    while pending or running:
+        while pending and len(running) < workers:
+            running.append(Worker(pending.pop(0)))
+
+        # 等到有子进程发回结果、退出或超时
+        wait_timeout = None
+        if timeout > 0:
+            wait_timeout = max(0.0, min(timeout - w.elapsed for w in running))
+        handles: list[Any] = [w.conn for w in running]
+        handles += [w.process.sentinel for w in running]
+        ready = set(wait(handles, timeout=wait_timeout))
+
+        for worker in list(running):
+            if worker.conn in ready or worker.process.sentinel in ready:
+                message = worker.receive()
+                worker.close()
+                if message is None:
+                    logger.error(
+                        f"[{worker.platform}] 子进程异常退出, "
+                        f"退出码 {worker.process.exitcode}"
+                    )
+                    results.append((worker.platform, STATUS_FAILED, worker.elapsed))
+                else:
+                    results.append(_collect(message))
+            elif timeout > 0 and worker.elapsed >= timeout:
+                logger.error(f"[{worker.platform}] 执行超过 {timeout:g}s, 已强制结束")
+                worker.close(kill=True)
+                results.append((worker.platform, STATUS_TIMEOUT, worker.elapsed))
+            else:
+                continue
+            running.remove(worker)
+
+    return results
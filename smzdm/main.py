@@ -6,20 +6,21 @@ https://www.smzdm.com/
 
 import hashlib
 import logging
-import os
 import re
 import sys
 import time
 import traceback
+from typing import TYPE_CHECKING
 
-import requests
+from utils.accounts import Account, AccountSource
+from utils.concurrency import run_accounts, run_accounts_async
+from utils.log import setup_logging
 from utils.notify import XizhiNotifier
+from utils.shard import apply_shard_option
+
+if TYPE_CHECKING:
+    from utils.transport import PooledSession
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 # 环境变量
@@ -59,36 +60,36 @@ class SmzdmClient:
 
     def __init__(self) -> None:
         """初始化客户端"""
-        self.cookies: list[str] = []
+        self.accounts = AccountSource(ENV_COOKIES)
+
+    @property
+    def session(self) -> "PooledSession":
+        """共享的连接池会话（首次发送请求时才导入 requests）"""
+        from utils.transport import get_session
+
+        return get_session()
 
     def load_cookies(self) -> None:
-        """从环境变量加载 cookies"""
-        raw_cookies = os.environ.get(ENV_COOKIES)
-        if not raw_cookies:
+        """检查 cookies 配置（环境变量或账号文件）"""
+        if not self.accounts.configured:
             logger.error(f"请设置 {ENV_COOKIES} 环境变量")
             logger.error('格式: ENV_COOKIES="cookie1||cookie2"')
+            logger.error(f"或通过 {self.accounts.file_env} 指定 JSONL/TOML 账号文件")
             sys.exit(1)
 
-        for cookie in raw_cookies.split("||"):
-            cookie = cookie.strip()
-            self.cookies.append(cookie)
+        logger.info(f"从 {self.accounts.describe()} 加载了 {len(self.accounts)} 个账号")
 
-        logger.info(f"加载了 {len(self.cookies)} 个账号")
-
-    def _get_robot_token(self, cookie: str) -> str:
-        """获取 robot token
-
-        Args:
-            cookie: Cookie 字符串
+    def _robot_token_data(self) -> dict:
+        """构造获取 robot token 的签名表单
 
         Returns:
-            robot token 字符串
+            请求表单字典
         """
         ts = round(time.time() * 1000)
         sign_str = f"f=android&time={ts}&v=10.4.1&weixin=1&key={SIGN_KEY}"
         sign = hashlib.md5(sign_str.encode("utf-8")).hexdigest().upper()
 
-        data = {
+        return {
             "f": "android",
             "v": "10.4.1",
             "weixin": 1,
@@ -96,27 +97,48 @@ class SmzdmClient:
             "sign": sign,
         }
 
+    def _get_robot_token(self, cookie: str) -> str:
+        """获取 robot token
+
+        Args:
+            cookie: Cookie 字符串
+
+        Returns:
+            robot token 字符串
+        """
         headers = {**USER_API_HEADERS, "Cookie": cookie}
-        response = requests.post(ROBOT_TOKEN_URL, headers=headers, data=data)
+        response = self.session.post(
+            ROBOT_TOKEN_URL, headers=headers, data=self._robot_token_data()
+        )
         result = response.json()
         return result["data"]["token"]
 
-    def checkin(self, cookie: str, token: str) -> str:
-        """执行签到
+    async def _get_robot_token_async(self, cookie: str) -> str:
+        """异步获取 robot token，参数和返回值同 _get_robot_token()"""
+        from utils.aio import get_async_session
+
+        headers = {**USER_API_HEADERS, "Cookie": cookie}
+        response = await get_async_session().post(
+            ROBOT_TOKEN_URL, headers=headers, data=self._robot_token_data()
+        )
+        result = response.json()
+        return result["data"]["token"]
+
+    def _checkin_data(self, token: str) -> dict:
+        """构造签到的签名表单
 
         Args:
-            cookie: Cookie 字符串
             token: robot token
 
         Returns:
-            签到结果消息
+            请求表单字典
         """
         time_stamp = round(time.time() * 1000)
         sk = "ierkM0OZZbsuBKLoAgQ6OJneLMXBQXmzX+LXkNTuKch8Ui2jGlahuFyWIzBiDq/L"
         sign_str = f"f=android&sk={sk}&time={time_stamp}&token={token}&v=10.4.1&weixin=1&key={SIGN_KEY}"
         sign = hashlib.md5(sign_str.encode("utf-8")).hexdigest().upper()
 
-        data = {
+        return {
             "f": "android",
             "v": "10.4.1",
             "sk": sk,
@@ -126,8 +148,30 @@ class SmzdmClient:
             "sign": sign,
         }
 
+    def checkin(self, cookie: str, token: str) -> str:
+        """执行签到
+
+        Args:
+            cookie: Cookie 字符串
+            token: robot token
+
+        Returns:
+            签到结果消息
+        """
         headers = {**USER_API_HEADERS, "Cookie": cookie}
-        resp = requests.post(CHECKIN_URL, headers=headers, data=data)
+        resp = self.session.post(
+            CHECKIN_URL, headers=headers, data=self._checkin_data(token)
+        )
+        return resp.json()["error_msg"]
+
+    async def checkin_async(self, cookie: str, token: str) -> str:
+        """异步执行签到，参数和返回值同 checkin()"""
+        from utils.aio import get_async_session
+
+        headers = {**USER_API_HEADERS, "Cookie": cookie}
+        resp = await get_async_session().post(
+            CHECKIN_URL, headers=headers, data=self._checkin_data(token)
+        )
         return resp.json()["error_msg"]
 
     def _get_user_info(self, cookie: str) -> dict:
@@ -142,8 +186,26 @@ class SmzdmClient:
         headers = {**ZHIYOU_HEADERS, "Cookie": cookie}
 
         # 获取用户信息页面
-        info_html = requests.get(USER_INFO_URL, headers=headers).text
+        info_html = self.session.get(USER_INFO_URL, headers=headers).text
+        return self._parse_user_info(info_html)
+
+    async def _get_user_info_async(self, cookie: str) -> dict:
+        """异步获取用户信息，参数和返回值同 _get_user_info()"""
+        from utils.aio import get_async_session
+
+        headers = {**ZHIYOU_HEADERS, "Cookie": cookie}
+        response = await get_async_session().get(USER_INFO_URL, headers=headers)
+        return self._parse_user_info(response.text)
 
+    def _parse_user_info(self, info_html: str) -> dict:
+        """解析用户信息页面
+
+        Args:
+            info_html: 用户信息页面 HTML
+
+        Returns:
+            包含用户信息的字典
+        """
         # 解析用户信息
         name_match = re.findall(
             r'<a href="https://zhiyou.smzdm.com/user"> (.*?) </a>', info_html, re.S
@@ -186,48 +248,109 @@ class SmzdmClient:
             "silver": silver,
         }
 
+    def run_account(self, account: Account, idx: int) -> bool:
+        """执行单个账号签到
+
+        Args:
+            account: 账号
+            idx: 账号序号
+
+        Returns:
+            是否签到成功
+        """
+        cookie = account.cookie
+        try:
+            logger.info(f"账号 [{idx}/{len(self.accounts)}]: 签到中...")
+
+            # 获取用户信息
+            user_info = self._get_user_info(cookie)
+            logger.info(f"  昵称: {user_info['name']}")
+            logger.info(f"  等级: {user_info['level']}")
+            logger.info(f"  金币: {user_info['gold']}")
+            logger.info(f"  碎银: {user_info['silver']}")
+
+            # 获取 robot token
+            token = self._get_robot_token(cookie)
+            logger.info("  获取 robot token 成功")
+
+            # 执行签到
+            checkin_result = self.checkin(cookie, token)
+            logger.info(f"  签到: {checkin_result}")
+            return True
+
+        except Exception:
+            logger.error(
+                f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                "smzdm 签到失败",
+                f"账号 {idx}: 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
+
+    async def run_account_async(self, account: Account, idx: int) -> bool:
+        """异步执行单个账号签到，参数和返回值同 run_account()"""
+        import asyncio
+
+        cookie = account.cookie
+        try:
+            logger.info(f"账号 [{idx}/{len(self.accounts)}]: 签到中...")
+
+            # 用户信息页面和 robot token 互不依赖，同时请求
+            user_info, token = await asyncio.gather(
+                self._get_user_info_async(cookie),
+                self._get_robot_token_async(cookie),
+            )
+            logger.info(f"  昵称: {user_info['name']}")
+            logger.info(f"  等级: {user_info['level']}")
+            logger.info(f"  金币: {user_info['gold']}")
+            logger.info(f"  碎银: {user_info['silver']}")
+            logger.info("  获取 robot token 成功")
+
+            # 执行签到
+            checkin_result = await self.checkin_async(cookie, token)
+            logger.info(f"  签到: {checkin_result}")
+            return True
+
+        except Exception:
+            logger.error(
+                f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                "smzdm 签到失败",
+                f"账号 {idx}: 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
+
     def run(self) -> None:
         """执行所有账号签到"""
         self.load_cookies()
 
-        success_count = 0
-        for idx, cookie in enumerate(self.cookies, 1):
-            try:
-                logger.info(f"账号 [{idx}/{len(self.cookies)}]: 签到中...")
-
-                # 获取用户信息
-                user_info = self._get_user_info(cookie)
-                logger.info(f"  昵称: {user_info['name']}")
-                logger.info(f"  等级: {user_info['level']}")
-                logger.info(f"  金币: {user_info['gold']}")
-                logger.info(f"  碎银: {user_info['silver']}")
-
-                # 获取 robot token
-                token = self._get_robot_token(cookie)
-                logger.info("  获取 robot token 成功")
-
-                # 执行签到
-                checkin_result = self.checkin(cookie, token)
-                logger.info(f"  签到: {checkin_result}")
-                success_count += 1
-
-            except Exception:
-                logger.error(
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}"
-                )
-                notifier = XizhiNotifier()
-                notifier.send(
-                    "smzdm 签到失败",
-                    f"账号 {idx}: 签到失败, 错误信息: {traceback.format_exc()}",
-                )
-            finally:
-                logger.info("=" * 40)
-
-        logger.info(f"签到完成: 成功 {success_count}/{len(self.cookies)}")
+        success_count = run_accounts(
+            self.run_account, self.accounts, platform="smzdm"
+        )
+        logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
+
+    async def run_async(self) -> None:
+        """在当前事件循环中异步执行所有账号签到"""
+        self.load_cookies()
+
+        success_count = await run_accounts_async(
+            self.run_account_async, self.accounts, platform="smzdm"
+        )
+        logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
 
 
 def main():
     """主函数"""
+    setup_logging()
+    apply_shard_option()
     client = SmzdmClient()
     client.run()
 
@@ -5,19 +5,20 @@ https://ai.sparkaigf.com/
 """
 
 import logging
-import os
 import sys
 import traceback
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import requests
+from utils.accounts import Account, AccountSource
+from utils.concurrency import run_accounts
+from utils.credentials import CredentialCache, raise_if_rejected
+from utils.log import setup_logging
 from utils.notify import XizhiNotifier
+from utils.shard import apply_shard_option
+
+if TYPE_CHECKING:
+    from utils.transport import PooledSession
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 # 环境变量
@@ -48,31 +49,27 @@ class SparkAIClient:
 
     def __init__(self) -> None:
         """初始化客户端"""
-        self.accounts: list[dict[str, str]] = []
+        self.accounts = AccountSource(ENV_ACCOUNTS, ("username", "password"))
+        # 按用户名缓存 access token
+        self.credentials = CredentialCache("sparkaigf")
 
-    def load_config(self) -> None:
-        """从环境变量加载配置"""
-        raw_accounts = os.environ.get(ENV_ACCOUNTS)
+    @property
+    def session(self) -> "PooledSession":
+        """共享的连接池会话（首次发送请求时才导入 requests）"""
+        from utils.transport import get_session
 
-        if not raw_accounts:
+        return get_session()
+
+    def load_config(self) -> None:
+        """检查账号配置（环境变量或账号文件）"""
+        if not self.accounts.configured:
             logger.error(
                 f'请设置环境变量:\n  {ENV_ACCOUNTS}="username1#password1||username2#password2"'
             )
+            logger.error(f"或通过 {self.accounts.file_env} 指定 JSONL/TOML 账号文件")
             sys.exit(1)
 
-        for account_str in raw_accounts.split("||"):
-            account_str = account_str.strip()
-            if ":" not in account_str:
-                logger.error(
-                    f"账号格式错误，应为 username:password: {account_str[:20]}..."
-                )
-                sys.exit(1)
-            username, password = account_str.split(":", 1)
-            self.accounts.append(
-                {"username": username.strip(), "password": password.strip()}
-            )
-
-        logger.info(f"加载了 {len(self.accounts)} 个账号")
+        logger.info(f"从 {self.accounts.describe()} 加载了 {len(self.accounts)} 个账号")
 
     def login(self, username: str, password: str) -> str:
         """登录获取 Token
@@ -85,7 +82,7 @@ class SparkAIClient:
             Authorization Token
         """
         payload = {"username": username, "password": password}
-        response = requests.post(LOGIN_URL, headers=HEADERS, json=payload)
+        response = self.session.post(LOGIN_URL, headers=HEADERS, json=payload)
         data = response.json()
 
         if data.get("code") != 200:
@@ -105,10 +102,14 @@ class SparkAIClient:
 
         Returns:
             签到记录列表
+
+        Raises:
+            CredentialRejected: Token 已失效
         """
         headers = {**HEADERS, "Authorization": f"Bearer {token}"}
-        response = requests.get(SIGN_LOG_URL, headers=headers)
+        response = self.session.get(SIGN_LOG_URL, headers=headers)
         data = response.json()
+        raise_if_rejected(response, data.get("code"))
 
         if data.get("code") != 200:
             raise ValueError(f"获取签到记录失败: {data.get('message')}")
@@ -123,10 +124,14 @@ class SparkAIClient:
 
         Returns:
             签到结果消息
+
+        Raises:
+            CredentialRejected: Token 已失效
         """
         headers = {**HEADERS, "Authorization": f"Bearer {token}"}
-        response = requests.post(SIGN_URL, headers=headers, json={})
+        response = self.session.post(SIGN_URL, headers=headers, json={})
         data = response.json()
+        raise_if_rejected(response, data.get("code"))
 
         if data.get("code") == 200:
             return data.get("data", "签到成功")
@@ -158,49 +163,67 @@ class SparkAIClient:
         # 签到记录按日期排序，第一条是今天
         return sign_log[0].get("isSigned", False)
 
-    def run(self) -> None:
-        """执行所有账号签到"""
-        self.load_config()
+    def run_account(self, account: Account, idx: int) -> bool:
+        """执行单个账号签到
+
+        Args:
+            account: 账号
+            idx: 账号序号
 
-        success_count = 0
-        for idx, account in enumerate(self.accounts, 1):
-            username = account["username"]
-            password = account["password"]
+        Returns:
+            是否签到成功
+        """
+        username = account.username
+        password = account.password
 
-            try:
-                logger.info(f"账号 [{idx}/{len(self.accounts)}] {username}: 登录中...")
+        try:
+            logger.info(f"账号 [{idx}/{len(self.accounts)}] {username}: 签到中...")
 
-                # 登录获取 Token
+            def login() -> str:
+                logger.info(f"账号 {idx}: 登录中...")
                 token = self.login(username, password)
                 logger.info(f"账号 {idx}: 登录成功")
+                return token
+
+            def checkin(token: str) -> tuple[str, list[dict[str, Any]]]:
+                # 执行签到，再获取签到记录
+                return self.checkin(token), self.get_sign_log(token)
+
+            # 优先使用缓存的 Token，失效时重新登录
+            result, sign_log = self.credentials.call(username, login, checkin)
+            logger.info(f"账号 {idx}: {result}")
 
-                # 执行签到
-                result = self.checkin(token)
-                logger.info(f"账号 {idx}: {result}")
-
-                # 再次获取签到记录
-                sign_log = self.get_sign_log(token)
-                signed_days = self.count_signed_days(sign_log)
-                logger.info(f"账号 {idx}: 本月累计签到 {signed_days} 天")
-                success_count += 1
-
-            except Exception:
-                logger.error(
-                    f"账号 {idx} ({username}): 签到失败, 错误信息: {traceback.format_exc()}"
-                )
-                notifier = XizhiNotifier()
-                notifier.send(
-                    "SparkAI 签到失败",
-                    f"账号 {idx} ({username}): 签到失败, 错误信息: {traceback.format_exc()}",
-                )
-            finally:
-                logger.info("=" * 40)
+            signed_days = self.count_signed_days(sign_log)
+            logger.info(f"账号 {idx}: 本月累计签到 {signed_days} 天")
+            return True
+
+        except Exception:
+            logger.error(
+                f"账号 {idx} ({username}): 签到失败, 错误信息: {traceback.format_exc()}"
+            )
+            XizhiNotifier.enqueue(
+                "SparkAI 签到失败",
+                f"账号 {idx} ({username}): 签到失败",
+                traceback.format_exc(),
+            )
+            return False
+        finally:
+            logger.info("=" * 40)
+
+    def run(self) -> None:
+        """执行所有账号签到"""
+        self.load_config()
 
+        success_count = run_accounts(
+            self.run_account, self.accounts, platform="sparkaigf"
+        )
         logger.info(f"签到完成: 成功 {success_count}/{len(self.accounts)}")
 
 
 def main():
     """主函数"""
+    setup_logging()
+    apply_shard_option()
     client = SparkAIClient()
     client.run()
 
@@ -0,0 +1,216 @@
+"""账号配置模块
+
+各平台的账号默认从环境变量读取，多个账号用 || 分隔。账号较多时可以改为
+写在文件中，通过 <环境变量名>_FILE 指定路径（如 GLADOS_COOKIES_FILE）：
+
+- .jsonl：每行一个账号，可以是 JSON 对象（如 {"username": "u", "password": "p"}），
+  也可以是与环境变量中单个账号格式相同的字符串（如 "u:p"）
+- .toml：accounts 表数组，每项的键与 JSON 对象相同
+
+账号在签到时逐条读取、解析，不会一次性把所有账号读入内存（TOML 文件需要
+整体解析，账号很多时建议使用 JSONL）。配置了账号分片（CHECKIN_SHARD）时
+只返回属于当前分片的账号。
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+from utils.shard import get_shard
+
+logger = logging.getLogger(__name__)
+
+# 账号文件路径的环境变量名后缀
+FILE_ENV_SUFFIX = "_FILE"
+
+# 环境变量中多个账号的分隔符
+ACCOUNT_SEPARATOR = "||"
+
+# 账号字段及 JSON/TOML 中可用的别名
+FIELDS = ("username", "password", "cookie", "token")
+FIELD_ALIASES = {"email": "username", "user": "username"}
+
+
+class Account:
+    """单个账号
+
+    不同平台使用的字段不同：Cookie 类平台只有 cookie，登录类平台有
+    username（用户名或邮箱）和 password，买单吧有 cookie 和 token。
+    repr 中不包含密码、Cookie 等敏感信息，可以作为每日签到状态的键。
+
+    Attributes:
+        username: 用户名或邮箱
+        password: 密码
+        cookie: Cookie 字符串
+        token: 令牌
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self, username: str = "", password: str = "", cookie: str = "", token: str = ""
+    ) -> None:
+        """初始化账号
+
+        Args:
+            username: 用户名或邮箱
+            password: 密码
+            cookie: Cookie 字符串
+            token: 令牌
+        """
+        self.username = username
+        self.password = password
+        self.cookie = cookie
+        self.token = token
+
+    def __repr__(self) -> str:
+        if self.username:
+            return f"Account(username={self.username!r})"
+        # 只展示 Cookie 的摘要，不同 Cookie 的摘要不同
+        digest = hashlib.sha256(self.cookie.encode()).hexdigest()[:16]
+        return f"Account(cookie=sha256:{digest})"
+
+
+class AccountSource:
+    """单个环境变量对应的账号来源
+
+    可以多次迭代，每次迭代重新读取环境变量或文件，格式错误的账号输出日志后跳过。
+
+    Attributes:
+        env_name: 环境变量名
+        fields: 单个账号字符串中依次包含的字段，例如 ("username", "password")
+        separator: 单个账号字符串中字段之间的分隔符
+        path: 账号文件路径，未设置 <env_name>_FILE 时为 None
+        shard: 账号分片，未配置时为 None
+    """
+
+    def __init__(
+        self,
+        env_name: str,
+        fields: tuple[str, ...] = ("cookie",),
+        separator: str = ":",
+    ) -> None:
+        """初始化账号来源
+
+        Args:
+            env_name: 环境变量名
+            fields: 单个账号字符串中依次包含的字段
+            separator: 单个账号字符串中字段之间的分隔符
+        """
+        self.env_name = env_name
+        self.fields = fields
+        self.separator = separator
+        file_path = os.environ.get(self.file_env)
+        self.path = Path(file_path) if file_path else None
+        self.shard = get_shard()
+        self._count: Optional[int] = None
+
+    @property
+    def file_env(self) -> str:
+        """账号文件路径的环境变量名"""
+        return self.env_name + FILE_ENV_SUFFIX
+
+    @property
+    def configured(self) -> bool:
+        """是否设置了环境变量或账号文件"""
+        return self.path is not None or bool(os.environ.get(self.env_name))
+
+    @property
+    def format_hint(self) -> str:
+        """单个账号字符串的格式说明，例如 username:password"""
+        return self.separator.join(self.fields)
+
+    def _entries(self) -> Iterator[Union[str, dict[str, Any], ValueError]]:
+        """逐条读取原始账号（字符串或字典），JSONL 中无法解析的行返回 ValueError"""
+        if self.path is None:
+            for entry in os.environ.get(self.env_name, "").split(ACCOUNT_SEPARATOR):
+                if entry.strip():
+                    yield entry
+            return
+
+        if self.path.suffix == ".toml":
+            try:
+                import tomllib
+            except ImportError:  # Python 3.10
+                import tomli as tomllib
+
+            with open(self.path, "rb") as f:
+                yield from tomllib.load(f).get("accounts", [])
+            return
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        # 交给 _accounts 按格式错误的账号处理
+                        yield ValueError(f"JSON 格式错误: {e}")
+
+    def parse(self, entry: Union[str, dict[str, Any]]) -> Account:
+        """解析单个账号
+
+        Args:
+            entry: 账号字符串或字典
+
+        Returns:
+            账号
+
+        Raises:
+            ValueError: 账号格式错误
+        """
+        if isinstance(entry, dict):
+            values = {FIELD_ALIASES.get(key, key): value for key, value in entry.items()}
+            unknown = set(values) - set(FIELDS)
+            if unknown:
+                raise ValueError(f"未知字段: {', '.join(sorted(unknown))}")
+            missing = [field for field in self.fields if not values.get(field)]
+            if missing:
+                raise ValueError(f"缺少字段: {', '.join(missing)}")
+            return Account(**{key: str(value).strip() for key, value in values.items()})
+
+        if not isinstance(entry, str):
+            raise ValueError(f"应为字符串或对象: {entry!r}")
+        parts = entry.strip().split(self.separator, len(self.fields) - 1)
+        if len(parts) != len(self.fields):
+            raise ValueError(f"应为 {self.format_hint}: {entry.strip()[:20]}...")
+        return Account(**{f: part.strip() for f, part in zip(self.fields, parts)})
+
+    def _accounts(self, log_errors: bool) -> Iterator[Account]:
+        """逐条解析账号，跳过格式错误及不属于当前分片的账号"""
+        for line_no, entry in enumerate(self._entries(), 1):
+            try:
+                if isinstance(entry, ValueError):
+                    raise entry
+                account = self.parse(entry)
+            except ValueError as e:
+                if log_errors:
+                    logger.error(
+                        f"[{self.env_name}] 第 {line_no} 个账号格式错误，已跳过: {e}"
+                    )
+                continue
+            # 按 环境变量名:账号 的哈希分片，与账号在文件中的位置无关
+            if self.shard is None or self.shard.owns(f"{self.env_name}:{account!r}"):
+                yield account
+
+    def __iter__(self) -> Iterator[Account]:
+        """逐条读取并解析账号，跳过格式错误的账号"""
+        return self._accounts(log_errors=True)
+
+    def __len__(self) -> int:
+        """可以解析的账号数量（结果会缓存）
+
+        需要逐条解析账号，格式错误及不属于当前分片的账号不计入，
+        与实际迭代得到的账号数一致。
+        """
+        if self._count is None:
+            self._count = sum(1 for _ in self._accounts(log_errors=False))
+        return self._count
+
+    def describe(self) -> str:
+        """账号来源说明，用于日志"""
+        return str(self.path) if self.path is not None else f"环境变量 {self.env_name}"
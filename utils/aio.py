@@ -0,0 +1,349 @@
+"""asyncio HTTP 执行引擎
+
+为签到客户端提供异步请求能力，所有平台、所有账号的请求可以在同一个
+事件循环中并发执行，并按主机限制同时进行的请求数。
+
+安装了 aiohttp 时使用原生异步连接池，并按 utils.resilience 的策略
+重试和熔断；未安装时退化为在线程池中调用共享的 requests 会话，接口保持一致。
+两种方式都会按 utils.metrics 记录请求指标，并支持 utils.cassette 的录制和回放。
+"""
+
+import asyncio
+import json as jsonlib
+import os
+import time
+from typing import Any, Awaitable, Optional, TypeVar, Union
+from urllib.parse import urlsplit
+
+import requests
+
+from utils.cassette import Cassette, get_cassette
+from utils.metrics import add_timing, connection_timings, record_request
+from utils.resilience import (
+    DEFAULT_TIMEOUT,
+    IDEMPOTENT_METHODS,
+    RETRY_STATUS_CODES,
+    RETRY_TOTAL,
+    backoff_delay,
+    get_breaker,
+    is_server_failure,
+)
+from utils.transport import (
+    DEFAULT_HOST_CONCURRENCY,
+    ENV_HOST_CONCURRENCY,
+    POOL_MAXSIZE,
+    get_session,
+    resolve_url,
+)
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp 为可选依赖
+    aiohttp = None
+
+T = TypeVar("T")
+
+
+class AsyncResponse:
+    """异步请求的响应
+
+    Attributes:
+        status_code: HTTP 状态码
+        text: 响应文本
+        cookies: 响应设置的 Cookie（名称到值的映射）
+        url: 请求地址
+        content: 响应体原始字节
+        headers: 响应头
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        text: str,
+        cookies: dict[str, str],
+        url: str,
+        content: bytes = b"",
+        headers: Optional[dict[str, str]] = None,
+    ) -> None:
+        """初始化响应
+
+        Args:
+            status_code: HTTP 状态码
+            text: 响应文本
+            cookies: 响应设置的 Cookie
+            url: 请求地址
+            content: 响应体原始字节
+            headers: 响应头
+        """
+        self.status_code = status_code
+        self.text = text
+        self.cookies = cookies
+        self.url = url
+        self.content = content
+        self.headers = headers or {}
+
+    @property
+    def ok(self) -> bool:
+        """状态码是否小于 400"""
+        return self.status_code < 400
+
+    def json(self) -> Any:
+        """解析 JSON 响应"""
+        return jsonlib.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        """状态码异常时抛出 requests.HTTPError，与同步客户端保持一致"""
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class AsyncSession:
+    """按主机限流的异步会话
+
+    Attributes:
+        timeout: 默认超时（秒）
+        host_concurrency: 单个主机同时进行的最大请求数
+    """
+
+    def __init__(
+        self,
+        timeout: Union[float, tuple[float, float]] = DEFAULT_TIMEOUT,
+        host_concurrency: int = DEFAULT_HOST_CONCURRENCY,
+    ) -> None:
+        """初始化会话
+
+        Args:
+            timeout: 默认超时（秒），可以是 (连接超时, 读取超时)
+            host_concurrency: 单个主机同时进行的最大请求数
+        """
+        self.timeout = timeout
+        self.host_concurrency = max(1, host_concurrency)
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self._client: Optional["aiohttp.ClientSession"] = None
+
+    def _host_slot(self, host: str) -> asyncio.Semaphore:
+        """获取主机对应的并发信号量"""
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = asyncio.Semaphore(self.host_concurrency)
+            self._host_slots[host] = slot
+        return slot
+
+    def _get_client(self) -> "aiohttp.ClientSession":
+        """创建 aiohttp 会话（不保存 Cookie，避免账号串号）"""
+        if self._client is None:
+            if isinstance(self.timeout, tuple):
+                connect_timeout, read_timeout = self.timeout
+                timeout = aiohttp.ClientTimeout(
+                    connect=connect_timeout, sock_read=read_timeout
+                )
+            else:
+                timeout = aiohttp.ClientTimeout(total=self.timeout)
+            self._client = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=POOL_MAXSIZE),
+                cookie_jar=aiohttp.DummyCookieJar(),
+                timeout=timeout,
+                trace_configs=[_connection_trace()],
+            )
+        return self._client
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> AsyncResponse:
+        """通过 aiohttp 发送一次请求"""
+        async with self._get_client().request(
+            method, resolve_url(url), **kwargs
+        ) as response:
+            content = await response.read()
+            text = await response.text()
+            cookies = {name: morsel.value for name, morsel in response.cookies.items()}
+            return AsyncResponse(
+                response.status,
+                text,
+                cookies,
+                str(response.url),
+                content,
+                dict(response.headers),
+            )
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> AsyncResponse:
+        """发送请求
+
+        Args:
+            method: 请求方法
+            url: 请求地址
+            **kwargs: headers、params、data、json 等参数
+
+        Returns:
+            响应对象
+
+        Raises:
+            CircuitOpenError: 主机处于熔断状态
+        """
+        host = urlsplit(url).hostname or ""
+        if aiohttp is None:
+            # 共享会话已包含重试和熔断
+            async with self._host_slot(host):
+                response = await asyncio.to_thread(
+                    get_session().request, method, url, **kwargs
+                )
+            return AsyncResponse(
+                response.status_code,
+                response.text,
+                response.cookies.get_dict(),
+                response.url,
+                response.content,
+                dict(response.headers),
+            )
+
+        cassette = get_cassette()
+        with connection_timings() as timings:
+            start = time.perf_counter()
+            try:
+                if cassette is not None and cassette.replaying:
+                    response = await self._replay(cassette, method, url, host, **kwargs)
+                else:
+                    response = await self._request_with_retry(
+                        method, url, host, **kwargs
+                    )
+            except Exception:
+                record_request(method, url, 0, 0, time.perf_counter() - start, timings)
+                raise
+            elapsed = time.perf_counter() - start
+        record_request(
+            method, url, response.status_code, len(response.content), elapsed, timings
+        )
+        if cassette is not None and cassette.recording:
+            cassette.record(
+                method,
+                url,
+                kwargs,
+                response.status_code,
+                response.headers,
+                response.cookies,
+                response.content,
+                elapsed,
+            )
+        return response
+
+    async def _replay(
+        self, cassette: "Cassette", method: str, url: str, host: str, **kwargs: Any
+    ) -> AsyncResponse:
+        """回放录制的响应（按录制耗时等待，不发出请求）"""
+        interaction = cassette.next(method, url, kwargs.get("params"))
+        async with self._host_slot(host):
+            await asyncio.sleep(cassette.delay(interaction))
+        return AsyncResponse(
+            interaction.status,
+            interaction.text,
+            interaction.cookies,
+            url,
+            interaction.body,
+            interaction.headers,
+        )
+
+    async def _request_with_retry(
+        self, method: str, url: str, host: str, **kwargs: Any
+    ) -> AsyncResponse:
+        """通过 aiohttp 发送请求，按 utils.resilience 的策略重试和熔断"""
+        breaker = get_breaker(host)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            breaker.before_request()
+            try:
+                async with self._host_slot(host):
+                    response = await self._send(method, url, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                breaker.record_failure()
+                # 连接失败时请求尚未发出，所有方法都可以重试；其余错误只重试幂等请求
+                retryable = idempotent or isinstance(e, aiohttp.ClientConnectorError)
+                if not retryable or attempt >= RETRY_TOTAL:
+                    raise
+            except Exception:
+                # 其他异常不重试，但同样计入失败，避免试探请求出错后一直熔断
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # 被取消时释放试探名额
+                breaker.release_probe()
+                raise
+            else:
+                if is_server_failure(response.status_code):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                retryable = idempotent and response.status_code in RETRY_STATUS_CODES
+                if not retryable or attempt >= RETRY_TOTAL:
+                    return response
+            attempt += 1
+            await asyncio.sleep(backoff_delay(attempt))
+
+    async def get(self, url: str, **kwargs: Any) -> AsyncResponse:
+        """发送 GET 请求"""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> AsyncResponse:
+        """发送 POST 请求"""
+        return await self.request("POST", url, **kwargs)
+
+    async def close(self) -> None:
+        """关闭底层连接池"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+def _connection_trace() -> "aiohttp.TraceConfig":
+    """记录 aiohttp 建立连接耗时（含 TLS 握手）的 TraceConfig"""
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_start(session: Any, context: Any, params: Any) -> None:
+        context.connect_start = time.perf_counter()
+
+    async def on_end(session: Any, context: Any, params: Any) -> None:
+        add_timing("connect", time.perf_counter() - context.connect_start)
+
+    trace_config.on_connection_create_start.append(on_start)
+    trace_config.on_connection_create_end.append(on_end)
+    return trace_config
+
+
+_sessions: dict[asyncio.AbstractEventLoop, AsyncSession] = {}
+
+
+def get_async_session() -> AsyncSession:
+    """获取当前事件循环共享的异步会话
+
+    Returns:
+        当前事件循环的 AsyncSession 实例
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None:
+        session = AsyncSession(
+            host_concurrency=int(
+                os.environ.get(ENV_HOST_CONCURRENCY, DEFAULT_HOST_CONCURRENCY)
+            )
+        )
+        _sessions[loop] = session
+    return session
+
+
+def run(main: Awaitable[T]) -> T:
+    """在新的事件循环中执行协程，结束后关闭该循环的异步会话
+
+    Args:
+        main: 要执行的协程
+
+    Returns:
+        协程返回值
+    """
+
+    async def run_and_close() -> T:
+        try:
+            return await main
+        finally:
+            session = _sessions.pop(asyncio.get_running_loop(), None)
+            if session is not None:
+                await session.close()
+
+    return asyncio.run(run_and_close())
@@ -0,0 +1,465 @@
+"""HTTP 录制/回放模块
+
+设置 CHECKIN_CASSETTE 后，共享会话（及 asyncio 引擎）发出的请求会被录制到
+cassette 文件，或从 cassette 文件回放，用于离线复现问题和稳定地测量耗时：
+
+- record：正常发出请求，并把请求和响应追加到文件（每行一个 JSON）
+- replay：不发出任何请求，按 请求方法 + 地址 依次返回录制的响应，并按录制时的
+  耗时（乘以 CHECKIN_CASSETTE_LATENCY）等待；同一请求的回放次数超过录制次数时
+  循环使用，没有录制过的请求抛出 CassetteMiss
+
+Cookie、Authorization、密码、token 等敏感字段在写入文件前替换为
+***<哈希前缀>，地址中的敏感参数替换为 ***，因此回放时可以使用任意账号。
+登录接口可能把令牌放在普通字段中返回（如 {"data": "<token>"}），因此还会
+记下请求中实际发送的 Cookie、Authorization 及敏感参数的值和响应设置的
+Cookie 值，从已录制和之后录制的响应体中替换掉这些字符串。
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.cookies import cookiejar_from_dict
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from utils.store import file_lock
+
+# 环境变量
+ENV_CASSETTE = "CHECKIN_CASSETTE"
+ENV_CASSETTE_MODE = "CHECKIN_CASSETTE_MODE"
+ENV_CASSETTE_LATENCY = "CHECKIN_CASSETTE_LATENCY"
+
+# 模式
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+# 按值脱敏的敏感值的最小长度，过短的值（如 Cookie 中的 1）不替换
+MIN_SECRET_LENGTH = 8
+
+# 需要脱敏的请求头、参数、JSON 字段及 Cookie 名称（不区分大小写）
+SENSITIVE_KEYS = {
+    "access_key",
+    "access_token",
+    "authorization",
+    "bili_jct",
+    "cookie",
+    "csrf",
+    "password",
+    "refresh_token",
+    "sessdata",
+    "session",
+    "sign",
+    "token",
+}
+
+
+class CassetteMiss(requests.ConnectionError):
+    """回放时 cassette 中没有匹配的请求"""
+
+
+def mask(value: str) -> str:
+    """敏感值脱敏：同一个值的结果相同，便于对照，但无法还原"""
+    return f"***{hashlib.sha256(value.encode()).hexdigest()[:8]}"
+
+
+def mask_data(data: Any) -> Any:
+    """递归替换字典中敏感字段的字符串值"""
+    if isinstance(data, dict):
+        return {
+            key: (
+                mask(value)
+                if isinstance(value, str) and key.lower() in SENSITIVE_KEYS
+                else mask_data(value)
+            )
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [mask_data(item) for item in data]
+    return data
+
+
+def mask_url(url: str, params: Any = None) -> str:
+    """合并 params 后将地址中敏感参数的值替换为 ***（作为回放时的匹配键）"""
+    if params:
+        prepared = requests.PreparedRequest()
+        prepared.prepare_url(url, params)
+        url = prepared.url or url
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = [
+        (key, "***" if key.lower() in SENSITIVE_KEYS else value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query, safe="*")))
+
+
+def _mask_body(content: bytes) -> bytes:
+    """JSON 响应体中的敏感字段脱敏，其余响应体原样保存"""
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return content
+    return json.dumps(mask_data(data), ensure_ascii=False).encode()
+
+
+def _collect_secrets(data: Any, secrets: set[str]) -> None:
+    """收集字典中敏感字段的字符串值"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, str) and key.lower() in SENSITIVE_KEYS:
+                secrets.add(value)
+            else:
+                _collect_secrets(value, secrets)
+    elif isinstance(data, list):
+        for item in data:
+            _collect_secrets(item, secrets)
+
+
+def request_secrets(
+    url: str, request_kwargs: dict[str, Any], cookies: dict[str, str]
+) -> set[str]:
+    """一次请求中出现的敏感值
+
+    包括敏感请求头的值（Authorization 同时取去掉 Bearer 等前缀后的令牌，
+    Cookie 同时取每个 Cookie 的值）、敏感参数的值及响应设置的 Cookie 值。
+
+    Args:
+        url: 请求地址
+        request_kwargs: 请求参数（headers、params、json、data 等）
+        cookies: 响应设置的 Cookie
+
+    Returns:
+        不短于 MIN_SECRET_LENGTH 的敏感值
+    """
+    secrets: set[str] = set(cookies.values())
+    for name, value in (request_kwargs.get("headers") or {}).items():
+        if not isinstance(value, str) or name.lower() not in SENSITIVE_KEYS:
+            continue
+        secrets.add(value)
+        if name.lower() == "cookie":
+            for item in value.split(";"):
+                secrets.add(item.partition("=")[2].strip())
+        elif value.split():
+            secrets.add(value.split()[-1])
+    for name in ("params", "json", "data"):
+        _collect_secrets(request_kwargs.get(name), secrets)
+    query = parse_qsl(urlsplit(url).query, keep_blank_values=True)
+    secrets.update(value for key, value in query if key.lower() in SENSITIVE_KEYS)
+    return {secret for secret in secrets if len(secret) >= MIN_SECRET_LENGTH}
+
+
+def scrub(text: str, secrets: set[str]) -> str:
+    """把文本中出现的敏感值替换为脱敏后的值（先替换较长的值）"""
+    for secret in sorted(secrets, key=len, reverse=True):
+        if secret in text:
+            text = text.replace(secret, mask(secret))
+    return text
+
+
+def _request_summary(kwargs: dict[str, Any]) -> dict[str, Any]:
+    """脱敏后的请求参数（只用于排查问题，不参与匹配）"""
+    summary: dict[str, Any] = {}
+    if kwargs.get("headers"):
+        summary["headers"] = mask_data(dict(kwargs["headers"]))
+    for name in ("params", "json", "data"):
+        value = kwargs.get(name)
+        if isinstance(value, (dict, list)):
+            summary[name] = mask_data(value)
+        elif value:
+            summary[name] = f"<{len(value)} bytes>"
+    return summary
+
+
+class Interaction:
+    """一次录制的请求和响应
+
+    Attributes:
+        method: 请求方法
+        url: 脱敏后的请求地址
+        status: HTTP 状态码
+        headers: 响应头（不含 Set-Cookie）
+        cookies: 响应设置的 Cookie（值已脱敏）
+        body: 响应体（JSON 中的敏感字段已脱敏）
+        elapsed: 录制时的请求耗时（秒）
+    """
+
+    __slots__ = ("method", "url", "status", "headers", "cookies", "body", "elapsed")
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        body: bytes,
+        elapsed: float,
+    ) -> None:
+        self.method = method
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.cookies = cookies
+        self.body = body
+        self.elapsed = elapsed
+
+    @property
+    def key(self) -> str:
+        """回放时的匹配键"""
+        return f"{self.method} {self.url}"
+
+    @property
+    def text(self) -> str:
+        """响应文本"""
+        encoding = get_encoding_from_headers(CaseInsensitiveDict(self.headers))
+        return self.body.decode(encoding or "utf-8", errors="replace")
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为写入文件的字典（非 UTF-8 响应体使用 base64）"""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        try:
+            data["body"] = self.body.decode()
+        except UnicodeDecodeError:
+            del data["body"]
+            data["body_b64"] = base64.b64encode(self.body).decode()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Interaction":
+        """从文件中的字典创建"""
+        if "body_b64" in data:
+            body = base64.b64decode(data["body_b64"])
+        else:
+            body = data.get("body", "").encode()
+        return cls(
+            data["method"],
+            data["url"],
+            data["status"],
+            data.get("headers", {}),
+            data.get("cookies", {}),
+            body,
+            data.get("elapsed", 0.0),
+        )
+
+    def to_response(self, url: str) -> requests.Response:
+        """构造 requests 响应对象
+
+        Args:
+            url: 原始请求地址
+        """
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.cookies = cookiejar_from_dict(self.cookies)
+        response.url = url
+        response.reason = "Replayed"
+        response.elapsed = timedelta(seconds=self.elapsed)
+        return response
+
+
+class Cassette:
+    """cassette 文件
+
+    录制时文件由锁文件（<文件名>.lock）保护，多个进程可以录制到同一个文件。
+
+    Attributes:
+        path: 文件路径
+        mode: record 或 replay
+        latency_scale: 回放时录制耗时的倍数，0 表示不等待
+    """
+
+    def __init__(self, path: Path, mode: str, latency_scale: float = 1.0) -> None:
+        """初始化 cassette
+
+        Args:
+            path: 文件路径
+            mode: record 或 replay
+            latency_scale: 回放时录制耗时的倍数
+
+        Raises:
+            ValueError: 模式错误
+        """
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"{ENV_CASSETTE_MODE} 应为 record 或 replay: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._interactions: Optional[dict[str, list[Interaction]]] = None
+        self._cursors: dict[str, int] = {}
+        # 录制时已知的敏感值
+        self._secrets: set[str] = set()
+
+    @property
+    def recording(self) -> bool:
+        """是否为录制模式"""
+        return self.mode == MODE_RECORD
+
+    @property
+    def replaying(self) -> bool:
+        """是否为回放模式"""
+        return self.mode == MODE_REPLAY
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        request_kwargs: dict[str, Any],
+        status: int,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        content: bytes,
+        elapsed: float,
+    ) -> None:
+        """追加一次请求和响应（写入前脱敏）
+
+        请求中出现了新的敏感值时，先从文件中已录制的响应里替换掉这些值，
+        例如登录接口返回、之后作为 Authorization 发送的令牌。
+
+        Args:
+            method: 请求方法
+            url: 原始请求地址
+            request_kwargs: 请求参数（headers、params、json、data 等）
+            status: HTTP 状态码
+            headers: 响应头
+            cookies: 响应设置的 Cookie
+            content: 响应体
+            elapsed: 请求耗时（秒）
+        """
+        interaction = Interaction(
+            method.upper(),
+            mask_url(url, request_kwargs.get("params")),
+            status,
+            {k: v for k, v in headers.items() if k.lower() != "set-cookie"},
+            {name: mask(value) for name, value in cookies.items()},
+            _mask_body(content),
+            round(elapsed, 6),
+        )
+        line = json.dumps(
+            {**interaction.to_dict(), "request": _request_summary(request_kwargs)},
+            ensure_ascii=False,
+        )
+        secrets = request_secrets(url, request_kwargs, cookies)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, file_lock(self.path.with_suffix(".lock")):
+            new_secrets = secrets - self._secrets
+            self._secrets |= secrets
+            if new_secrets:
+                self._scrub_file(new_secrets)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(scrub(line, self._secrets) + "\n")
+
+    def _scrub_file(self, secrets: set[str]) -> None:
+        """从已录制的内容中替换掉敏感值（调用方需持有锁）"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return
+        scrubbed = scrub(text, secrets)
+        if scrubbed == text:
+            return
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(scrubbed)
+        os.replace(tmp_path, self.path)
+
+    def _load(self) -> dict[str, list[Interaction]]:
+        """读取文件中的全部录制（只读取一次）"""
+        if self._interactions is None:
+            interactions: dict[str, list[Interaction]] = {}
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        interaction = Interaction.from_dict(json.loads(line))
+                        interactions.setdefault(interaction.key, []).append(interaction)
+            self._interactions = interactions
+        return self._interactions
+
+    def next(self, method: str, url: str, params: Any = None) -> Interaction:
+        """取出请求对应的下一个录制
+
+        Args:
+            method: 请求方法
+            url: 原始请求地址
+            params: 查询参数
+
+        Returns:
+            录制的请求和响应
+
+        Raises:
+            CassetteMiss: 没有录制过该请求
+        """
+        key = f"{method.upper()} {mask_url(url, params)}"
+        with self._lock:
+            candidates = self._load().get(key)
+            if not candidates:
+                raise CassetteMiss(f"cassette 中没有录制该请求: {key}")
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+        return candidates[cursor % len(candidates)]
+
+    def delay(self, interaction: Interaction) -> float:
+        """回放时需要等待的秒数"""
+        return interaction.elapsed * self.latency_scale
+
+    def replay(self, method: str, url: str, params: Any = None) -> requests.Response:
+        """回放请求：等待录制耗时后返回录制的响应
+
+        Args:
+            method: 请求方法
+            url: 原始请求地址
+            params: 查询参数
+
+        Returns:
+            响应对象
+
+        Raises:
+            CassetteMiss: 没有录制过该请求
+        """
+        interaction = self.next(method, url, params)
+        time.sleep(self.delay(interaction))
+        return interaction.to_response(url)
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """按环境变量获取当前的 cassette
+
+    Returns:
+        cassette，未设置 CHECKIN_CASSETTE 时返回 None
+
+    Raises:
+        ValueError: 模式或延迟倍数配置错误
+    """
+    global _cassette
+    path = os.environ.get(ENV_CASSETTE)
+    if not path:
+        return None
+    mode = os.environ.get(ENV_CASSETTE_MODE, MODE_REPLAY)
+    latency_scale = float(os.environ.get(ENV_CASSETTE_LATENCY, 1.0))
+    with _cassette_lock:
+        cassette = _cassette
+        if (
+            cassette is None
+            or cassette.path != Path(path)
+            or cassette.mode != mode
+            or cassette.latency_scale != latency_scale
+        ):
+            cassette = _cassette = Cassette(Path(path), mode, latency_scale)
+    return cassette
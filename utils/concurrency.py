@@ -0,0 +1,305 @@
+"""多账号并发执行模块
+
+按配置的并发数在有界线程池（或 asyncio 事件循环）中执行各账号的签到流程，
+并按账号缓冲日志，账号执行结束后再统一输出，保证日志按账号分组。
+指定平台名称时，当天已完成签到的账号直接跳过。账号内发出的请求在
+请求指标中标记平台和账号序号。
+账号可以是任意可迭代对象（如逐行读取文件的 AccountSource），执行时按需读取，
+同时在途的账号数不超过并发数的两倍。
+"""
+
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sized,
+    TypeVar,
+)
+
+from utils.metrics import request_context
+from utils.notify import XizhiNotifier
+from utils.shard import get_shard, write_result
+from utils.state import DailyState
+
+# 环境变量
+ENV_ACCOUNT_WORKERS = "CHECKIN_ACCOUNT_WORKERS"
+
+# 默认逐个账号执行
+DEFAULT_ACCOUNT_WORKERS = 1
+# asyncio 模式下默认同时执行的账号数（实际并发由单主机并发数限制）
+DEFAULT_ASYNC_ACCOUNT_WORKERS = 64
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+logger = logging.getLogger(__name__)
+
+# 当前账号的日志缓冲区（线程和 asyncio 任务各自独立）
+_records: ContextVar[Optional[list[logging.LogRecord]]] = ContextVar(
+    "account_log_records", default=None
+)
+_install_lock = threading.Lock()
+_installed = False
+
+
+class _AccountLogFilter(logging.Filter):
+    """将当前账号的日志暂存到缓冲区"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        records = _records.get()
+        if records is None:
+            return True
+        # 同一条记录可能经过多个 handler，只缓存一次
+        if not records or records[-1] is not record:
+            records.append(record)
+        return False
+
+
+def _install_log_filter() -> None:
+    """为根 logger 的所有 handler 安装账号日志过滤器（只安装一次）"""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        log_filter = _AccountLogFilter()
+        for handler in logging.getLogger().handlers:
+            handler.addFilter(log_filter)
+        _installed = True
+
+
+@contextmanager
+def account_log_group() -> Iterator[None]:
+    """缓冲当前账号的日志，退出时按原顺序一次性输出"""
+    _install_log_filter()
+    token = _records.set([])
+    try:
+        yield
+    finally:
+        records = _records.get() or []
+        _records.reset(token)
+        for record in records:
+            logging.getLogger(record.name).handle(record)
+
+
+def get_account_workers(default: int = DEFAULT_ACCOUNT_WORKERS) -> int:
+    """读取账号并发数配置
+
+    Args:
+        default: 未配置环境变量时的默认值
+
+    Returns:
+        账号并发数，最小为 1
+    """
+    try:
+        workers = int(os.environ.get(ENV_ACCOUNT_WORKERS, default))
+    except ValueError:
+        workers = default
+    return max(1, workers)
+
+
+def submit_in_context(
+    pool: ThreadPoolExecutor, func: Callable[..., R], *args: object
+) -> "Future[R]":
+    """提交任务到线程池，任务在当前上下文的副本中执行
+
+    账号内的日志分组及请求指标中的平台、账号标记在线程池中同样生效。
+
+    Args:
+        pool: 线程池
+        func: 处理函数
+        *args: 处理函数的参数
+
+    Returns:
+        任务的 Future
+    """
+    return pool.submit(contextvars.copy_context().run, func, *args)
+
+
+def map_concurrent(func: Callable[[T], R], items: Iterable[T], workers: int) -> list[R]:
+    """在线程池中并发执行 func，按 items 的顺序返回结果
+
+    每个任务在当前上下文的副本中执行（见 submit_in_context()）。
+
+    Args:
+        func: 处理函数
+        items: 参数列表
+        workers: 最大并发数
+
+    Returns:
+        各参数对应的结果
+    """
+    items = list(items)
+    if len(items) <= 1 or workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        futures = [submit_in_context(pool, func, item) for item in items]
+        return [future.result() for future in futures]
+
+
+def _count(accounts: Iterable[T]) -> Optional[int]:
+    """账号总数，无法预知时返回 None"""
+    return len(accounts) if isinstance(accounts, Sized) else None
+
+
+def _skip_done(
+    state: DailyState, account: T, idx: int, total: Optional[int]
+) -> bool:
+    """账号今天已完成签到时输出日志并返回 True"""
+    if not state.is_done(account):
+        return False
+    logger.info(f"账号 [{idx}/{total or '?'}]: 今日已完成签到，跳过")
+    return True
+
+
+def _report(platform: Optional[str], success_count: int, total: int) -> int:
+    """将平台的签到结果放入通知发件箱（仅在开启成功通知时发送）
+
+    配置了账号分片时同时写入分片结果文件，供汇总各分片的结果。
+    """
+    if platform:
+        shard = get_shard()
+        title = f"{platform} 签到完成"
+        if shard is not None:
+            write_result(platform, shard, success_count, total)
+            title = f"{platform} 分片 {shard} 签到完成"
+        XizhiNotifier.enqueue(title, f"成功 {success_count}/{total}", success=True)
+    return success_count
+
+
+def run_accounts(
+    func: Callable[[T, int], bool],
+    accounts: Iterable[T],
+    workers: Optional[int] = None,
+    platform: Optional[str] = None,
+    on_result: Optional[Callable[[T, bool], None]] = None,
+) -> int:
+    """执行所有账号的签到流程
+
+    Args:
+        func: 单账号处理函数，参数为 (账号, 账号序号)，返回是否成功
+        accounts: 账号列表或可迭代对象，按需读取
+        workers: 并发数，默认读取环境变量 CHECKIN_ACCOUNT_WORKERS
+        platform: 平台名称，指定时跳过当天已完成的账号并记录新完成的账号
+        on_result: 每个账号结束后的回调，参数为 (账号, 是否成功)
+
+    Returns:
+        成功的账号数（含当天已完成而跳过的账号）
+    """
+    state = DailyState(platform) if platform else None
+    total = _count(accounts)
+
+    def run_one(account: T, idx: int) -> bool:
+        if state is not None and _skip_done(state, account, idx, total):
+            success = True
+        else:
+            with request_context(platform, idx):
+                success = func(account, idx)
+            if success and state is not None:
+                state.mark_done(account)
+        if on_result is not None:
+            on_result(account, success)
+        return success
+
+    def run_grouped(account: T, idx: int) -> bool:
+        with account_log_group():
+            return run_one(account, idx)
+
+    workers = workers or get_account_workers()
+    if total is not None:
+        workers = min(workers, total or 1)
+    success_count = 0
+    processed = 0
+    try:
+        if workers <= 1:
+            for idx, account in enumerate(accounts, 1):
+                processed = idx
+                if run_one(account, idx):
+                    success_count += 1
+            return _report(platform, success_count, processed)
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="account"
+        ) as pool:
+            # 逐个提交账号，在途的任务数达到上限时等待其中一个完成
+            pending: set[Future[bool]] = set()
+            for idx, account in enumerate(accounts, 1):
+                processed = idx
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    success_count += sum(1 for future in done if future.result())
+                pending.add(pool.submit(run_grouped, account, idx))
+            success_count += sum(1 for future in wait(pending).done if future.result())
+        return _report(platform, success_count, processed)
+    finally:
+        if state is not None:
+            state.flush()
+
+
+async def run_accounts_async(
+    func: Callable[[T, int], Awaitable[bool]],
+    accounts: Iterable[T],
+    workers: Optional[int] = None,
+    platform: Optional[str] = None,
+    on_result: Optional[Callable[[T, bool], None]] = None,
+) -> int:
+    """在当前事件循环中并发执行所有账号的签到流程
+
+    Args:
+        func: 单账号异步处理函数，参数为 (账号, 账号序号)，返回是否成功
+        accounts: 账号列表或可迭代对象，按需读取
+        workers: 同时执行的账号数，默认读取环境变量 CHECKIN_ACCOUNT_WORKERS，
+            未配置时为 DEFAULT_ASYNC_ACCOUNT_WORKERS
+        platform: 平台名称，指定时跳过当天已完成的账号并记录新完成的账号
+        on_result: 每个账号结束后的回调，参数为 (账号, 是否成功)
+
+    Returns:
+        成功的账号数（含当天已完成而跳过的账号）
+    """
+    import asyncio
+
+    state = DailyState(platform) if platform else None
+    total = _count(accounts)
+    workers = workers or get_account_workers(DEFAULT_ASYNC_ACCOUNT_WORKERS)
+    if total is not None:
+        workers = min(workers, total or 1)
+    numbered = enumerate(accounts, 1)
+    processed = 0
+
+    async def run_grouped(account: T, idx: int) -> bool:
+        with account_log_group():
+            if state is not None and _skip_done(state, account, idx, total):
+                success = True
+            else:
+                with request_context(platform, idx):
+                    success = await func(account, idx)
+                if success and state is not None:
+                    state.mark_done(account)
+            if on_result is not None:
+                on_result(account, success)
+            return success
+
+    async def worker() -> int:
+        # 各 worker 共享同一个账号迭代器，每次取下一个账号执行
+        nonlocal processed
+        success_count = 0
+        for idx, account in numbered:
+            processed = max(processed, idx)
+            if await run_grouped(account, idx):
+                success_count += 1
+        return success_count
+
+    try:
+        results = await asyncio.gather(*(worker() for _ in range(workers)))
+    finally:
+        if state is not None:
+            state.flush()
+    return _report(platform, sum(results), processed)
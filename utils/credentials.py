@@ -0,0 +1,203 @@
+"""登录凭证缓存模块
+
+按平台、账号缓存登录得到的 session cookie 或 access token 及其过期时间，
+下次运行时直接使用缓存的凭证签到，只有凭证过期或签到被拒绝时才重新登录。
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from utils.store import JsonStore, data_dir
+
+logger = logging.getLogger(__name__)
+
+# 环境变量：设置为 0 时关闭凭证缓存
+ENV_CREDENTIAL_CACHE = "CHECKIN_CREDENTIAL_CACHE"
+
+# 无法从凭证中解析过期时间时的默认有效期（秒）
+DEFAULT_TTL = 7 * 24 * 3600
+# 提前失效的时间（秒），避免凭证在签到过程中过期
+EXPIRY_MARGIN = 300
+
+# 表示凭证被拒绝的 HTTP 状态码或业务码
+REJECTED_CODES = (401, 403)
+
+T = TypeVar("T")
+
+
+class CredentialRejected(Exception):
+    """服务端拒绝了登录凭证（未登录或凭证已过期）"""
+
+
+def raise_if_rejected(response: Any, code: Any = None) -> None:
+    """响应表示凭证被拒绝时抛出 CredentialRejected
+
+    Args:
+        response: 响应（requests.Response 或 AsyncResponse）
+        code: 响应体中的业务码，部分平台用 200 状态码返回 401
+
+    Raises:
+        CredentialRejected: 状态码或业务码为 401/403
+    """
+    if response.status_code in REJECTED_CODES or code in REJECTED_CODES:
+        raise CredentialRejected(f"凭证被拒绝: {response.status_code} {response.text}")
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """从 JWT 中解析过期时间
+
+    Args:
+        token: access token
+
+    Returns:
+        过期时间戳，不是 JWT 或没有 exp 字段时返回 None
+    """
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+    except (ValueError, AttributeError):
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+class CredentialCache:
+    """按账号缓存登录凭证
+
+    缓存文件位于数据目录下的 credentials/<namespace>.json，账号以哈希值
+    作为键，文件权限为 0600。
+
+    Attributes:
+        namespace: 命名空间，一般为平台名称
+        ttl: 默认有效期（秒）
+        enabled: 是否启用缓存
+    """
+
+    def __init__(self, namespace: str, ttl: float = DEFAULT_TTL) -> None:
+        """初始化缓存
+
+        Args:
+            namespace: 命名空间，一般为平台名称
+            ttl: 无法从凭证中解析过期时间时的默认有效期（秒）
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.enabled = os.environ.get(ENV_CREDENTIAL_CACHE, "1") != "0"
+        self._store: Optional[JsonStore] = None
+
+    @property
+    def store(self) -> JsonStore:
+        """缓存文件存储（首次使用时创建）"""
+        if self._store is None:
+            self._store = JsonStore(
+                data_dir() / "credentials" / f"{self.namespace}.json"
+            )
+        return self._store
+
+    def _key(self, account: str) -> str:
+        """账号对应的缓存键"""
+        return hashlib.sha256(f"{self.namespace}:{account}".encode()).hexdigest()
+
+    def _expires_at(self, credential: Any) -> float:
+        """计算凭证的过期时间"""
+        expires_at = token_expiry(credential) if isinstance(credential, str) else None
+        return (expires_at or time.time() + self.ttl) - EXPIRY_MARGIN
+
+    def get(self, account: str) -> Any:
+        """读取未过期的凭证
+
+        Args:
+            account: 账号标识
+
+        Returns:
+            缓存的凭证，不存在或已过期返回 None
+        """
+        if not self.enabled:
+            return None
+        entry = self.store.get(self._key(account))
+        if not entry or entry.get("expires_at", 0) <= time.time():
+            return None
+        return entry.get("credential")
+
+    def set(self, account: str, credential: Any) -> None:
+        """保存凭证
+
+        Args:
+            account: 账号标识
+            credential: 可 JSON 序列化的凭证
+        """
+        if not self.enabled:
+            return
+        self.store.set(
+            self._key(account),
+            {"credential": credential, "expires_at": self._expires_at(credential)},
+        )
+
+    def invalidate(self, account: str) -> None:
+        """删除凭证
+
+        Args:
+            account: 账号标识
+        """
+        if self.enabled:
+            self.store.delete(self._key(account))
+
+    def call(
+        self,
+        account: str,
+        login: Callable[[], Any],
+        use: Callable[[Any], T],
+    ) -> Optional[T]:
+        """使用缓存的凭证执行操作，凭证失效时重新登录
+
+        Args:
+            account: 账号标识
+            login: 登录函数，返回凭证，登录失败返回 None
+            use: 使用凭证的操作，凭证被拒绝时抛出 CredentialRejected
+
+        Returns:
+            use 的返回值，登录失败返回 None
+        """
+        credential = self.get(account)
+        if credential is not None:
+            logger.info("使用缓存的登录凭证")
+            try:
+                return use(credential)
+            except CredentialRejected:
+                logger.info("缓存的登录凭证已失效，重新登录")
+                self.invalidate(account)
+
+        credential = login()
+        if credential is None:
+            return None
+        self.set(account, credential)
+        return use(credential)
+
+    async def call_async(
+        self,
+        account: str,
+        login: Callable[[], Awaitable[Any]],
+        use: Callable[[Any], Awaitable[T]],
+    ) -> Optional[T]:
+        """异步版本的 call()，login 和 use 为协程函数"""
+        credential = self.get(account)
+        if credential is not None:
+            logger.info("使用缓存的登录凭证")
+            try:
+                return await use(credential)
+            except CredentialRejected:
+                logger.info("缓存的登录凭证已失效，重新登录")
+                self.invalidate(account)
+
+        credential = await login()
+        if credential is None:
+            return None
+        self.set(account, credential)
+        return await use(credential)
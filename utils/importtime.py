@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+导入耗时报告
+在子进程中以 python -X importtime 导入指定模块，统计每个模块的导入耗时，
+用于跟踪短时运行（如 CI）的冷启动耗时是否变慢
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+from utils.log import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# 仓库根目录
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# 默认列出的模块数
+DEFAULT_TOP = 15
+
+# 区分解释器启动和被测模块导入的标记
+MARKER = "# checkin-importtime"
+
+
+class ImportCost:
+    """单个模块的导入耗时
+
+    Attributes:
+        name: 模块名
+        self_us: 模块自身的导入耗时（微秒）
+        cumulative_us: 含依赖模块的导入耗时（微秒）
+        depth: 导入深度，0 表示被测代码直接导入
+    """
+
+    __slots__ = ("name", "self_us", "cumulative_us", "depth")
+
+    def __init__(
+        self, name: str, self_us: int, cumulative_us: int, depth: int
+    ) -> None:
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.depth = depth
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为字典"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def default_modules() -> list[str]:
+    """统一入口及所有平台模块"""
+    from runner.main import discover_platforms
+
+    return ["runner.main"] + [f"{platform}.main" for platform in discover_platforms()]
+
+
+def parse_importtime(output: str) -> tuple[list[ImportCost], int]:
+    """解析 -X importtime 的输出
+
+    Args:
+        output: 子进程的标准错误输出
+
+    Returns:
+        (标记之后导入的模块列表, 被测模块的总导入耗时（微秒）)
+    """
+    costs: list[ImportCost] = []
+    total_us = 0
+    measuring = False
+    for line in output.splitlines():
+        if line.startswith(MARKER):
+            parts = line.split()
+            if measuring and len(parts) > 2:
+                total_us = int(parts[-1])
+            measuring = True
+            continue
+        if not measuring or not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        costs.append(
+            ImportCost(name.strip(), int(fields[0]), int(fields[1]), depth)
+        )
+    return costs, total_us
+
+
+def measure(modules: list[str]) -> tuple[list[ImportCost], int]:
+    """在新的解释器中导入模块并统计耗时
+
+    Args:
+        modules: 模块名列表
+
+    Returns:
+        (各模块的导入耗时, 总导入耗时（微秒）)
+
+    Raises:
+        RuntimeError: 子进程导入失败
+    """
+    script = "\n".join(
+        [
+            "import importlib, sys, time",
+            f"sys.stderr.write({MARKER!r} + '\\n')",
+            "start = time.perf_counter()",
+            # 平台目录名可能以数字开头（如 996coder），不能用 import 语句
+            *(f"importlib.import_module({module!r})" for module in modules),
+            "elapsed = round((time.perf_counter() - start) * 1e6)",
+            f"sys.stderr.write(f'{MARKER} total {{elapsed}}\\n')",
+        ]
+    )
+    env = {**os.environ, "PYTHONPATH": str(ROOT_DIR)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        errors = [
+            line
+            for line in result.stderr.splitlines()
+            if not line.startswith(("import time:", MARKER))
+        ]
+        raise RuntimeError("导入失败:\n" + "\n".join(errors[-20:]))
+    return parse_importtime(result.stderr)
+
+
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="导入耗时报告")
+    parser.add_argument(
+        "modules",
+        nargs="*",
+        help="要导入的模块，默认统一入口及全部平台模块",
+    )
+    parser.add_argument(
+        "-n",
+        "--top",
+        type=int,
+        default=DEFAULT_TOP,
+        help=f"列出耗时最多的模块数，默认 {DEFAULT_TOP}",
+    )
+    parser.add_argument(
+        "--json",
+        dest="json_path",
+        help="将完整结果写入 JSON 文件",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="总导入耗时超过该值（毫秒）时以退出码 1 结束，用于 CI 检查",
+    )
+    return parser.parse_args()
+
+
+def report(costs: list[ImportCost], total_us: int, top: int) -> None:
+    """输出导入耗时报告
+
+    Args:
+        costs: 各模块的导入耗时
+        total_us: 总导入耗时（微秒）
+        top: 列出的模块数
+    """
+    logger.info(f"共导入 {len(costs)} 个模块, 总耗时 {total_us / 1000:.1f}ms")
+    logger.info(f"{'自身(ms)':>10}{'累计(ms)':>10}  模块")
+    for cost in sorted(costs, key=lambda c: c.self_us, reverse=True)[:top]:
+        logger.info(
+            f"{cost.self_us / 1000:>10.1f}{cost.cumulative_us / 1000:>10.1f}  "
+            f"{'  ' * cost.depth}{cost.name}"
+        )
+
+    # 标准库以外的顶层依赖，便于发现不必要的提前导入
+    packages: dict[str, int] = {}
+    for cost in costs:
+        if "." in cost.name or cost.name in sys.stdlib_module_names:
+            continue
+        packages[cost.name] = max(packages.get(cost.name, 0), cost.cumulative_us)
+    if packages:
+        logger.info("第三方及仓库内的包（累计）:")
+        for name, cumulative_us in sorted(
+            packages.items(), key=lambda item: item[1], reverse=True
+        ):
+            logger.info(f"{cumulative_us / 1000:>10.1f}ms  {name}")
+
+
+def main() -> None:
+    """主函数"""
+    setup_logging("%(message)s")
+    args = parse_args()
+    modules = args.modules or default_modules()
+
+    try:
+        costs, total_us = measure(modules)
+    except RuntimeError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    report(costs, total_us, args.top)
+
+    if args.json_path:
+        data: dict[str, Any] = {
+            "modules": modules,
+            "total_us": total_us,
+            "imports": [cost.to_dict() for cost in costs],
+        }
+        Path(args.json_path).write_text(
+            json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+    if args.budget_ms is not None and total_us / 1000 > args.budget_ms:
+        logger.error(
+            f"导入耗时 {total_us / 1000:.1f}ms 超过预算 {args.budget_ms:.1f}ms"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""日志配置模块
+
+各平台脚本在 main() 中调用 setup_logging()，导入模块本身不会修改日志配置，
+统一入口、基准测试等导入平台模块的程序可以自行配置日志。
+"""
+
+import logging
+
+# 单平台脚本的日志格式
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s"
+
+
+def setup_logging(fmt: str = LOG_FORMAT) -> None:
+    """配置根 logger（已配置过时不生效）
+
+    Args:
+        fmt: 日志格式
+    """
+    logging.basicConfig(level=logging.INFO, format=fmt)
@@ -0,0 +1,484 @@
+"""请求指标模块
+
+记录每个出站请求的平台、账号序号、主机、接口、状态码、响应字节数，
+以及建立连接（含 DNS 解析）、TLS 握手和总耗时。
+
+设置环境变量 CHECKIN_METRICS_DIR 后，进程退出时在该目录下写入：
+- checkin_metrics.json：请求明细，以及按平台、按接口统计的耗时分布
+- checkin.prom：Prometheus textfile 格式的耗时直方图和计数器
+未设置时不记录任何数据。
+"""
+
+import atexit
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# 环境变量：指标输出目录
+ENV_METRICS_DIR = "CHECKIN_METRICS_DIR"
+
+# 输出文件名
+JSON_FILE = "checkin_metrics.json"
+PROM_FILE = "checkin.prom"
+
+# 耗时直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 日志中列出的耗时最多的接口数
+TOP_ENDPOINTS = 5
+
+# 未在平台内发出的请求（如推送通知）归入的平台名称
+UNKNOWN_PLATFORM = "other"
+
+# 当前请求所属的平台和账号序号
+_platform: ContextVar[str] = ContextVar("metrics_platform", default=UNKNOWN_PLATFORM)
+_account: ContextVar[Optional[int]] = ContextVar("metrics_account", default=None)
+# 当前请求建立连接的耗时累计
+_timings: ContextVar[Optional[dict[str, float]]] = ContextVar(
+    "metrics_timings", default=None
+)
+
+
+def enabled() -> bool:
+    """是否开启了指标记录"""
+    return bool(os.environ.get(ENV_METRICS_DIR))
+
+
+@contextmanager
+def request_context(
+    platform: Optional[str] = None, account: Optional[int] = None
+) -> Iterator[None]:
+    """标记其中发出的请求所属的平台和账号序号
+
+    Args:
+        platform: 平台名称，不传时沿用外层的平台
+        account: 账号序号，不传时沿用外层的账号
+    """
+    platform_token = _platform.set(platform) if platform else None
+    account_token = _account.set(account) if account is not None else None
+    try:
+        yield
+    finally:
+        if account_token is not None:
+            _account.reset(account_token)
+        if platform_token is not None:
+            _platform.reset(platform_token)
+
+
+@contextmanager
+def connection_timings() -> Iterator[dict[str, float]]:
+    """收集其中新建连接的耗时
+
+    Yields:
+        耗时字典，包含 connect（DNS 解析和 TCP 连接）和 tls（TLS 握手），单位秒
+    """
+    timings = {"connect": 0.0, "tls": 0.0}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def add_timing(name: str, seconds: float) -> None:
+    """累加当前请求的连接耗时（不在 connection_timings() 中时忽略）
+
+    Args:
+        name: connect 或 tls
+        seconds: 耗时（秒）
+    """
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] += seconds
+
+
+def percentile(values: list[float], q: float) -> float:
+    """计算分位数（最近秩法）
+
+    Args:
+        values: 已排序的数值列表
+        q: 分位，0~1
+
+    Returns:
+        分位数，列表为空时返回 0
+    """
+    if not values:
+        return 0.0
+    index = min(len(values), max(1, math.ceil(q * len(values)))) - 1
+    return values[index]
+
+
+class RequestRecord:
+    """单个请求的指标
+
+    Attributes:
+        platform: 平台名称
+        account: 账号序号，不在账号内发出的请求为 None
+        method: 请求方法
+        host: 主机名
+        endpoint: 接口路径（不含查询字符串）
+        status: HTTP 状态码，请求失败时为 0
+        bytes: 响应体字节数
+        connect: 建立连接耗时（含 DNS 解析，秒），复用连接时为 0
+        tls: TLS 握手耗时（秒）
+        total: 总耗时（含重试，秒）
+        started_at: 开始时间戳
+    """
+
+    __slots__ = (
+        "platform",
+        "account",
+        "method",
+        "host",
+        "endpoint",
+        "status",
+        "bytes",
+        "connect",
+        "tls",
+        "total",
+        "started_at",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        size: int,
+        total: float,
+        timings: dict[str, float],
+    ) -> None:
+        """初始化指标，平台和账号序号取自当前上下文
+
+        Args:
+            method: 请求方法
+            url: 请求地址
+            status: HTTP 状态码，请求失败时为 0
+            size: 响应体字节数
+            total: 总耗时（秒）
+            timings: connection_timings() 收集的连接耗时
+        """
+        parts = urlsplit(url)
+        self.platform = _platform.get()
+        self.account = _account.get()
+        self.method = method.upper()
+        self.host = parts.hostname or ""
+        self.endpoint = parts.path or "/"
+        self.status = status
+        self.bytes = size
+        self.connect = timings["connect"]
+        self.tls = timings["tls"]
+        self.total = total
+        self.started_at = time.time() - total
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为字典"""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        for name in ("connect", "tls", "total", "started_at"):
+            data[name] = round(data[name], 6)
+        return data
+
+    def to_tuple(self) -> tuple[Any, ...]:
+        """转换为按 __slots__ 顺序排列的元组（用于跨进程传递）"""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def from_tuple(cls, values: tuple[Any, ...]) -> "RequestRecord":
+        """从 to_tuple() 的结果还原"""
+        record = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, values):
+            setattr(record, name, value)
+        return record
+
+
+def _distribution(records: list[RequestRecord]) -> dict[str, Any]:
+    """统计一组请求的耗时分布"""
+    totals = sorted(record.total for record in records)
+    return {
+        "count": len(records),
+        "errors": sum(1 for record in records if not 0 < record.status < 500),
+        "bytes": sum(record.bytes for record in records),
+        "total_seconds": round(sum(totals), 6),
+        "connect_seconds": round(sum(record.connect for record in records), 6),
+        "tls_seconds": round(sum(record.tls for record in records), 6),
+        "mean_ms": round(sum(totals) / len(totals) * 1000, 3),
+        "p50_ms": round(percentile(totals, 0.5) * 1000, 3),
+        "p90_ms": round(percentile(totals, 0.9) * 1000, 3),
+        "p99_ms": round(percentile(totals, 0.99) * 1000, 3),
+        "max_ms": round(totals[-1] * 1000, 3),
+    }
+
+
+def _bucket_counts(values: list[float]) -> list[int]:
+    """计算直方图各桶（含 +Inf）的累计数量"""
+    return [sum(1 for value in values if value <= le) for le in LATENCY_BUCKETS] + [
+        len(values)
+    ]
+
+
+def _labels(**labels: Any) -> str:
+    """格式化 Prometheus 标签"""
+    pairs = []
+    for name, value in labels.items():
+        text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        text = text.replace("\n", "\\n")
+        pairs.append(f'{name}="{text}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _histogram(
+    name: str,
+    help_text: str,
+    groups: dict[tuple[str, ...], list[float]],
+    keys: tuple[str, ...],
+) -> list[str]:
+    """生成一个 Prometheus 直方图的所有样本行"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for group, values in sorted(groups.items()):
+        labels = dict(zip(keys, group))
+        bounds = [str(le) for le in LATENCY_BUCKETS] + ["+Inf"]
+        for le, count in zip(bounds, _bucket_counts(values)):
+            lines.append(f"{name}_bucket{_labels(**labels, le=le)} {count}")
+        lines.append(f"{name}_sum{_labels(**labels)} {sum(values):.6f}")
+        lines.append(f"{name}_count{_labels(**labels)} {len(values)}")
+    return lines
+
+
+def _counter(
+    name: str,
+    help_text: str,
+    groups: dict[tuple[str, ...], float],
+    keys: tuple[str, ...],
+) -> list[str]:
+    """生成一个 Prometheus 计数器的所有样本行"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for group, value in sorted(groups.items()):
+        lines.append(f"{name}{_labels(**dict(zip(keys, group)))} {round(value, 6)}")
+    return lines
+
+
+class MetricsRecorder:
+    """进程内的请求指标记录器（线程安全）"""
+
+    def __init__(self) -> None:
+        """初始化记录器"""
+        self._records: list[RequestRecord] = []
+        self._lock = threading.Lock()
+
+    def record(self, record: RequestRecord) -> None:
+        """记录一个请求
+
+        Args:
+            record: 请求指标
+        """
+        with self._lock:
+            self._records.append(record)
+
+    def records(self) -> list[RequestRecord]:
+        """获取已记录的请求"""
+        with self._lock:
+            return list(self._records)
+
+    def clear(self) -> None:
+        """清空已记录的请求"""
+        with self._lock:
+            self._records.clear()
+
+    def take(self) -> list[RequestRecord]:
+        """取出并清空已记录的请求"""
+        with self._lock:
+            records, self._records = self._records, []
+        return records
+
+    def summary(self) -> dict[str, Any]:
+        """按平台和按接口统计耗时分布
+
+        Returns:
+            统计结果，接口按总耗时从高到低排序
+        """
+        records = self.records()
+        by_platform: dict[str, list[RequestRecord]] = {}
+        by_endpoint: dict[tuple[str, str, str], list[RequestRecord]] = {}
+        for record in records:
+            by_platform.setdefault(record.platform, []).append(record)
+            key = (record.platform, record.host, record.endpoint)
+            by_endpoint.setdefault(key, []).append(record)
+
+        endpoints = [
+            {
+                "platform": platform,
+                "host": host,
+                "endpoint": endpoint,
+                **_distribution(group),
+            }
+            for (platform, host, endpoint), group in by_endpoint.items()
+        ]
+        endpoints.sort(key=lambda item: item["total_seconds"], reverse=True)
+        return {
+            "platforms": {
+                platform: _distribution(group)
+                for platform, group in sorted(by_platform.items())
+            },
+            "endpoints": endpoints,
+        }
+
+    def to_prometheus(self) -> str:
+        """生成 Prometheus textfile 格式的指标
+
+        Returns:
+            指标文本
+        """
+        platform_latency: dict[tuple[str, ...], list[float]] = {}
+        endpoint_latency: dict[tuple[str, ...], list[float]] = {}
+        requests_total: dict[tuple[str, ...], float] = {}
+        bytes_total: dict[tuple[str, ...], float] = {}
+        connect_total: dict[tuple[str, ...], float] = {}
+        tls_total: dict[tuple[str, ...], float] = {}
+        for record in self.records():
+            endpoint = (record.platform, record.host, record.endpoint)
+            host = (record.platform, record.host)
+            status = (*endpoint, str(record.status))
+            platform_latency.setdefault((record.platform,), []).append(record.total)
+            endpoint_latency.setdefault(endpoint, []).append(record.total)
+            requests_total[status] = requests_total.get(status, 0) + 1
+            bytes_total[endpoint] = bytes_total.get(endpoint, 0) + record.bytes
+            connect_total[host] = connect_total.get(host, 0) + record.connect
+            tls_total[host] = tls_total.get(host, 0) + record.tls
+
+        endpoint_keys = ("platform", "host", "endpoint")
+        host_keys = ("platform", "host")
+        lines = [
+            *_histogram(
+                "checkin_platform_request_duration_seconds",
+                "Request duration per platform",
+                platform_latency,
+                ("platform",),
+            ),
+            *_histogram(
+                "checkin_request_duration_seconds",
+                "Request duration per endpoint",
+                endpoint_latency,
+                endpoint_keys,
+            ),
+            *_counter(
+                "checkin_requests_total",
+                "Requests per endpoint and status (0 = request failed)",
+                requests_total,
+                (*endpoint_keys, "status"),
+            ),
+            *_counter(
+                "checkin_response_bytes_total",
+                "Response body bytes per endpoint",
+                bytes_total,
+                endpoint_keys,
+            ),
+            *_counter(
+                "checkin_connect_seconds_total",
+                "Time spent on DNS and TCP connect per host",
+                connect_total,
+                host_keys,
+            ),
+            *_counter(
+                "checkin_tls_seconds_total",
+                "Time spent on TLS handshakes per host",
+                tls_total,
+                host_keys,
+            ),
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: Path) -> None:
+        """将指标写入目录下的 JSON 和 Prometheus textfile 文件
+
+        Args:
+            directory: 输出目录（不存在时自动创建）
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        summary = self.summary()
+        report = {
+            "generated_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+            **summary,
+            "requests": [record.to_dict() for record in self.records()],
+        }
+        _write_atomic(
+            directory / JSON_FILE, json.dumps(report, ensure_ascii=False, indent=2)
+        )
+        _write_atomic(directory / PROM_FILE, self.to_prometheus())
+
+        for item in summary["endpoints"][:TOP_ENDPOINTS]:
+            logger.info(
+                f"[{item['platform']}] {item['host']}{item['endpoint']}: "
+                f"{item['count']} 次, 共 {item['total_seconds']:.2f}s, "
+                f"p50 {item['p50_ms']:.0f}ms, p99 {item['p99_ms']:.0f}ms"
+            )
+        logger.info(f"请求指标已写入 {directory}")
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    """通过临时文件原子写入文本（textfile collector 不会读到写了一半的文件）"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+_recorder = MetricsRecorder()
+
+
+def get_recorder() -> MetricsRecorder:
+    """获取进程内共享的指标记录器"""
+    return _recorder
+
+
+def record_request(
+    method: str,
+    url: str,
+    status: int,
+    size: int,
+    total: float,
+    timings: dict[str, float],
+) -> None:
+    """记录一个请求（未开启指标记录时忽略）
+
+    Args:
+        method: 请求方法
+        url: 请求地址（重定向前的原始地址）
+        status: HTTP 状态码，请求失败时为 0
+        size: 响应体字节数
+        total: 总耗时（秒）
+        timings: connection_timings() 收集的连接耗时
+    """
+    if enabled():
+        _recorder.record(RequestRecord(method, url, status, size, total, timings))
+
+
+def write_metrics() -> None:
+    """将已记录的指标写入 CHECKIN_METRICS_DIR（未设置或没有记录时忽略）"""
+    directory = os.environ.get(ENV_METRICS_DIR)
+    if not directory or not _recorder.records():
+        return
+    try:
+        _recorder.write(Path(directory))
+    except OSError as e:
+        logger.error(f"写入请求指标失败: {e}")
+
+
+# 进程退出时写入指标
+atexit.register(write_metrics)
@@ -1,12 +1,173 @@
-"""息知推送通知模块"""
+"""息知推送通知模块
 
+签到过程中通过 XizhiNotifier.enqueue() 把失败（以及可选的成功）消息放入
+发件箱，不阻塞账号签到；进程退出时由 XizhiNotifier.flush() 汇总成
+一条消息发送，相同的错误信息只出现一次。
+
+汇总消息先写入数据目录下的待发队列（notify_spool.jsonl），发送成功后才移除；
+推送服务不可用时保留在队列中，之后的运行按指数退避重新发送。
+队列文件由文件锁（notify_spool.lock）保护，多个进程同时追加或发送不会丢失消息。
+"""
+
+import atexit
+import json
 import logging
 import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
 
-import requests
+from utils.store import data_dir, file_lock
 
 logger = logging.getLogger(__name__)
 
+# 环境变量：设置为 1 时汇总消息中包含签到成功的记录
+ENV_NOTIFY_SUCCESS = "CHECKIN_NOTIFY_SUCCESS"
+
+# 单条错误详情保留的最大长度（保留末尾）
+MAX_DETAIL_LENGTH = 2000
+# 汇总消息内容的最大长度，超出时省略其余的错误详情
+MAX_CONTENT_LENGTH = 8000
+
+# 待发队列：每次最多发送的消息数、最大发送次数
+SPOOL_BATCH_SIZE = 10
+SPOOL_MAX_ATTEMPTS = 8
+# 第 n 次发送失败后等待 SPOOL_BACKOFF * 2 ** (n - 1) 秒再重试
+SPOOL_BACKOFF = 60
+SPOOL_BACKOFF_MAX = 6 * 3600
+
+
+class _Entry:
+    """发件箱中的一条消息"""
+
+    __slots__ = ("title", "content", "detail", "success")
+
+    def __init__(self, title: str, content: str, detail: str, success: bool) -> None:
+        self.title = title
+        self.content = content
+        self.detail = detail
+        self.success = success
+
+
+class NotifySpool:
+    """待发送通知的持久化队列
+
+    新消息追加到 JSONL 文件末尾；发送时按顺序取出到期的消息，
+    发送成功或超过最大次数的消息被移除，其余消息推迟重试。
+
+    队列文件发送后会被整体替换，因此跨进程的互斥使用同目录下单独的
+    锁文件（flock），发送期间其他进程的追加会等待，避免被覆盖。
+
+    Attributes:
+        path: 队列文件路径
+        lock_path: 锁文件路径
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        """初始化队列
+
+        Args:
+            path: 队列文件路径，默认为数据目录下的 notify_spool.jsonl
+        """
+        self.path = path or data_dir() / "notify_spool.jsonl"
+        self.lock_path = self.path.with_suffix(".lock")
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """获取进程内的线程锁和跨进程的文件锁"""
+        with self._lock, file_lock(self.lock_path):
+            yield
+
+    def _read(self) -> list[dict[str, Any]]:
+        """读取队列中的所有消息，跳过损坏的行"""
+        records = []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+
+    def _rewrite(self, records: list[dict[str, Any]]) -> None:
+        """用剩余消息替换队列文件"""
+        if not records:
+            self.path.unlink(missing_ok=True)
+            return
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def append(self, title: str, content: str) -> None:
+        """追加一条待发送的消息
+
+        Args:
+            title: 消息标题
+            content: 消息内容
+        """
+        now = time.time()
+        record = {
+            "title": title,
+            "content": content,
+            "created_at": now,
+            "attempts": 0,
+            "next_attempt": now,
+        }
+        with self._locked():
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def drain(self, send: Callable[[str, str], bool]) -> int:
+        """发送到期的消息
+
+        某条消息发送失败时停止本轮发送，该消息按指数退避推迟。
+
+        Args:
+            send: 发送函数，参数为 (标题, 内容)，返回是否成功
+
+        Returns:
+            队列中剩余的消息数
+        """
+        with self._locked():
+            records = self._read()
+            now = time.time()
+            remaining = []
+            sent = 0
+            stopped = False
+            for record in records:
+                due = record.get("next_attempt", 0) <= now
+                if stopped or not due or sent >= SPOOL_BATCH_SIZE:
+                    remaining.append(record)
+                    continue
+
+                if send(record["title"], record["content"]):
+                    sent += 1
+                    continue
+
+                stopped = True
+                record["attempts"] = record.get("attempts", 0) + 1
+                if record["attempts"] >= SPOOL_MAX_ATTEMPTS:
+                    logger.error(f"通知多次发送失败，已丢弃: {record['title']}")
+                    continue
+                delay = SPOOL_BACKOFF * 2 ** (record["attempts"] - 1)
+                record["next_attempt"] = now + min(delay, SPOOL_BACKOFF_MAX)
+                remaining.append(record)
+
+            self._rewrite(remaining)
+
+        if remaining:
+            logger.warning(f"{len(remaining)} 条通知待稍后重新发送")
+        return len(remaining)
+
 
 class XizhiNotifier:
     """息知推送通知类
@@ -20,6 +181,10 @@ class XizhiNotifier:
 
     BASE_URL = "https://xizhi.qqoq.net"
 
+    # 进程内共享的发件箱
+    _outbox: list[_Entry] = []
+    _outbox_lock = threading.Lock()
+
     def __init__(self, key: str | None = None) -> None:
         """初始化通知器
 
@@ -40,14 +205,19 @@ class XizhiNotifier:
         Returns:
             发送是否成功
         """
+        import requests
+
+        from utils.transport import get_session
+
         url = f"{self.BASE_URL}/{self.key}.send"
-        params = {
+        data = {
             "title": title,
             "content": content,
         }
 
         try:
-            response = requests.get(url, params=params, timeout=10)
+            # 内容放在请求体中，避免汇总消息过长时超出地址长度限制
+            response = get_session().post(url, data=data, timeout=10)
             response.raise_for_status()
             logger.info("通知发送成功: %s", title)
             return True
@@ -55,6 +225,115 @@ class XizhiNotifier:
             logger.error("发送通知失败: %s", e)
             return False
 
+    @classmethod
+    def enqueue(
+        cls, title: str, content: str = "", detail: str = "", success: bool = False
+    ) -> None:
+        """将消息放入发件箱，进程退出时统一发送
+
+        Args:
+            title: 消息标题，例如 "GLaDOS 签到失败"
+            content: 消息内容，例如 "账号 1: 签到失败"
+            detail: 错误详情（如 traceback），标题和详情都相同的消息合并展示
+            success: 是否为成功消息，未设置 CHECKIN_NOTIFY_SUCCESS=1 时丢弃
+        """
+        if success and os.environ.get(ENV_NOTIFY_SUCCESS) != "1":
+            return
+
+        with cls._outbox_lock:
+            cls._outbox.append(_Entry(title, content, detail, success))
+
+    @classmethod
+    def take(cls) -> list[tuple[str, str, str, bool]]:
+        """取出发件箱中的全部消息（用于把子进程的消息交给主进程统一发送）
+
+        Returns:
+            (标题, 内容, 详情, 是否成功) 列表，可原样传给 enqueue()
+        """
+        with cls._outbox_lock:
+            entries, cls._outbox = cls._outbox, []
+        return [(e.title, e.content, e.detail, e.success) for e in entries]
+
+    @staticmethod
+    def build_digest(entries: list[_Entry]) -> tuple[str, str]:
+        """将多条消息汇总为一条
+
+        内容不超过 MAX_CONTENT_LENGTH：超出时省略其余分组的错误详情，
+        仍超出时截断末尾。
+
+        Args:
+            entries: 消息列表
+
+        Returns:
+            (标题, 内容)
+        """
+        groups: dict[tuple[str, str], list[str]] = {}
+        for entry in sorted(entries, key=lambda e: e.success):
+            groups.setdefault((entry.title, entry.detail), []).append(entry.content)
+
+        failures = sum(1 for entry in entries if not entry.success)
+        if len(groups) == 1:
+            title = entries[0].title
+        elif failures:
+            title = f"签到失败 {failures} 项"
+        else:
+            title = "签到完成"
+
+        lines: list[str] = []
+        length = 0
+        omitted = 0
+        for (group_title, detail), contents in groups.items():
+            count = f" ×{len(contents)}" if len(contents) > 1 else ""
+            group = [f"### {group_title}{count}"]
+            group.extend(content for content in contents if content)
+            length += sum(len(line) + 2 for line in group)
+            if detail:
+                block = f"```\n{detail.strip()[-MAX_DETAIL_LENGTH:]}\n```"
+                if length + len(block) + 2 <= MAX_CONTENT_LENGTH:
+                    group.append(block)
+                    length += len(block) + 2
+                else:
+                    omitted += 1
+            lines.extend(group)
+        if omitted:
+            lines.append(f"（{omitted} 项错误详情因长度限制已省略，详见运行日志）")
+
+        content = "\n\n".join(lines)
+        if len(content) > MAX_CONTENT_LENGTH:
+            content = content[: MAX_CONTENT_LENGTH - 20] + "\n\n…（内容过长已截断）"
+        return title, content
+
+    @classmethod
+    def flush(cls, key: Optional[str] = None) -> bool:
+        """汇总发件箱中的消息写入待发队列，并发送队列中到期的通知
+
+        Args:
+            key: 息知推送的 key，若不传则从环境变量 XIZHI_KEY 读取
+
+        Returns:
+            待发队列是否已全部发送
+        """
+        with cls._outbox_lock:
+            entries, cls._outbox = cls._outbox, []
+
+        try:
+            notifier = cls(key)
+        except ValueError:
+            if entries:
+                logger.warning(f"未设置 XIZHI_KEY，丢弃 {len(entries)} 条通知")
+            return False
+
+        spool = NotifySpool()
+        if entries:
+            spool.append(*cls.build_digest(entries))
+        elif not spool.path.exists():
+            return True
+        return spool.drain(notifier.send) == 0
+
+
+# 进程退出时发送汇总通知，并重试之前未送达的通知
+atexit.register(XizhiNotifier.flush)
+
 
 if __name__ == "__main__":
     # 使用示例
@@ -0,0 +1,174 @@
+"""请求容错模块
+
+为所有出站请求提供连接/读取超时、带随机抖动的指数退避重试，
+以及按主机的熔断器：某个主机连续失败达到阈值后，后续请求直接失败，
+不再逐个等待超时，冷却时间过后放行一个试探请求。
+"""
+
+import random
+import threading
+import time
+from typing import Optional
+
+import requests
+from urllib3.util.retry import Retry
+
+# 连接超时和读取超时（秒）
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# 重试次数
+RETRY_TOTAL = 3
+# 指数退避：第 n 次重试前等待 BACKOFF_FACTOR * 2 ** (n - 1) 秒，再加随机抖动
+BACKOFF_FACTOR = 0.5
+BACKOFF_JITTER = 0.5
+BACKOFF_MAX = 10
+# 需要重试的状态码（只对幂等请求生效）
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# 幂等、安全的请求方法
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+# 熔断器：连续失败次数阈值及熔断后的冷却时间（秒）
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 60
+
+
+def make_retry() -> Retry:
+    """创建 urllib3 重试策略
+
+    连接失败（请求尚未发出）时所有方法都会重试；读取失败和 5xx/429 状态码
+    只对幂等请求重试，避免重复提交签到。
+
+    Returns:
+        重试策略
+    """
+    return Retry(
+        total=RETRY_TOTAL,
+        connect=RETRY_TOTAL,
+        read=RETRY_TOTAL,
+        status=RETRY_TOTAL,
+        allowed_methods=IDEMPOTENT_METHODS,
+        status_forcelist=RETRY_STATUS_CODES,
+        backoff_factor=BACKOFF_FACTOR,
+        backoff_jitter=BACKOFF_JITTER,
+        backoff_max=BACKOFF_MAX,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+
+
+def backoff_delay(attempt: int) -> float:
+    """计算第 attempt 次重试前的等待时间，与 make_retry() 的策略一致
+
+    Args:
+        attempt: 重试序号，从 1 开始
+
+    Returns:
+        等待秒数
+    """
+    delay = BACKOFF_FACTOR * 2 ** (attempt - 1) + random.uniform(0, BACKOFF_JITTER)
+    return min(delay, BACKOFF_MAX)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """主机处于熔断状态，请求未发出"""
+
+
+class CircuitBreaker:
+    """单个主机的熔断器
+
+    Attributes:
+        host: 主机名
+        failure_threshold: 连续失败次数阈值
+        reset_timeout: 熔断后的冷却时间（秒）
+    """
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """初始化熔断器
+
+        Args:
+            host: 主机名
+            failure_threshold: 连续失败次数阈值
+            reset_timeout: 熔断后的冷却时间（秒）
+        """
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_request(self) -> None:
+        """请求前检查熔断状态
+
+        Raises:
+            CircuitOpenError: 主机处于熔断状态
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            # 冷却结束后只放行一个试探请求
+            cooled_down = time.monotonic() - self._opened_at >= self.reset_timeout
+            if cooled_down and not self._probing:
+                self._probing = True
+                return
+        raise CircuitOpenError(f"{self.host} 连续请求失败，已熔断")
+
+    def record_success(self) -> None:
+        """记录成功，关闭熔断"""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """记录失败，连续失败达到阈值或试探失败时熔断"""
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release_probe(self) -> None:
+        """请求未完成（如被取消）时释放试探名额，下一个请求重新试探"""
+        with self._lock:
+            self._probing = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    """获取主机对应的熔断器（同步、异步请求共享）
+
+    Args:
+        host: 主机名
+
+    Returns:
+        熔断器实例
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            _breakers[host] = breaker
+        return breaker
+
+
+def reset_breakers() -> None:
+    """清除所有主机的熔断状态"""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def is_server_failure(status_code: int) -> bool:
+    """状态码是否表示服务端故障（计入熔断失败次数）"""
+    return status_code >= 500
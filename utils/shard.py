@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+账号分片
+按账号标识的稳定哈希把同一平台的账号分到 n 个分片，多个进程或 CI 任务
+各执行一个分片（--shard i/n 或环境变量 CHECKIN_SHARD=i/n）。每个分片结束后
+写入部分结果文件，直接运行本模块可汇总各分片的结果：
+
+    python -m utils.shard [结果目录]
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from utils.state import CN_TZ, today
+from utils.store import JsonStore, data_dir
+
+logger = logging.getLogger(__name__)
+
+# 环境变量
+ENV_SHARD = "CHECKIN_SHARD"
+ENV_SHARD_DIR = "CHECKIN_SHARD_DIR"
+
+
+class Shard:
+    """账号分片
+
+    Attributes:
+        index: 分片序号，从 1 开始
+        count: 分片总数
+    """
+
+    __slots__ = ("index", "count")
+
+    def __init__(self, index: int, count: int) -> None:
+        """初始化分片
+
+        Args:
+            index: 分片序号，从 1 开始
+            count: 分片总数
+
+        Raises:
+            ValueError: 序号不在 1 到分片总数之间
+        """
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"分片应为 i/n 且 1 <= i <= n: {index}/{count}")
+        self.index = index
+        self.count = count
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def owns(self, key: str) -> bool:
+        """账号是否属于当前分片
+
+        Args:
+            key: 账号标识，同一账号在不同进程、不同机器上必须相同
+
+        Returns:
+            是否属于当前分片
+        """
+        digest = hashlib.sha1(key.encode()).digest()
+        return int.from_bytes(digest[:8], "big") % self.count == self.index - 1
+
+
+def parse_shard(text: str) -> Shard:
+    """解析 i/n 格式的分片
+
+    Args:
+        text: 分片字符串，例如 2/4
+
+    Returns:
+        分片
+
+    Raises:
+        ValueError: 格式错误
+    """
+    index, sep, count = text.strip().partition("/")
+    if not sep:
+        raise ValueError(f"分片应为 i/n 格式: {text}")
+    return Shard(int(index), int(count))
+
+
+def get_shard() -> Optional[Shard]:
+    """读取环境变量中的分片配置
+
+    Returns:
+        分片，未配置时返回 None
+
+    Raises:
+        ValueError: 配置格式错误
+    """
+    text = os.environ.get(ENV_SHARD, "").strip()
+    return parse_shard(text) if text else None
+
+
+def set_shard(text: Optional[str]) -> Optional[Shard]:
+    """设置并校验当前进程的分片配置
+
+    指定时写入环境变量 CHECKIN_SHARD，之后创建的账号来源只读取该分片的账号；
+    格式错误时输出日志并退出。
+
+    Args:
+        text: i/n 格式的分片，为空时沿用环境变量中的配置
+
+    Returns:
+        最终生效的分片，未配置时返回 None
+    """
+    if text:
+        os.environ[ENV_SHARD] = text
+    try:
+        shard = get_shard()
+    except ValueError as e:
+        logger.error(f"分片配置错误: {e}")
+        sys.exit(1)
+    if shard is not None:
+        logger.info(f"只执行分片 {shard} 的账号")
+    return shard
+
+
+def apply_shard_option(argv: Optional[list[str]] = None) -> list[str]:
+    """处理平台脚本命令行中的 --shard i/n
+
+    Args:
+        argv: 命令行参数，默认 sys.argv[1:]
+
+    Returns:
+        去掉 --shard 后的其余参数
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--shard")
+    args, rest = parser.parse_known_args(argv)
+    set_shard(args.shard)
+    return rest
+
+
+def results_dir() -> Path:
+    """分片结果目录，默认为数据目录下的 shards，可通过 CHECKIN_SHARD_DIR 指定"""
+    path = os.environ.get(ENV_SHARD_DIR)
+    return Path(path) if path else data_dir() / "shards"
+
+
+def write_result(platform: str, shard: Shard, success: int, total: int) -> Path:
+    """写入单个分片的结果文件（同一分片重复执行时覆盖）
+
+    Args:
+        platform: 平台名称
+        shard: 分片
+        success: 成功的账号数
+        total: 分片内的账号数
+
+    Returns:
+        结果文件路径
+    """
+    path = results_dir() / f"{platform}.{shard.index}-of-{shard.count}.json"
+    result = {
+        "platform": platform,
+        "shard": shard.index,
+        "shards": shard.count,
+        "success": success,
+        "total": total,
+        "date": today(),
+        "finished_at": datetime.now(CN_TZ).isoformat(timespec="seconds"),
+    }
+    JsonStore(path).update(lambda data: data.update(result))
+    return path
+
+
+def merge_results(directory: Path, date: str) -> dict[str, dict[str, Any]]:
+    """汇总目录中指定日期的分片结果
+
+    Args:
+        directory: 分片结果目录
+        date: 日期，格式 YYYY-MM-DD
+
+    Returns:
+        平台名称到汇总结果的映射，包含 success、total、shards（分片总数）
+        和 missing（缺少结果的分片序号）
+    """
+    merged: dict[str, dict[str, Any]] = {}
+    for path in sorted(directory.glob("*.json")):
+        try:
+            result = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            logger.warning(f"无法读取 {path.name}，已跳过")
+            continue
+        if result.get("date") != date:
+            continue
+        summary = merged.setdefault(
+            result["platform"],
+            {"success": 0, "total": 0, "shards": result["shards"], "seen": set()},
+        )
+        if result["shards"] != summary["shards"]:
+            logger.warning(f"[{result['platform']}] 分片总数不一致，忽略 {path.name}")
+            continue
+        summary["success"] += result["success"]
+        summary["total"] += result["total"]
+        summary["seen"].add(result["shard"])
+
+    for summary in merged.values():
+        seen = summary.pop("seen")
+        summary["missing"] = [
+            i for i in range(1, summary["shards"] + 1) if i not in seen
+        ]
+    return merged
+
+
+def main() -> None:
+    """汇总各分片的结果，有分片缺少结果时以退出码 1 结束"""
+    import argparse
+
+    from utils.log import setup_logging
+
+    setup_logging("%(message)s")
+    parser = argparse.ArgumentParser(description="汇总账号分片的签到结果")
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        help=f"分片结果目录，默认读取 {ENV_SHARD_DIR} 或数据目录下的 shards",
+    )
+    parser.add_argument("--date", default=today(), help="日期，默认今天（北京时间）")
+    args = parser.parse_args()
+
+    directory = Path(args.directory) if args.directory else results_dir()
+    merged = merge_results(directory, args.date)
+    if not merged:
+        logger.error(f"{directory} 中没有 {args.date} 的分片结果")
+        sys.exit(1)
+
+    success_count = total = 0
+    incomplete = False
+    for platform, summary in sorted(merged.items()):
+        success_count += summary["success"]
+        total += summary["total"]
+        finished = summary["shards"] - len(summary["missing"])
+        logger.info(
+            f"[{platform}] 签到完成: 成功 {summary['success']}/{summary['total']}"
+            f" ({finished}/{summary['shards']} 个分片)"
+        )
+        if summary["missing"]:
+            incomplete = True
+            missing = ", ".join(str(i) for i in summary["missing"])
+            logger.error(f"[{platform}] 缺少分片 {missing} 的结果")
+    logger.info(f"签到完成: 成功 {success_count}/{total}")
+    if incomplete:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
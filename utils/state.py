@@ -0,0 +1,102 @@
+"""每日签到状态模块
+
+按 (平台, 账号, 日期) 记录当天已完成签到的账号，同一天再次运行时
+直接跳过这些账号，不发送任何请求。日期按北京时间计算。
+"""
+
+import hashlib
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from utils.store import JsonStore, data_dir
+
+# 环境变量：设置为 1 时忽略当天的完成记录，强制重新签到
+ENV_FORCE = "CHECKIN_FORCE"
+
+# 签到日期按北京时间计算
+CN_TZ = timezone(timedelta(hours=8))
+
+
+def today() -> str:
+    """获取北京时间的当天日期
+
+    Returns:
+        日期字符串，格式 YYYY-MM-DD
+    """
+    return datetime.now(CN_TZ).strftime("%Y-%m-%d")
+
+
+class DailyState:
+    """单个平台的每日签到状态
+
+    状态文件位于数据目录下的 state/<platform>.json，账号以哈希值作为键，
+    值为最近一次完成签到的日期。新完成的账号先记录在内存中，
+    由 flush() 一次性写入。
+
+    Attributes:
+        platform: 平台名称
+        force: 是否忽略完成记录
+    """
+
+    def __init__(self, platform: str) -> None:
+        """初始化状态
+
+        Args:
+            platform: 平台名称
+        """
+        self.platform = platform
+        self.force = os.environ.get(ENV_FORCE) == "1"
+        self._store: Optional[JsonStore] = None
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> JsonStore:
+        """状态文件存储（首次使用时创建）"""
+        if self._store is None:
+            self._store = JsonStore(data_dir() / "state" / f"{self.platform}.json")
+        return self._store
+
+    def _key(self, account: Any) -> str:
+        """账号对应的状态键（不在磁盘上保存账号明文）"""
+        return hashlib.sha256(f"{self.platform}:{account!r}".encode()).hexdigest()
+
+    def is_done(self, account: Any) -> bool:
+        """账号今天是否已完成签到
+
+        Args:
+            account: 账号（按 repr 区分）
+
+        Returns:
+            是否已完成
+        """
+        if self.force:
+            return False
+        return self.store.get(self._key(account)) == today()
+
+    def mark_done(self, account: Any) -> None:
+        """记录账号今天已完成签到
+
+        Args:
+            account: 账号（按 repr 区分）
+        """
+        with self._lock:
+            self._pending.add(self._key(account))
+
+    def flush(self) -> None:
+        """写入新完成的账号，同时清理非当天的记录"""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return
+
+        date = today()
+
+        def merge(data: dict[str, Any]) -> None:
+            for key in [key for key, value in data.items() if value != date]:
+                del data[key]
+            data.update(dict.fromkeys(pending, date))
+
+        self.store.update(merge)
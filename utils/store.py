@@ -0,0 +1,146 @@
+"""本地数据存储模块
+
+提供签到脚本运行数据（登录凭证缓存等）的存放目录、跨进程的文件锁，
+以及进程和线程安全、原子写入的 JSON 文件存储。
+"""
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 不支持 fcntl，只能在进程内加锁
+    fcntl = None
+
+# 环境变量：数据目录
+ENV_DATA_DIR = "CHECKIN_DATA_DIR"
+
+# 默认数据目录
+DEFAULT_DATA_DIR = Path.home() / ".cache" / "my_checkin_scripts"
+
+
+def data_dir() -> Path:
+    """获取数据目录（不存在时自动创建）
+
+    Returns:
+        数据目录路径，默认 ~/.cache/my_checkin_scripts，可通过 CHECKIN_DATA_DIR 指定
+    """
+    path = Path(os.environ.get(ENV_DATA_DIR) or DEFAULT_DATA_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """跨进程的排他文件锁（flock）
+
+    被保护的文件通常通过 os.replace 整体替换，因此锁加在单独的锁文件上。
+    不支持 fcntl 的平台上不加锁，调用方仍需自行保证进程内的互斥。
+
+    Args:
+        path: 锁文件路径（不存在时自动创建）
+    """
+    if fcntl is None:
+        yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class JsonStore:
+    """以 JSON 文件保存的键值存储
+
+    读取结果缓存在内存中；每次写入前重新读取文件并合并，再通过临时文件
+    原子替换，文件权限为 0600。读取、修改、写回期间持有同目录下锁文件
+    （<文件名>.lock）的文件锁，多个实例或进程同时写入同一文件不会丢失修改。
+
+    Attributes:
+        path: JSON 文件路径
+        lock_path: 锁文件路径
+    """
+
+    def __init__(self, path: Path) -> None:
+        """初始化存储
+
+        Args:
+            path: JSON 文件路径
+        """
+        self.path = path
+        self.lock_path = path.with_suffix(".lock")
+        self._data: Optional[dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict[str, Any]:
+        """读取文件内容，文件不存在或已损坏时返回空字典"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data: dict[str, Any]) -> None:
+        """原子写入文件"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取键值
+
+        Args:
+            key: 键
+            default: 键不存在时的默认值
+
+        Returns:
+            键对应的值
+        """
+        with self._lock:
+            if self._data is None:
+                self._data = self._read()
+            return self._data.get(key, default)
+
+    def update(self, func: Callable[[dict[str, Any]], None]) -> None:
+        """读取最新内容，由 func 原地修改后写回
+
+        Args:
+            func: 修改函数，参数为存储内容字典
+        """
+        with self._lock, file_lock(self.lock_path):
+            data = self._read()
+            func(data)
+            self._write(data)
+            self._data = data
+
+    def set(self, key: str, value: Any) -> None:
+        """写入键值
+
+        Args:
+            key: 键
+            value: 可 JSON 序列化的值
+        """
+        self.update(lambda data: data.__setitem__(key, value))
+
+    def delete(self, key: str) -> None:
+        """删除键
+
+        Args:
+            key: 键
+        """
+        self.update(lambda data: data.pop(key, None))
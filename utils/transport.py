@@ -0,0 +1,280 @@
+"""HTTP 传输模块
+
+为所有签到客户端提供共享的连接池会话，按主机复用 keep-alive 连接，
+多账号、多次请求只需与每个主机握手一次。所有请求带有连接/读取超时、
+重试和按主机的熔断（见 utils.resilience）。开启指标记录时，每个请求的
+连接、TLS 握手和总耗时写入 utils.metrics。设置 CHECKIN_CASSETTE 时录制
+或回放请求（见 utils.cassette）。
+"""
+
+import http.cookiejar
+import os
+import threading
+import time
+from typing import Any, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from utils.cassette import get_cassette
+from utils.metrics import add_timing, connection_timings, record_request
+from utils.resilience import (
+    DEFAULT_TIMEOUT,
+    get_breaker,
+    is_server_failure,
+    make_retry,
+)
+
+# 缓存的主机连接池数量
+POOL_CONNECTIONS = 32
+# 每个主机连接池保持的最大连接数
+POOL_MAXSIZE = 16
+
+# 环境变量：单个主机同时进行的最大请求数
+ENV_HOST_CONCURRENCY = "CHECKIN_HOST_CONCURRENCY"
+DEFAULT_HOST_CONCURRENCY = 8
+
+
+class _RejectCookiePolicy(http.cookiejar.DefaultCookiePolicy):
+    """拒绝写入任何 Cookie 的策略
+
+    会话在所有账号间共享，响应中的 Set-Cookie 只保留在 response.cookies 中，
+    不写入会话，避免不同账号之间串号。
+    """
+
+    def set_ok(self, cookie: http.cookiejar.Cookie, request: Any) -> bool:
+        return False
+
+
+class _ConnectTimingMixin:
+    """记录建立连接（含 DNS 解析）的耗时"""
+
+    _connect_elapsed = 0.0
+
+    def _new_conn(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()  # type: ignore[misc]
+        finally:
+            self._connect_elapsed = time.perf_counter() - start
+            add_timing("connect", self._connect_elapsed)
+
+
+class _TimedHTTPConnection(_ConnectTimingMixin, HTTPConnection):
+    """记录连接耗时的 HTTP 连接"""
+
+
+class _TimedHTTPSConnection(_ConnectTimingMixin, HTTPSConnection):
+    """记录连接和 TLS 握手耗时的 HTTPS 连接"""
+
+    def connect(self) -> None:
+        self._connect_elapsed = 0.0
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            add_timing("tls", time.perf_counter() - start - self._connect_elapsed)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """使用计时连接的适配器，自定义适配器应继承此类以保留连接耗时指标"""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def _body_size(response: requests.Response, stream: bool) -> int:
+    """响应体字节数（流式响应未读取正文，使用 Content-Length）"""
+    if not stream:
+        return len(response.content)
+    try:
+        return int(response.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+class PooledSession(requests.Session):
+    """带连接池和默认超时的会话
+
+    Attributes:
+        timeout: 未显式传入 timeout 时使用的默认 (连接, 读取) 超时
+        host_concurrency: 单个主机同时进行的最大请求数
+    """
+
+    def __init__(
+        self,
+        timeout: Union[float, tuple[float, float]] = DEFAULT_TIMEOUT,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        host_concurrency: int = DEFAULT_HOST_CONCURRENCY,
+    ) -> None:
+        """初始化会话
+
+        Args:
+            timeout: 默认超时（秒），可以是 (连接超时, 读取超时)
+            pool_connections: 缓存的主机连接池数量
+            pool_maxsize: 每个主机连接池的最大连接数
+            host_concurrency: 单个主机同时进行的最大请求数
+        """
+        super().__init__()
+        self.timeout = timeout
+        self.host_concurrency = max(1, host_concurrency)
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        self.cookies.set_policy(_RejectCookiePolicy())
+
+        adapter = TimedHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=make_retry(),
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        """获取主机对应的并发信号量"""
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.host_concurrency)
+                self._host_slots[host] = slot
+            return slot
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """发送请求
+
+        未指定 timeout 时使用默认超时，并限制单主机并发数；主机熔断时
+        直接抛出 CircuitOpenError，不发出请求。回放模式下返回录制的响应，
+        不发出请求。
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).hostname or ""
+        breaker = get_breaker(host)
+        breaker.before_request()
+        cassette = get_cassette()
+
+        with self._host_slot(host), connection_timings() as timings:
+            start = time.perf_counter()
+            try:
+                if cassette is not None and cassette.replaying:
+                    response = cassette.replay(method, url, kwargs.get("params"))
+                else:
+                    response = super().request(method, resolve_url(url), **kwargs)
+            except Exception:
+                # 任何异常都计入失败，否则试探请求出错后熔断器会一直等待试探结果
+                breaker.record_failure()
+                record_request(method, url, 0, 0, time.perf_counter() - start, timings)
+                raise
+            except BaseException:
+                breaker.release_probe()
+                raise
+            elapsed = time.perf_counter() - start
+
+        if is_server_failure(response.status_code):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        size = _body_size(response, kwargs.get("stream", False))
+        record_request(method, url, response.status_code, size, elapsed, timings)
+        if cassette is not None and cassette.recording:
+            cassette.record(
+                method,
+                url,
+                kwargs,
+                response.status_code,
+                dict(response.headers),
+                response.cookies.get_dict(),
+                response.content,
+                elapsed,
+            )
+        return response
+
+
+_session: Optional[PooledSession] = None
+_session_lock = threading.Lock()
+
+# 主机重定向（主机名 -> 基础地址），用于离线基准测试等场景
+_host_overrides: dict[str, str] = {}
+
+
+def set_host_overrides(overrides: dict[str, str]) -> None:
+    """设置主机重定向，之后发往这些主机的请求改为发往对应的基础地址
+
+    单主机并发数和熔断仍按原主机名计算。
+
+    Args:
+        overrides: 主机名到基础地址的映射，例如 {"glados.cloud": "http://127.0.0.1:8000"}，
+            传入空字典取消重定向
+    """
+    _host_overrides.clear()
+    _host_overrides.update(overrides)
+
+
+def resolve_url(url: str) -> str:
+    """按主机重定向改写请求地址
+
+    Args:
+        url: 原始请求地址
+
+    Returns:
+        实际请求地址，未配置重定向时原样返回
+    """
+    if not _host_overrides:
+        return url
+    parts = urlsplit(url)
+    base_url = _host_overrides.get(parts.hostname or "")
+    if base_url is None:
+        return url
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{base_url}{parts.path}{query}"
+
+
+def get_session() -> PooledSession:
+    """获取进程内共享的连接池会话
+
+    Returns:
+        共享的 PooledSession 实例
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = PooledSession(
+                    host_concurrency=int(
+                        os.environ.get(ENV_HOST_CONCURRENCY, DEFAULT_HOST_CONCURRENCY)
+                    )
+                )
+    return _session
+
+
+def mount_adapter(prefix: str, adapter: HTTPAdapter) -> None:
+    """为指定 URL 前缀挂载自定义适配器（只挂载一次）
+
+    适配器未配置重试时使用默认重试策略。
+
+    Args:
+        prefix: URL 前缀，例如 https://example.com
+        adapter: 适配器实例
+    """
+    session = get_session()
+    with _session_lock:
+        if prefix not in session.adapters:
+            if not adapter.max_retries.total:
+                adapter.max_retries = make_retry()
+            session.mount(prefix, adapter)